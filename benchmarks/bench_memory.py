@@ -0,0 +1,72 @@
+"""
+메모리 벤치마크 - 한 학년의 반별 엑셀 파일을 불러올 때의 최대/잔여 메모리를 측정합니다.
+
+사용법:
+    python benchmarks/bench_memory.py [--classes 12] [--rows 35] [--sessions 20]
+
+tracemalloc으로 불러오기 중 최대 할당량(peak)과 불러온 뒤 남은 할당량을 재고,
+ScoreLogic.memory_report()의 시트/자료 구조별 크기를 함께 출력합니다.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_storage import make_workbooks  # noqa: E402
+from core.memory import format_size  # noqa: E402
+from core.score_logic import ScoreLogic  # noqa: E402
+
+
+def run(storage, paths):
+    """불러오기의 (시간, 최대 메모리, 잔여 메모리, memory_report)를 반환합니다."""
+    logic = ScoreLogic(storage=storage)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        for result in logic.load_excel_files(paths):
+            if not result[1]:
+                raise RuntimeError(result[2])
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        report = logic.memory_report()
+    finally:
+        tracemalloc.stop()
+    logic.close()
+    return elapsed, peak - base, current - base, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classes", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=35)
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"엑셀 파일 생성 중: {args.classes}개 반 x {args.rows}명 x {args.sessions}회")
+        paths = make_workbooks(directory, args.classes, args.rows, args.sessions)
+
+        rows = []
+        for storage in ("memory", "sqlite"):
+            rows.append((storage,) + run(storage, paths))
+
+    print(f"\n{'엔진':<8}{'불러오기':>10}{'최대 메모리':>14}{'잔여 메모리':>14}{'데이터':>12}")
+    for storage, elapsed, peak, retained, report in rows:
+        data = sum(f['data'] for f in report['files'])
+        print(f"{storage:<8}{elapsed:>9.3f}s{format_size(peak):>14}{format_size(retained):>14}"
+              f"{format_size(data):>12}")
+
+    _, _, _, _, report = rows[0]
+    print("\n자료 구조별 (memory 엔진)")
+    for name, size in report['structures'].items():
+        print(f"  {name:<16}{format_size(size):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+저장 엔진 벤치마크 - memory 엔진과 sqlite 엔진의 불러오기/검색/통계/입력 시간을 비교합니다.
+
+사용법:
+    python benchmarks/bench_storage.py [--classes 40] [--rows 35] [--sessions 10]
+
+임시 폴더에 반별 엑셀 파일을 만들어 두 엔진으로 같은 작업을 실행합니다.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.score_logic import ScoreLogic  # noqa: E402
+
+
+def make_workbooks(directory, classes, rows, sessions, seed=0):
+    """반별 엑셀 파일을 만들고 경로 목록을 반환합니다 (앱과 같은 1~3행 헤더 형식)."""
+    rng = random.Random(seed)
+    paths = []
+    for class_no in range(1, classes + 1):
+        # write_only로 만들면 시트 크기 정보가 없어 읽기 전용 로딩에서 max_row를 알 수 없음
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["학년", "반", "번호", "성명"] + [f"{i}회" for i in range(1, sessions + 1)])
+        sheet.append(["", "", "", ""] + ["수행"] * sessions)
+        sheet.append([])
+        for number in range(1, rows + 1):
+            scores = [rng.choice([None, rng.randint(0, 100)]) for _ in range(sessions)]
+            sheet.append([2, class_no, number, f"학생{class_no:02d}{number:02d}"] + scores)
+        path = os.path.join(directory, f"class_{class_no:02d}.xlsx")
+        workbook.save(path)
+        paths.append(path)
+    return paths
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def run(storage, paths, rows, sessions, lookups, updates, seed=1):
+    rng = random.Random(seed)
+    logic = ScoreLogic(storage=storage)
+    results = {}
+
+    def load():
+        for path in paths:
+            ok, message = logic.load_excel_data(path)
+            if not ok:
+                raise RuntimeError(message)
+    results["load"], _ = timed(load)
+
+    queries = [(str(rng.randint(1, rows)), f"학생{rng.randint(1, len(paths)):02d}{rng.randint(1, rows):02d}")
+               for _ in range(lookups)]
+    results["lookup"], found = timed(lambda: sum(len(logic.find_students(number=n, name=m)) for n, m in queries))
+
+    results["stats"], _ = timed(lambda: [logic.session_statistics(s) for s in range(sessions)])
+
+    total_rows = len(logic.student_data)
+    edits = [(rng.randrange(total_rows), rng.randrange(sessions), str(rng.randint(0, 100)))
+             for _ in range(updates)]
+
+    def update():
+        for row, session, score in edits:
+            logic.update_score(row, session, score)
+        # 입력 직후의 통계 조회까지 포함 (sqlite는 대기 중인 수정을 이때 기록)
+        logic.session_statistics(0)
+    results["update"], _ = timed(update)
+
+    logic.close()
+    return results, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classes", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=35)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"엑셀 파일 생성 중: {args.classes}개 반 x {args.rows}명 x {args.sessions}회")
+        paths = make_workbooks(directory, args.classes, args.rows, args.sessions)
+
+        rows = []
+        for storage in ("memory", "sqlite"):
+            results, found = run(storage, paths, args.rows, args.sessions, args.lookups, args.updates)
+            rows.append((storage, results, found))
+
+    print(f"\n{'엔진':<8}{'불러오기':>12}{'검색 x' + str(args.lookups):>14}"
+          f"{'통계':>10}{'입력 x' + str(args.updates):>14}")
+    for storage, results, found in rows:
+        print(f"{storage:<8}{results['load']:>11.3f}s{results['lookup'] * 1000:>12.1f}ms"
+              f"{results['stats'] * 1000:>8.1f}ms{results['update'] * 1000:>12.1f}ms"
+              f"   (검색 결과 {found}건)")
+
+
+if __name__ == "__main__":
+    main()
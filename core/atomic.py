@@ -0,0 +1,51 @@
+"""
+원자적 파일 쓰기
+
+같은 폴더의 임시 파일에 기록하고 fsync한 뒤 원본과 교체하므로, 쓰는 도중 실패하거나
+취소되어도 원본 파일은 그대로 남고 임시 파일은 지워집니다. 엑셀 저장, 내보내기,
+보고서, 스냅샷이 함께 사용합니다.
+"""
+import os
+import stat
+import tempfile
+
+
+def _fsync_directory(directory):
+    """이름 변경 자체도 디스크에 반영합니다 (POSIX만 지원)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def atomic_write(path, suffix, writer, mode="wb", encoding=None, newline=None):
+    """
+    writer(파일 객체)로 path를 원자적으로 기록하고 writer의 반환값을 반환합니다.
+    mode/encoding/newline은 임시 파일을 열 때 그대로 사용하며, 기존 파일의 권한은 유지합니다.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".~", suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding, newline=newline) as out:
+            result = writer(out)
+            out.flush()
+            os.fsync(out.fileno())
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except OSError:
+            pass  # 새 파일
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+    return result
@@ -0,0 +1,23 @@
+import threading
+
+
+class OperationCancelled(Exception):
+    """CancelToken이 취소되어 작업을 멈췄을 때 발생합니다."""
+
+
+class CancelToken:
+    """오래 걸리는 작업의 협조적 취소 - 다른 스레드에서 cancel()하면 작업이 다음 확인 지점에서 멈춥니다."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """취소되었으면 OperationCancelled를 발생시킵니다."""
+        if self._event.is_set():
+            raise OperationCancelled()
@@ -0,0 +1,397 @@
+"""
+시트 수식의 작은 계산 엔진 - 합계/평균 컬럼을 입력과 동시에 다시 계산합니다.
+
+지원 범위: 숫자, 셀 참조(A1, $A$1), 범위(A1:C1), + - * / ^, 괄호,
+SUM, AVERAGE, ROUND, MIN, MAX, COUNT, SUMPRODUCT(가중 합계).
+다른 시트 참조 등 지원하지 않는 수식은 계산하지 않고 파일의 값을 그대로 둡니다.
+
+수식은 불러올 때 한 번만 파싱해 파이썬 함수로 만들고, 참조하는 셀로 의존 그래프를
+구성합니다. 셀이 바뀌면 그 셀에 의존하는 수식만 위상 순서로 다시 계산합니다.
+"""
+import math
+import re
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from openpyxl.utils import column_index_from_string
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<num>\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+) |
+        (?P<func>[A-Za-z][A-Za-z0-9.]*)\s*\( |
+        (?P<ref>\$?[A-Za-z]{1,3}\$?\d+) |
+        (?P<op>[-+*/^(),:])
+    )""", re.VERBOSE)
+
+_REF = re.compile(r"\$?([A-Za-z]{1,3})\$?(\d+)")
+
+# 수식 결과가 오류일 때 셀에 표시하는 값
+ERROR_VALUE = "#VALUE!"
+ERROR_DIV0 = "#DIV/0!"
+
+
+class FormulaError(Exception):
+    """지원하지 않거나 잘못된 수식"""
+
+
+class _EvalError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise FormulaError(f"해석할 수 없는 수식입니다: {text}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind).upper() if kind != "num" else match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def _parse_ref(token):
+    col_text, row_text = _REF.fullmatch(token).groups()
+    return int(row_text), column_index_from_string(col_text.upper())
+
+
+class _Parser:
+    """재귀 하강 파서 - 수식을 (종류, ...) 튜플 트리로 만듭니다."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token[1] != value):
+            raise FormulaError(f"'{value}'이(가) 필요합니다.")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise FormulaError("수식 끝에 해석할 수 없는 부분이 있습니다.")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek() in (("op", "+"), ("op", "-")):
+            op = self.take()[1]
+            node = ("op", op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() in (("op", "*"), ("op", "/")):
+            op = self.take()[1]
+            node = ("op", op, node, self.factor())
+        return node
+
+    def factor(self):
+        if self.peek() in (("op", "-"), ("op", "+")):
+            op = self.take()[1]
+            operand = self.factor()
+            return ("neg", operand) if op == "-" else operand
+        node = self.primary()
+        while self.peek() == ("op", "^"):
+            self.take()
+            node = ("op", "^", node, self.factor())
+        return node
+
+    def primary(self):
+        kind, value = self.peek()
+        if kind == "num":
+            self.take()
+            return ("num", float(value))
+        if kind == "ref":
+            self.take()
+            start = _parse_ref(value)
+            if self.peek() == ("op", ":"):
+                self.take()
+                end_kind, end_value = self.take()
+                if end_kind != "ref":
+                    raise FormulaError("범위의 끝이 셀 참조가 아닙니다.")
+                return ("range", start, _parse_ref(end_value))
+            return ("ref", start)
+        if kind == "func":
+            self.take()
+            args = []
+            if self.peek() != ("op", ")"):
+                args.append(self.expr())
+                while self.peek() == ("op", ","):
+                    self.take()
+                    args.append(self.expr())
+            self.take(")")
+            if value not in _FUNCTIONS:
+                raise FormulaError(f"지원하지 않는 함수입니다: {value}")
+            return ("func", value, args)
+        if (kind, value) == ("op", "("):
+            self.take()
+            node = self.expr()
+            self.take(")")
+            return node
+        raise FormulaError("수식을 해석할 수 없습니다.")
+
+
+def _number(value):
+    """산술 연산용 값 - 빈 칸은 0, 숫자가 아닌 문자열은 #VALUE!"""
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        if str(value).startswith("#"):
+            raise _EvalError(str(value))
+        raise _EvalError(ERROR_VALUE)
+
+
+def _numbers(values):
+    """집계 함수용 값 - 숫자만 사용하고 빈 칸과 문자열은 무시 (오류 값은 전파)"""
+    result = []
+    for value in values:
+        if value is None or value == "":
+            continue
+        if isinstance(value, (int, float)):
+            result.append(float(value))
+            continue
+        try:
+            result.append(float(value))
+        except (ValueError, TypeError):
+            if str(value).startswith("#"):
+                raise _EvalError(str(value))
+    return result
+
+
+def _round(value, digits=0.0):
+    # 엑셀 ROUND는 0.5를 0에서 먼 쪽으로 올림
+    if not math.isfinite(value):
+        raise _EvalError(ERROR_VALUE)
+    digits = int(digits)
+    quantum = Decimal(1).scaleb(-digits)
+    return float(Decimal(repr(value)).quantize(quantum, rounding=ROUND_HALF_UP))
+
+
+def _average(values):
+    if not values:
+        raise _EvalError(ERROR_DIV0)
+    return sum(values) / len(values)
+
+
+def _sumproduct(*ranges):
+    if not ranges or any(len(r) != len(ranges[0]) for r in ranges):
+        raise _EvalError(ERROR_VALUE)
+    total = 0.0
+    for values in zip(*ranges):
+        product = 1.0
+        for value in values:
+            try:
+                product *= _number(value)
+            except _EvalError:
+                product = 0.0  # 문자열은 0으로 취급
+        total += product
+    return total
+
+
+# 함수 이름 -> (인자 종류, 구현). "agg"는 모든 인자의 숫자를 모아 전달, "scalar"는 인자별 숫자,
+# "ranges"는 범위별 값 목록
+_FUNCTIONS = {
+    "SUM": ("agg", lambda values: sum(values)),
+    "AVERAGE": ("agg", _average),
+    "MIN": ("agg", lambda values: min(values) if values else 0.0),
+    "MAX": ("agg", lambda values: max(values) if values else 0.0),
+    "COUNT": ("agg", lambda values: float(len(values))),
+    "ROUND": ("scalar", _round),
+    "SUMPRODUCT": ("ranges", _sumproduct),
+}
+
+
+class Formula:
+    """컴파일한 수식 - evaluate(get)로 값을 계산합니다. refs는 참조하는 셀 목록"""
+
+    __slots__ = ("text", "refs", "_fn")
+
+    def __init__(self, text, refs, fn):
+        self.text = text
+        self.refs = refs
+        self._fn = fn
+
+    def evaluate(self, get):
+        """get(cell)로 셀 값을 읽어 계산합니다. 오류는 '#VALUE!' 같은 문자열로 반환합니다."""
+        try:
+            return self._fn(get)
+        except _EvalError as e:
+            return e.code
+        except ZeroDivisionError:
+            return ERROR_DIV0
+        except (ArithmeticError, ValueError):
+            # OverflowError, decimal.InvalidOperation(아주 큰 값의 ROUND) 등
+            return ERROR_VALUE
+
+
+def compile_formula(text, locate):
+    """
+    수식 문자열("=SUM(E4:G4)")을 Formula로 컴파일합니다.
+    locate(row, col)은 엑셀 좌표(1부터)를 셀 키로 바꾸며, 셀이 아니면 ("const", 값)을 반환합니다.
+    지원하지 않는 수식이면 FormulaError를 발생시킵니다.
+    """
+    body = text[1:] if text.startswith("=") else text
+    tree = _Parser(_tokenize(body)).parse()
+    refs = []
+
+    def cell(row, col):
+        key = locate(row, col)
+        if isinstance(key, tuple) and key and key[0] == "const":
+            value = key[1]
+            return lambda get: value
+        refs.append(key)
+        return lambda get: get(key)
+
+    def build(node):
+        kind = node[0]
+        if kind == "num":
+            value = node[1]
+            return lambda get: value
+        if kind == "ref":
+            read = cell(*node[1])
+            return lambda get: _number(read(get))
+        if kind == "range":
+            raise FormulaError("범위는 함수 인자로만 사용할 수 있습니다.")
+        if kind == "neg":
+            operand = build(node[1])
+            return lambda get: -operand(get)
+        if kind == "op":
+            left, right = build(node[2]), build(node[3])
+            op = node[1]
+            if op == "+":
+                return lambda get: left(get) + right(get)
+            if op == "-":
+                return lambda get: left(get) - right(get)
+            if op == "*":
+                return lambda get: left(get) * right(get)
+            if op == "/":
+                return lambda get: left(get) / right(get)
+            return lambda get: left(get) ** right(get)
+        if kind == "func":
+            mode, impl = _FUNCTIONS[node[1]]
+            if mode == "scalar":
+                args = [build(arg) for arg in node[2]]
+                return lambda get: impl(*(arg(get) for arg in args))
+            # 집계 함수는 범위 인자를 셀 목록으로 펼침
+            parts = [build_values(arg) for arg in node[2]]
+            if mode == "ranges":
+                return lambda get: impl(*(part(get) for part in parts))
+            return lambda get: impl(_numbers(v for part in parts for v in part(get)))
+        raise FormulaError("수식을 해석할 수 없습니다.")
+
+    def build_values(node):
+        """함수 인자 - 값 목록을 반환하는 함수"""
+        if node[0] == "range":
+            (r1, c1), (r2, c2) = node[1], node[2]
+            readers = [cell(r, c) for r in range(min(r1, r2), max(r1, r2) + 1)
+                       for c in range(min(c1, c2), max(c1, c2) + 1)]
+            return lambda get: [read(get) for read in readers]
+        if node[0] == "ref":
+            read = cell(*node[1])
+            return lambda get: [read(get)]
+        scalar = build(node)
+        return lambda get: [scalar(get)]
+
+    fn = build(tree)
+    return Formula(text, refs, fn)
+
+
+def format_result(value):
+    """계산 결과를 셀 값 문자열로 만듭니다 (정수면 소수점 없이)."""
+    if isinstance(value, str):
+        return value
+    if value != value or value in (float("inf"), float("-inf")):
+        return ERROR_VALUE
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(round(value, 10))
+
+
+class FormulaSheet:
+    """시트 하나의 수식 셀과 의존 그래프"""
+
+    def __init__(self):
+        self.formulas = {}  # 셀 -> Formula
+        self.fixed = set()  # 계산하지 않는 수식 셀 (지원하지 않는 수식 - 저장 시 그대로 둠)
+        self._dependents = defaultdict(set)  # 셀 -> 그 셀을 참조하는 수식 셀
+
+    def __bool__(self):
+        return bool(self.formulas or self.fixed)
+
+    def is_formula(self, cell):
+        return cell in self.formulas or cell in self.fixed
+
+    def add(self, cell, formula):
+        self.remove(cell)
+        self.formulas[cell] = formula
+        for ref in formula.refs:
+            self._dependents[ref].add(cell)
+
+    def add_fixed(self, cell):
+        self.remove(cell)
+        self.fixed.add(cell)
+
+    def remove(self, cell):
+        """셀의 수식을 제거합니다 (값을 직접 입력한 경우)."""
+        self.fixed.discard(cell)
+        formula = self.formulas.pop(cell, None)
+        if formula is not None:
+            for ref in formula.refs:
+                dependents = self._dependents.get(ref)
+                if dependents is not None:
+                    dependents.discard(cell)
+                    if not dependents:
+                        del self._dependents[ref]
+
+    def affected(self, changed):
+        """바뀐 셀들에 (간접적으로) 의존하는 수식 셀을 계산 순서대로 반환합니다."""
+        # 영향받는 수식 셀 수집
+        affected = set()
+        stack = list(changed)
+        while stack:
+            for dependent in self._dependents.get(stack.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    stack.append(dependent)
+        return self._topological(affected)
+
+    def all_in_order(self):
+        """모든 수식 셀을 계산 순서대로 반환합니다."""
+        return self._topological(set(self.formulas))
+
+    def _topological(self, cells):
+        # 영향받는 집합 안에서만 위상 정렬 (순환 참조 셀은 마지막에 한 번 계산)
+        indegree = {cell: 0 for cell in cells}
+        for cell in cells:
+            for ref in set(self.formulas[cell].refs):
+                if ref in indegree:
+                    indegree[cell] += 1
+        ready = [cell for cell, degree in indegree.items() if degree == 0]
+        order = []
+        while ready:
+            cell = ready.pop()
+            order.append(cell)
+            for dependent in self._dependents.get(cell, ()):
+                if dependent in indegree:
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        ready.append(dependent)
+        if len(order) < len(cells):
+            done = set(order)
+            order.extend(cell for cell in cells if cell not in done)
+        return order
@@ -0,0 +1,144 @@
+"""
+회차 가중치에 따른 환산 총점과 등급
+
+계산 방식은 {"sessions": {회차 이름: {"weight", "cap"}}, "digits", "rounding", "bands"} dict로
+설정합니다. 회차 점수는 cap(만점)을 넘으면 cap으로 자른 뒤 weight를 곱해 더하고, 빈 칸이나
+숫자가 아닌 값은 0점으로 봅니다. 총점은 digits 자리로 rounding 방식에 따라 반올림하고,
+bands([[하한, 등급], ...], 하한이 높은 순)에서 처음으로 하한 이상인 등급을 받습니다.
+
+전체 계산은 행마다가 아니라 회차 컬럼 단위로 합니다 - 한 컬럼의 기여도 목록을 만들고
+(같은 점수 문자열은 한 번만 변환) 컬럼끼리 더합니다.
+"""
+import math
+from decimal import ROUND_DOWN, ROUND_HALF_UP, ROUND_UP, Decimal, InvalidOperation
+from operator import add
+
+# 내보낼 때 시트에 추가하는 컬럼 이름 (1행)
+GRADE_TOTAL_HEADER = "환산 총점"
+GRADE_BAND_HEADER = "등급"
+GRADE_HEADERS = (GRADE_TOTAL_HEADER, GRADE_BAND_HEADER)
+
+DEFAULT_BANDS = [[90.0, "A"], [80.0, "B"], [70.0, "C"], [60.0, "D"], [0.0, "E"]]
+
+# 반올림 방식 -> decimal 모드
+ROUNDING_MODES = {"half_up": ROUND_HALF_UP, "down": ROUND_DOWN, "up": ROUND_UP}
+
+
+def _as_float(value):
+    return float(value) if value is not None and value != "" else None
+
+
+def normalize_scheme(scheme):
+    """계산 방식 dict를 검사해 정규화한 형태로 반환합니다 (회차가 없으면 None). 잘못되면 ValueError"""
+    if not scheme:
+        return None
+    sessions = {}
+    for label, item in (scheme.get("sessions") or {}).items():
+        weight = _as_float((item or {}).get("weight"))
+        if not weight:
+            continue  # 가중치가 없거나 0인 회차는 계산에서 뺌
+        if weight < 0:
+            raise ValueError(f"{label}: 가중치는 0보다 커야 합니다.")
+        cap = _as_float(item.get("cap"))
+        if cap is not None and cap <= 0:
+            raise ValueError(f"{label}: 만점은 0보다 커야 합니다.")
+        sessions[str(label)] = {"weight": weight, "cap": cap}
+    if not sessions:
+        return None
+
+    digits = int(scheme.get("digits", 1))
+    if not 0 <= digits <= 4:
+        raise ValueError("소수 자릿수는 0~4 사이여야 합니다.")
+    rounding = scheme.get("rounding") or "half_up"
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"지원하지 않는 반올림 방식입니다: {rounding}")
+
+    bands = scheme.get("bands") or DEFAULT_BANDS
+    if isinstance(bands, str):
+        bands = parse_bands(bands) or DEFAULT_BANDS
+    bands = sorted(([float(lower), str(grade).strip()] for lower, grade in bands), key=lambda band: -band[0])
+    if not all(grade for _, grade in bands):
+        raise ValueError("등급 이름이 비어 있습니다.")
+    if len({lower for lower, _ in bands}) != len(bands):
+        raise ValueError("등급 하한이 겹칩니다.")
+    return {"sessions": sessions, "digits": digits, "rounding": rounding, "bands": bands}
+
+
+def parse_bands(text):
+    """'90:A, 80:B, 0:C' 형태의 문자열을 [[90.0, "A"], ...]로 바꿉니다. 잘못되면 ValueError"""
+    bands = []
+    for part in text.replace("\n", ",").split(","):
+        if not part.strip():
+            continue
+        lower, sep, grade = part.partition(":")
+        if not sep:
+            raise ValueError(f"'하한:등급' 형태가 아닙니다: {part.strip()}")
+        bands.append([float(lower), grade.strip()])
+    return bands
+
+
+def format_bands(bands):
+    """parse_bands의 반대 - 대화상자 표시용"""
+    return ", ".join(f"{format_number(lower)}:{grade}" for lower, grade in bands)
+
+
+def format_number(value):
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def score_value(value, weight, cap):
+    """점수 하나의 기여도 (빈 칸/숫자가 아니거나 inf/nan이면 0)"""
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return 0.0
+    if not math.isfinite(number):
+        return 0.0
+    if cap is not None and number > cap:
+        number = cap
+    return number * weight
+
+
+def column_contributions(values, weight, cap):
+    """한 회차 컬럼의 기여도 목록 - 같은 값(반복되는 점수 문자열)은 한 번만 변환"""
+    memo = {}
+    result = []
+    append = result.append
+    for value in values:
+        contribution = memo.get(value)
+        if contribution is None:
+            contribution = memo[value] = score_value(value, weight, cap)
+        append(contribution)
+    return result
+
+
+def compute_totals(columns, size):
+    """[(값 목록, weight, cap)] 컬럼들의 행별 합계 목록 (길이 size)"""
+    totals = [0.0] * size
+    for values, weight, cap in columns:
+        totals = list(map(add, totals, column_contributions(values, weight, cap)))
+    return totals
+
+
+def row_total(row, weights):
+    """한 행의 합계 - weights: {컬럼: (weight, cap)} (점수 하나를 고친 뒤 그 행만 다시 계산)"""
+    return sum(score_value(row[col] if col < len(row) else "", weight, cap)
+               for col, (weight, cap) in weights.items())
+
+
+def round_total(total, digits, rounding="half_up"):
+    """총점을 digits 자리로 반올림합니다 (2진 부동소수점 오차 없이 10진수로)."""
+    quantum = Decimal(1).scaleb(-digits)
+    try:
+        rounded = Decimal(repr(total)).quantize(quantum, rounding=ROUNDING_MODES[rounding])
+    except InvalidOperation:
+        return total  # 자릿수를 맞출 수 없을 만큼 큰 값은 그대로
+    return int(rounded) if digits == 0 else float(rounded)
+
+
+def grade_for(total, bands):
+    """총점이 처음으로 하한 이상이 되는 등급 (어느 하한에도 못 미치면 마지막 등급)"""
+    for lower, grade in bands:
+        if total >= lower:
+            return grade
+    return bands[-1][1] if bands else ""
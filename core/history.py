@@ -0,0 +1,78 @@
+"""
+점수 입력의 실행 취소/다시 실행 기록
+
+수정 하나는 (file, file_row, col, 이전 값, 새 값, 지운 수식) 튜플 하나로 기록하고,
+한 번의 실행 취소 단위(step)는 이 튜플들의 튜플입니다. 단계 수는 UNDO_LIMIT로
+제한되어 오래된 기록부터 버려집니다.
+"""
+from collections import deque
+
+# 보관하는 실행 취소 단계 수
+UNDO_LIMIT = 200
+
+
+class EditHistory:
+    """셀 수정 델타 로그 - 묶음(batch) 안의 수정은 한 단계로 기록합니다."""
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self._undo = deque(maxlen=limit)
+        self._redo = deque(maxlen=limit)
+        self._batch = None
+        self._depth = 0
+
+    def record(self, delta):
+        """수정 하나를 기록합니다. 새 수정이 생기면 다시 실행 기록은 버립니다."""
+        if self._batch is not None:
+            self._batch.append(delta)
+            return
+        self._undo.append((delta,))
+        self._redo.clear()
+
+    def begin(self):
+        """묶음을 시작합니다 (중첩 가능 - 가장 바깥 묶음이 끝날 때 한 단계로 기록)."""
+        if self._depth == 0:
+            self._batch = []
+        self._depth += 1
+
+    def end(self):
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        batch, self._batch = self._batch, None
+        if batch:
+            self._undo.append(tuple(batch))
+            self._redo.clear()
+
+    def pop_undo(self):
+        """실행 취소할 단계를 꺼냅니다 (없으면 None). 꺼낸 단계는 다시 실행 기록으로 옮깁니다."""
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._redo.append(step)
+        return step
+
+    def pop_redo(self):
+        """다시 실행할 단계를 꺼냅니다 (없으면 None)."""
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._undo.append(step)
+        return step
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def forget(self, file):
+        """파일의 행 구조가 바뀌면 그 파일이 들어 있는 단계를 버립니다."""
+        for steps in (self._undo, self._redo):
+            kept = [step for step in steps if all(delta[0] is not file for delta in step)]
+            if len(kept) != len(steps):
+                steps.clear()
+                steps.extend(kept)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
@@ -0,0 +1,59 @@
+"""
+메모리 사용량 측정
+
+deep_size()는 컨테이너(list/tuple/dict/set/deque)와 객체의 __dict__를 따라가며 크기를
+더합니다. 여러 곳에서 공유하는 문자열이나 행은 seen으로 한 번만 세므로, 같은 seen으로
+차례로 재면 뒤에 잰 구조에는 자기만 가진 부분의 크기만 들어갑니다.
+traced_memory()는 tracemalloc이 켜져 있을 때(PYTHONTRACEMALLOC=1 또는 tracemalloc.start())
+현재/최대 할당량과 할당이 많은 코드 위치를 반환합니다.
+"""
+import sys
+import tracemalloc
+from collections import deque
+
+_CONTAINERS = (list, tuple, set, frozenset, deque)
+
+
+def deep_size(obj, seen=None):
+    """obj와 그 안의 값들의 크기 합 (바이트, seen에 있는 객체는 제외하고 seen에 추가)"""
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, _CONTAINERS):
+            stack.extend(item)
+        elif hasattr(item, "__dict__") and not isinstance(item, type):
+            stack.append(item.__dict__)
+    return size
+
+
+def traced_memory(top=10):
+    """tracemalloc 측정값 {current, peak, top: [(파일:줄, 바이트, 할당 수)]} (꺼져 있으면 None)"""
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snapshot.statistics("lineno")[:top]
+    return {"current": current, "peak": peak,
+            "top": [(f"{s.traceback[0].filename}:{s.traceback[0].lineno}", s.size, s.count) for s in stats]}
+
+
+def format_size(size):
+    """바이트 수를 읽기 쉬운 단위로 표시합니다."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
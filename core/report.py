@@ -0,0 +1,232 @@
+"""
+반별 성적 보고서 (인쇄/PDF 저장용 HTML)
+
+보고서 하나는 시트 하나의 명단, 회차별 점수, 회차별 통계(와 환산 총점/등급 분포)를 담은
+독립된 HTML 파일입니다. 스타일은 파일 안에 넣고 A4 인쇄 설정(@page, 페이지마다 반복되는
+표 머리글)을 포함하므로 브라우저에서 바로 인쇄하거나 PDF로 저장할 수 있습니다.
+
+ScoreLogic.report_jobs()가 시트마다 필요한 값만 복사한 작업 dict를 만들고,
+generate_reports()가 작업을 여러 프로세스에 나눠 렌더링합니다. 작업 dict에는 문자열/숫자만
+들어 있어 프로세스 사이에 그대로 전달할 수 있습니다. 각 프로세스는 행을 쓰는 대로 임시 파일에
+기록하면서 통계를 모으고, 다 쓴 뒤 보고서 파일과 교체합니다.
+"""
+import html
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from core.atomic import atomic_write
+
+# 동시에 렌더링할 최대 프로세스 수
+REPORT_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+# 취소를 확인하는 간격 (초)
+REPORT_POLL_INTERVAL = 0.1
+
+# 파일 이름에 쓸 수 없는 문자
+_INVALID_NAME_CHARS = '<>:"/\\|?*[]'
+
+_STYLE = """
+@page { size: A4; margin: 12mm; }
+body { font-family: "Malgun Gothic", "Apple SD Gothic Neo", sans-serif; font-size: 10pt; color: #222; }
+h1 { font-size: 15pt; margin: 0 0 4px; }
+h2 { font-size: 12pt; margin: 18px 0 6px; }
+.meta { color: #666; font-size: 9pt; margin-bottom: 10px; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #999; padding: 3px 5px; text-align: center; }
+th { background: #eee; }
+td.name { text-align: left; white-space: nowrap; }
+thead { display: table-header-group; }
+tr { page-break-inside: avoid; }
+@media print { body { -webkit-print-color-adjust: exact; print-color-adjust: exact; } }
+"""
+
+
+def report_file_name(title, used):
+    """보고서 파일 이름 (파일 이름에 쓸 수 없는 문자는 _로, 같은 이름이 있으면 번호를 붙임)"""
+    base = "".join("_" if c in _INVALID_NAME_CHARS else c for c in title).strip() or "보고서"
+    name = f"{base}.html"
+    counter = 2
+    while name.lower() in used:
+        name = f"{base} ({counter}).html"
+        counter += 1
+    used.add(name.lower())
+    return name
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _number_text(value):
+    if value is None:
+        return "-"
+    return str(int(value)) if float(value).is_integer() else f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+class _Statistics:
+    """점수를 하나씩 받아 개수/평균/표준편차/최고/최저를 계산합니다 (Welford)."""
+
+    __slots__ = ("count", "blank", "mean", "_m2", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.blank = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        number = _number(value)
+        if number is None:
+            if value == "" or value is None:
+                self.blank += 1
+            return
+        self.count += 1
+        delta = number - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (number - self.mean)
+        self.minimum = number if self.minimum is None else min(self.minimum, number)
+        self.maximum = number if self.maximum is None else max(self.maximum, number)
+
+    def row(self):
+        """[응시, 미입력, 평균, 표준편차, 최고, 최저] 표시 문자열"""
+        if not self.count:
+            return [0, self.blank, "-", "-", "-", "-"]
+        std = math.sqrt(self._m2 / self.count)
+        return [self.count, self.blank, _number_text(round(self.mean, 2)), _number_text(round(std, 2)),
+                _number_text(self.maximum), _number_text(self.minimum)]
+
+
+def _cells(tag, values):
+    return "".join(f"<{tag}>{html.escape(str(value))}</{tag}>" for value in values)
+
+
+def write_report(path, job):
+    """
+    작업 dict의 보고서를 path에 기록합니다. 행을 쓰는 대로 통계를 모으고 표 뒤에 통계를 씁니다.
+    job: {title, source, generated, sessions: [회차 이름], rows: [[반, 번호, 성명, [점수...], 총점, 등급]],
+          grades: 등급 이름 목록 또는 None}
+    """
+    sessions = job['sessions']
+    grades = job.get('grades')
+    stats = [_Statistics() for _ in sessions]
+    total_stats = _Statistics()
+    grade_counts = dict.fromkeys(grades or (), 0)
+
+    def write(out):
+        title = html.escape(job['title'])
+        out.write(f'<!DOCTYPE html>\n<html lang="ko">\n<head>\n<meta charset="utf-8">\n'
+                  f"<title>{title}</title>\n<style>{_STYLE}</style>\n</head>\n<body>\n")
+        out.write(f"<h1>{title}</h1>\n<div class=\"meta\">원본: {html.escape(job['source'])} · "
+                  f"학생 {len(job['rows'])}명 · 작성 {html.escape(job['generated'])}</div>\n")
+
+        header = ["반", "번호", "성명"] + sessions + (["환산 총점", "등급"] if grades is not None else [])
+        out.write(f"<table>\n<thead><tr>{_cells('th', header)}</tr></thead>\n<tbody>\n")
+        for class_name, number, name, scores, total, grade in job['rows']:
+            for stat, value in zip(stats, scores):
+                stat.add(value)
+            values = list(scores)
+            if grades is not None:
+                total_stats.add(total)
+                if grade in grade_counts:
+                    grade_counts[grade] += 1
+                values += ["" if total is None else _number_text(total), grade or ""]
+            out.write(f"<tr>{_cells('td', (class_name, number))}<td class=\"name\">{html.escape(name)}</td>"
+                      f"{_cells('td', values)}</tr>\n")
+        out.write("</tbody>\n</table>\n")
+
+        out.write('<h2>회차별 통계</h2>\n<table>\n<thead><tr>'
+                  f"{_cells('th', ['회차', '응시', '미입력', '평균', '표준편차', '최고', '최저'])}"
+                  "</tr></thead>\n<tbody>\n")
+        for label, stat in zip(sessions, stats):
+            out.write(f"<tr>{_cells('td', [label] + stat.row())}</tr>\n")
+        if grades is not None:
+            out.write(f"<tr>{_cells('th', ['환산 총점'] + total_stats.row())}</tr>\n")
+        out.write("</tbody>\n</table>\n")
+
+        if grades is not None:
+            out.write('<h2>등급 분포</h2>\n<table>\n<thead><tr>'
+                      f"{_cells('th', ['등급'] + list(grade_counts))}</tr></thead>\n<tbody>\n"
+                      f"<tr>{_cells('td', ['인원'] + list(grade_counts.values()))}</tr>\n"
+                      "</tbody>\n</table>\n")
+        out.write("</body>\n</html>\n")
+
+    atomic_write(path, ".html", write, mode="w", encoding="utf-8", newline="\n")
+
+
+def render_report(job):
+    """작업 하나를 렌더링하고 결과 dict를 반환합니다 (워커 프로세스에서 실행)."""
+    start = time.perf_counter()
+    try:
+        write_report(job['path'], job)
+        return {"path": job['path'], "source": job['source'], "status": "done",
+                "elapsed": time.perf_counter() - start, "error": None}
+    except Exception as e:
+        return {"path": job['path'], "source": job['source'], "status": "failed",
+                "elapsed": time.perf_counter() - start, "error": str(e)}
+
+
+def generate_reports(jobs, workers=None, progress=None, cancel=None):
+    """
+    작업들을 워커 프로세스에서 병렬로 렌더링합니다 (백그라운드 스레드에서 호출).
+    progress(dict)는 보고서 하나를 마칠 때마다 {"stage": "report", "path", "status", "files_done",
+    "file_count"}로 호출됩니다. cancel이 취소되면 아직 시작하지 않은 작업은 만들지 않습니다.
+    반환값: 작업 순서의 결과 목록 [{path, source, status('done'/'failed'/'cancelled'), elapsed, error}]
+    """
+    if not jobs:
+        return []
+    results = [None] * len(jobs)
+    workers = max(1, min(workers or REPORT_WORKERS, len(jobs)))
+    # Qt 스레드가 도는 프로세스를 fork하지 않도록 모든 플랫폼에서 spawn 사용
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = {pool.submit(render_report, job): index for index, job in enumerate(jobs)}
+        files_done = 0
+        cancelled = False
+        while pending:
+            done, _ = wait(pending, timeout=REPORT_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if not cancelled and cancel is not None and cancel.is_cancelled():
+                cancelled = True
+                for future in pending:
+                    future.cancel()  # 실행 중인 작업은 끝까지 기다림
+            for future in list(pending):
+                if not future.done():
+                    continue
+                index = pending.pop(future)
+                job = jobs[index]
+                if future.cancelled():
+                    result = {"path": job['path'], "source": job['source'], "status": "cancelled",
+                              "elapsed": 0.0, "error": None}
+                elif future.exception() is not None:
+                    result = {"path": job['path'], "source": job['source'], "status": "failed",
+                              "elapsed": 0.0, "error": str(future.exception())}
+                else:
+                    result = future.result()
+                results[index] = result
+                files_done += 1
+                if progress is not None:
+                    progress({"stage": "report", "path": result['path'], "status": result['status'],
+                              "files_done": files_done, "file_count": len(jobs)})
+    return results
+
+
+def summarize_report_results(results, directory):
+    """generate_reports 결과를 (성공 여부, 메시지)로 요약합니다."""
+    if not results:
+        return False, "보고서를 만들 데이터가 없습니다."
+    failed = [r for r in results if r['status'] == "failed"]
+    cancelled = sum(1 for r in results if r['status'] == "cancelled")
+    done = len(results) - len(failed) - cancelled
+    if failed:
+        lines = [f"{r['source']}: {r['error']}" for r in failed]
+        return False, f"일부 보고서를 만들지 못했습니다 ({done}개 완료, {len(failed)}개 실패):\n" + "\n".join(lines)
+    if cancelled:
+        return False, f"보고서 만들기를 취소했습니다 ({done}개 완료, {cancelled}개 만들지 않음)."
+    return True, f"{done}개 반의 보고서를 만들었습니다.\n{directory}"
@@ -0,0 +1,76 @@
+import threading
+from contextlib import contextmanager
+
+
+class RWLock:
+    """읽기/쓰기 잠금 - 읽기는 여럿이 동시에, 쓰기는 하나만 (쓰기 대기 중이면 새 읽기는 기다림)
+
+    같은 스레드 안에서는 재진입할 수 있습니다. 쓰기 잠금을 가진 스레드는 읽기/쓰기를
+    다시 얻을 수 있고, 읽기 잠금을 가진 스레드는 읽기를 다시 얻을 수 있습니다.
+    읽기 잠금을 가진 채 쓰기 잠금을 얻는 것(승격)은 지원하지 않습니다.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None  # 쓰기 잠금을 가진 스레드 id
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, "reads", 0)
+        with self._cond:
+            if self._writer != me and depth == 0:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+            self._readers += 1
+        self._local.reads = depth + 1
+
+    def release_read(self):
+        self._local.reads -= 1
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if getattr(self._local, "reads", 0):
+                raise RuntimeError("읽기 잠금을 가진 채 쓰기 잠금을 얻을 수 없습니다.")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -1,33 +1,517 @@
 import openpyxl
+import hashlib
+import os
+import sys
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
 from PySide6.QtCore import QFileInfo
 from collections import defaultdict
 
+from core.snapshot import read_snapshot, write_snapshot
+from core.sqlite_store import SqliteStore
+from core.exporter import export_rows
+from core.formulas import FormulaError, FormulaSheet, compile_formula, format_result
+from core.grading import GRADE_HEADERS, compute_totals, grade_for, normalize_scheme, round_total, row_total
+from core.atomic import atomic_write
+from core.cancel import OperationCancelled
+from core.history import EditHistory
+from core.report import generate_reports, report_file_name
+from core.memory import deep_size, traced_memory
+from core.rwlock import RWLock
+from core.validation import check_number, check_values, compile_rule, normalize_rule
+
+# 동시에 저장할 최대 파일 수
+SAVE_WORKERS = 4
+
+# 빠른 해시에 사용할 파일 앞/뒤 구간 크기 (xlsx는 zip이라 끝부분의
+# 중앙 디렉터리에 모든 항목의 CRC가 있어 내용 변경이 뒤쪽 구간에 드러남)
+FINGERPRINT_SAMPLE = 64 * 1024
+
+# 컬럼이 이보다 많은 시트는 명단 컬럼만 먼저 읽고 회차 컬럼은 선택할 때 읽음
+LAZY_COLUMN_THRESHOLD = 24
+
+# 항상 바로 읽는 명단 컬럼 (학년, 반, 번호, 성명)
+ROSTER_COLUMNS = frozenset(range(4))
+
+# 학생을 구분하는 컬럼 (반, 번호, 성명) - 검색/식별/내보내기에서는 앞뒤 공백을 제거한 값으로 다룸
+IDENTITY_COLUMNS = (1, 2, 3)
+
+# 불러오기 진행 상황을 알리고 취소를 확인하는 행 간격
+LOAD_PROGRESS_ROWS = 500
+
+LOAD_CANCELLED_MESSAGE = "불러오기를 취소했습니다."
+
+# 변경 이벤트 종류 (ScoreLogic.subscribe로 받는 dict의 "type")
+CELL_CHANGED = "cell_changed"  # cells: [(data_row, col)]
+FILE_ADDED = "file_added"  # file: 추가한 시트
+FILE_REMOVED = "file_removed"  # file: 닫은 시트
+FILE_RELOADED = "file_reloaded"  # path: 다시 읽어 행 구조가 바뀐 파일
+
+
+def file_fingerprint(path):
+    """파일의 크기, 수정 시각, 앞/뒤 구간 해시를 반환합니다."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": _fast_hash(path, st.st_size)}
+
+
+def _fast_hash(path, size):
+    """파일 전체를 읽지 않고 크기와 앞/뒤 구간만으로 해시를 계산합니다."""
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE))
+        if size > FINGERPRINT_SAMPLE:
+            f.seek(max(FINGERPRINT_SAMPLE, size - FINGERPRINT_SAMPLE))
+            digest.update(f.read(FINGERPRINT_SAMPLE))
+    return digest.hexdigest()
+
+_SPREADSHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def list_sheets(path):
+    """
+    통합 문서의 시트 이름 목록과 활성 시트 이름을 반환합니다.
+    셀 데이터나 공유 문자열은 읽지 않고 xl/workbook.xml만 읽습니다.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        names = [sheet.get("name") for sheet in root.iter(_SPREADSHEET_NS + "sheet")]
+        view = root.find(f"{_SPREADSHEET_NS}bookViews/{_SPREADSHEET_NS}workbookView")
+        active = int(view.get("activeTab", 0)) if view is not None else 0
+        if names:
+            return names, names[active] if active < len(names) else names[0]
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError, ValueError):
+        pass
+    # 형식이 다르면 openpyxl로 확인
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return list(workbook.sheetnames), workbook.active.title
+    finally:
+        workbook.close()
+
+
+def sheet_has_formulas(path, sheet_name):
+    """
+    시트 XML에 수식(<f>) 태그가 있는지 압축을 풀면서 훑어봅니다 (셀을 해석하지 않음).
+    수식이 없는 시트는 수식 읽기를 건너뛰기 위한 용도이며, 확인할 수 없으면 True를 반환합니다.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+            sheets = list(root.iter(_SPREADSHEET_NS + "sheet"))
+            sheet = next((s for s in sheets if s.get("name") == sheet_name), None) if sheet_name else None
+            if sheet is None:
+                sheet = sheets[0]
+            rid = sheet.get(_RELATIONSHIP_NS + "id")
+            rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+            target = next(r.get("Target") for r in rels.iter(_PACKAGE_REL_NS + "Relationship")
+                          if r.get("Id") == rid)
+            member = target.lstrip("/") if target.startswith("/") else "xl/" + target
+            tail = b""
+            with archive.open(member) as f:
+                while True:
+                    chunk = f.read(256 * 1024)
+                    if not chunk:
+                        return False
+                    # 청크 경계에 걸친 태그도 찾도록 앞 청크의 끝부분을 붙여서 검색
+                    data = tail + chunk
+                    if b"<f>" in data or b"<f " in data:
+                        return True
+                    tail = data[-3:]
+    except (zipfile.BadZipFile, KeyError, StopIteration, IndexError, ElementTree.ParseError):
+        return True
+
+
+def _normalize_label(label):
+    """헤더 비교용 - 줄바꿈과 연속 공백을 하나의 공백으로"""
+    return " ".join(str(label).split())
+
+
+def header_fingerprint(headers):
+    """헤더 구성(회차 이름과 순서)의 지문"""
+    joined = "\x1f".join(_normalize_label(h) for h in headers)
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _row_identity(row):
+    """행을 구분하는 (반, 번호, 성명)"""
+    return tuple(row[i].strip() if i < len(row) else "" for i in IDENTITY_COLUMNS)
+
+
 class ScoreLogic:
-    def __init__(self):
-        # 각 파일별로 path, headers, student_data, dirty, row_range를 저장
-        self.files = []  # [{path, headers, student_data, dirty, row_range} ...]
+    def __init__(self, storage="memory", db_path=None, lazy_threshold=LAZY_COLUMN_THRESHOLD):
+        # 저장 엔진 - "memory"(기본)는 파일 dict만 사용하고, "sqlite"는 같은 내용을
+        # SQLite에도 기록해 검색/통계를 인덱스 쿼리로 처리 (학교 전체 명단용)
+        if storage not in ("memory", "sqlite"):
+            raise ValueError(f"지원하지 않는 저장 엔진입니다: {storage}")
+        self.storage = storage
+        self._store = SqliteStore(db_path or ":memory:") if storage == "sqlite" else None
+
+        # 넓은 시트의 회차 컬럼 지연 로딩 (None이면 항상 전체 컬럼을 읽음)
+        self.lazy_threshold = lazy_threshold
+        self._column_lock = threading.Lock()
+
+        # 동시 사용 - 데이터를 바꾸는 작업은 쓰기 잠금, 읽는 작업은 읽기 잠금을 잡음.
+        # 파일 읽기/쓰기처럼 오래 걸리는 일은 잠금 밖에서 하고 반영할 때만 잠금
+        self._lock = RWLock()
+        self._listeners = ()  # 변경 이벤트를 받을 함수 (등록할 때마다 새 튜플로 교체)
+
+        # 시트별로 path, sheet, headers, student_data, dirty, row_range를 저장
+        # (한 통합 문서의 여러 시트는 path가 같은 별도 항목, 처음 열 때 읽음)
+        # loaded_cols는 읽은 컬럼 집합이며 None이면 전체 컬럼을 읽은 상태
+        self.files = []  # [{path, sheet, headers, student_data, loaded_cols, dirty, row_range} ...]
+        self.sheet_catalog = {}  # path -> 통합 문서의 전체 시트 이름 목록
         self.row_to_file_idx = []  # 테이블의 각 row가 어느 파일에 속하는지 인덱스 매핑
+
+        # 헤더 스키마 정렬 - 학생 데이터는 기준 헤더(첫 파일 + 나중 파일의 새 회차)의
+        # 컬럼 순서로 보관하고, 시트별 col_map(기준 컬럼 -> 파일 컬럼)으로 읽기/저장 시 변환
+        self._canonical_headers = []
+        self._canonical_slots = {}  # 정규화한 헤더 이름 -> 같은 이름의 기준 컬럼 목록
+        self.schemas = {}  # 헤더 지문 -> {headers, col_map, identity}
         self._cached_headers = None  # 헤더 캐싱
         self._cached_student_data = None  # 학생 데이터 캐싱
         self._cache_dirty = True  # 캐시 무효화 플래그
+        self._identity = None  # 학생 식별 색인 (None이면 다음 조회 때 다시 만듦)
+        self.history = EditHistory()  # 점수 입력 실행 취소/다시 실행
+
+        # 회차별 점수 검증 규칙 - 회차 헤더 이름(정규화)으로 저장해 컬럼 순서가 다른 파일에도 적용
+        self._rules = {}  # 헤더 이름 -> 규칙 dict
+        self._rule_checks = {}  # 헤더 이름 -> 컴파일한 검사 함수
+
+        # 환산 총점 - 계산 방식도 회차 헤더 이름으로 저장하고, 총점은 처음 조회할 때 전체를
+        # 계산한 뒤 점수를 입력할 때마다 그 행만 다시 계산
+        self._grading = None  # 정규화한 계산 방식 dict
+        self._grade_weights = None  # {기준 컬럼: (weight, cap)} (None이면 다시 만듦)
+        self._grade_totals = None  # 데이터 row별 총점 (None이면 다음 조회 때 전체 계산)
+
+        # 정렬/필터 뷰 - 뷰 row와 데이터 row 사이의 순열 인덱스
+        self._sort_keys = {}  # 컬럼별 미리 계산된 정렬 키 {col: [key, ...]}
+        self._sort_spec = None  # (col, descending)
+        self._filter_spec = None  # (col, value)
+        self._view_order = None  # 뷰 row -> 데이터 row (None이면 원래 순서)
+        self._view_pos = None  # 데이터 row -> 뷰 row (필터로 숨겨진 row는 -1)
+
+    def subscribe(self, callback):
+        """
+        변경 이벤트를 받을 함수를 등록합니다. 이벤트는 {"type": CELL_CHANGED 등, ...} dict이며
+        변경한 스레드에서 잠금을 푼 뒤 호출됩니다.
+        반환값: 등록을 해제하는 함수
+        """
+        self._listeners = self._listeners + (callback,)
+
+        def unsubscribe():
+            self._listeners = tuple(c for c in self._listeners if c is not callback)
+        return unsubscribe
+
+    def _emit(self, event_type, **payload):
+        event = {"type": event_type, **payload}
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception:
+                pass  # 받는 쪽의 오류가 데이터 변경을 막지 않도록
 
     def _invalidate_cache(self):
         """캐시를 무효화합니다."""
         self._cached_headers = None
         self._cached_student_data = None
         self._cache_dirty = True
+        self._identity = None
+        self._grade_weights = None
+        self._grade_totals = None
+        self._sort_keys.clear()
+        self._rebuild_view()
 
-    def load_excel_data(self, file_path):
+    def load_excel_data(self, file_path, progress=None, cancel=None):
         """
         엑셀 파일을 불러와서 self.files에 추가하고, row_to_file_idx를 갱신합니다.
         """
-        if any(f['path'] == file_path for f in self.files):
-            return False, "이미 추가된 파일입니다."
+        _, success, message = self.load_excel_files([file_path], progress, cancel)[0]
+        return success, message
 
+    def load_excel_files(self, file_paths, progress=None, cancel=None):
+        """
+        여러 엑셀 파일을 읽어 한 번에 추가합니다.
+        파일 읽기는 잠금 밖에서 하고 모두 읽은 뒤 쓰기 잠금 안에서 함께 추가하므로,
+        도중에 취소하면 아무 파일도 추가되지 않습니다 (row_to_file_idx와 캐시는 그대로).
+        progress(dict)는 {"stage": "load", "path", "file_index", "file_count", "files_done",
+        "rows", "bytes", "total_bytes"}로 호출되고, cancel(CancelToken)은 LOAD_PROGRESS_ROWS행마다 확인합니다.
+        반환값: [(path, 성공 여부, 메시지)] - 취소하면 모든 파일이 LOAD_CANCELLED_MESSAGE
+        """
+        file_count = len(file_paths)
+        results = [None] * file_count
+        with self._lock.read():
+            seen = {f['path'] for f in self.files}
+
+        reads = []
         try:
-            # 메모리 효율적인 읽기
-            workbook = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
-            sheet = workbook.active
+            for index, path in enumerate(file_paths):
+                if path in seen:
+                    results[index] = (path, False, "이미 추가된 파일입니다.")
+                    continue
+                seen.add(path)
+                try:
+                    reads.append((index, path) + self._read_workbook(path, index, file_count, progress, cancel))
+                except OperationCancelled:
+                    raise
+                except Exception as e:
+                    results[index] = (path, False, f"엑셀 파일을 불러오는 중 오류가 발생했습니다:\n{e}")
+        except OperationCancelled:
+            return [(path, False, LOAD_CANCELLED_MESSAGE) for path in file_paths]
+
+        added = []
+        with self._lock.write():
+            if cancel is not None and cancel.is_cancelled():
+                return [(path, False, LOAD_CANCELLED_MESSAGE) for path in file_paths]
+            for index, path, fingerprint, sheet_names, active_sheet, unit in reads:
+                if any(f['path'] == path for f in self.files):
+                    results[index] = (path, False, "이미 추가된 파일입니다.")
+                    continue
+                try:
+                    self.sheet_catalog[path] = sheet_names
+                    headers, student_data, loaded_cols, formulas = unit
+                    added.append(self._add_unit(path, active_sheet, headers, student_data, loaded_cols,
+                                                fingerprint, formulas))
+                    results[index] = (path, True, "성공")
+                except Exception as e:
+                    results[index] = (path, False, f"엑셀 파일을 불러오는 중 오류가 발생했습니다:\n{e}")
+        for file in added:
+            self._emit(FILE_ADDED, file=file)
+        return results
+
+    def _read_workbook(self, path, file_index, file_count, progress=None, cancel=None):
+        """
+        통합 문서의 활성 시트를 읽습니다 (잠금 밖에서 호출).
+        반환값: (지문, 시트 목록, 활성 시트, _read_unit 결과)
+        """
+        total_bytes = os.path.getsize(path)
+
+        def report(rows, bytes_read, files_done=file_index):
+            if progress is not None:
+                progress({"stage": "load", "path": path, "file_index": file_index, "file_count": file_count,
+                          "files_done": files_done, "rows": rows, "bytes": bytes_read,
+                          "total_bytes": total_bytes})
+
+        if cancel is not None:
+            cancel.check()
+        report(0, 0)
+        # 외부 변경 감지를 위해 읽기 전 상태를 기록
+        fingerprint = file_fingerprint(path)
+        # 시트 목록만 먼저 확인하고, 활성 시트만 읽음 (나머지는 open_sheet에서)
+        sheet_names, active_sheet = list_sheets(path)
+        unit = self._read_unit(path, active_sheet, report if progress is not None else None, cancel)
+        report(len(unit[1]), total_bytes, file_index + 1)
+        return fingerprint, sheet_names, active_sheet, unit
+
+    def open_sheet(self, path, sheet_name):
+        """불러온 통합 문서의 다른 시트를 처음 열 때 읽어서 추가합니다."""
+        with self._lock.read():
+            if path not in self.sheet_catalog or sheet_name not in self.sheet_catalog[path]:
+                return False, "시트를 찾을 수 없습니다."
+            if self.find_unit(path, sheet_name) is not None:
+                return False, "이미 열린 시트입니다."
+        try:
+            fingerprint = file_fingerprint(path)
+            headers, student_data, loaded_cols, formulas = self._read_unit(path, sheet_name)
+            with self._lock.write():
+                if self.find_unit(path, sheet_name) is not None:
+                    return False, "이미 열린 시트입니다."
+                file = self._add_unit(path, sheet_name, headers, student_data, loaded_cols,
+                                      fingerprint, formulas)
+        except Exception as e:
+            return False, f"시트를 읽는 중 오류가 발생했습니다:\n{e}"
+        self._emit(FILE_ADDED, file=file)
+        return True, "성공"
+
+    def unopened_sheets(self, path):
+        """아직 열지 않은 시트 이름 목록을 반환합니다."""
+        opened = {f.get('sheet') for f in self.files if f['path'] == path}
+        return [name for name in self.sheet_catalog.get(path, []) if name not in opened]
+
+    def find_unit(self, path, sheet_name):
+        """(path, sheet)에 해당하는 항목을 반환합니다. 없으면 None"""
+        return next((f for f in self.files if f['path'] == path and f.get('sheet') == sheet_name), None)
+
+    def display_name(self, file):
+        """파일 목록 표시용 이름 - 시트가 여러 개인 통합 문서는 시트 이름을 붙입니다."""
+        name = QFileInfo(file['path']).fileName()
+        if file.get('sheet') and len(self.sheet_catalog.get(file['path'], ())) > 1:
+            return f"{name} [{file['sheet']}]"
+        return name
+
+    def _read_unit(self, path, sheet_name, progress=None, cancel=None):
+        """
+        시트의 데이터와 수식을 읽습니다. 수식이 있는 시트는 수식이 참조하는 회차를
+        계산할 수 있도록 지연 로딩하지 않고 전체 컬럼을 읽습니다.
+        반환값: (headers, student_data, loaded_cols, 수식 원본 또는 None)
+        """
+        has_formulas = sheet_has_formulas(path, sheet_name)
+        headers, student_data, loaded_cols = self._read_sheet(
+            path, sheet_name, lazy_threshold=None if has_formulas else self.lazy_threshold,
+            progress=progress, cancel=cancel)
+        if has_formulas and cancel is not None:
+            cancel.check()
+        formulas = self._read_formulas(path, sheet_name) if has_formulas else None
+        return headers, student_data, loaded_cols, formulas
+
+    def _add_unit(self, path, sheet_name, headers, student_data, loaded_cols, fingerprint, formulas=None):
+        """읽은 시트를 self.files 끝에 추가하고 반환합니다 (기존 row 번호는 그대로 유지)."""
+        schema = self._schema_for(headers)
+        student_data = self._to_canonical(student_data, schema)
+        if loaded_cols is not None:
+            loaded_cols = {c for c, f in enumerate(schema['col_map']) if f in loaded_cols}
+
+        # row_range 계산 최적화
+        start_row = sum(len(f['student_data']) for f in self.files)
+        end_row = start_row + len(student_data) - 1 if student_data else start_row
+
+        # 수식 계산과 저장 엔진 등록이 끝난 뒤에 self.files에 추가 (도중에 실패해도 반쯤 등록된 시트가 남지 않도록)
+        file = {
+            "path": path,
+            "sheet": sheet_name,
+            "headers": headers,  # 파일의 원래 헤더
+            "schema": schema['fingerprint'],
+            "col_map": schema['col_map'],
+            "student_data": student_data,  # 기준 헤더 순서
+            "loaded_cols": loaded_cols,
+            "dirty": False,
+            "dirty_cells": {},  # 수정한 셀 (file_row, col) -> 불러올 때의 값 (병합/충돌 판단용)
+            "fingerprint": fingerprint,
+            "row_range": (start_row, end_row)
+        }
+        self._attach_formulas(file, formulas)
+        if self._store is not None:
+            file['store_id'] = self._store.add_file(path, headers, student_data, sheet_name)
+        self.files.append(file)
+
+        self._update_row_to_file_idx_optimized()
+        self._invalidate_cache()
+        return file
+
+    def _schema_for(self, headers):
+        """
+        헤더의 스키마(기준 컬럼 -> 파일 컬럼 매핑)를 반환합니다. 같은 지문은 한 번만 계산합니다.
+        회차 컬럼은 이름으로 맞추고(같은 이름은 나온 순서대로), 기준에 없는 회차는
+        기준 헤더 끝에 추가합니다. 명단 컬럼(0~3)은 위치가 같습니다.
+        """
+        fingerprint = header_fingerprint(headers)
+        schema = self.schemas.get(fingerprint)
+        if schema is not None:
+            return schema
+
+        canonical = self._canonical_headers
+        if not canonical:
+            canonical.extend(headers)
+            for c_idx in range(len(ROSTER_COLUMNS), len(headers)):
+                self._canonical_slots.setdefault(self._slot_key(headers[c_idx], c_idx), []).append(c_idx)
+
+        col_map = list(range(min(len(headers), len(ROSTER_COLUMNS))))
+        col_map += [-1] * (len(ROSTER_COLUMNS) - len(col_map))
+        seen = defaultdict(int)
+        for f_idx in range(len(ROSTER_COLUMNS), len(headers)):
+            key = self._slot_key(headers[f_idx], f_idx)
+            slots = self._canonical_slots.setdefault(key, [])
+            occurrence = seen[key]
+            seen[key] += 1
+            if occurrence >= len(slots):
+                # 기준에 없는 회차 - 기준 헤더 끝에 추가
+                slots.append(len(canonical))
+                canonical.append(headers[f_idx])
+                self._cached_headers = None
+            c_idx = slots[occurrence]
+            if c_idx >= len(col_map):
+                col_map.extend([-1] * (c_idx - len(col_map) + 1))
+            col_map[c_idx] = f_idx
+
+        schema = {
+            "fingerprint": fingerprint,
+            "headers": list(headers),
+            "col_map": col_map,
+            "identity": col_map == list(range(len(headers))),
+        }
+        self.schemas[fingerprint] = schema
+        return schema
+
+    @staticmethod
+    def _slot_key(label, col):
+        """회차 이름 매칭 키 - 이름이 빈 컬럼은 위치로 맞춤"""
+        label = _normalize_label(label)
+        return label if label else f"#{col}"
+
+    @staticmethod
+    def _to_canonical(rows, schema):
+        """파일 순서의 행을 기준 헤더 순서로 바꿉니다 (순서가 같으면 그대로 반환)."""
+        if schema['identity']:
+            return rows
+        col_map = schema['col_map']
+        return [[row[f] if 0 <= f < len(row) else "" for f in col_map][:] for row in rows]
+
+    @staticmethod
+    def _file_col(file, col):
+        """기준 컬럼에 해당하는 파일 컬럼 (파일에 없으면 -1)"""
+        col_map = file.get('col_map')
+        if col_map is None:
+            return col  # 이전 스냅샷 호환
+        return col_map[col] if col < len(col_map) else -1
+
+    def schema_groups(self):
+        """헤더 지문별로 시트를 묶어 {지문: [file, ...]}으로 반환합니다."""
+        groups = defaultdict(list)
+        for file in self.files:
+            groups[file.get('schema')].append(file)
+        return dict(groups)
+
+    def schema_note(self, file):
+        """기준 헤더와 순서가 다르거나 빠진 회차가 있으면 설명을 반환합니다 (같으면 빈 문자열)."""
+        schema = self.schemas.get(file.get('schema'))
+        if schema is None or schema['identity']:
+            return ""
+        col_map = schema['col_map']
+        missing = [_normalize_label(self._canonical_headers[c])
+                   for c in range(len(ROSTER_COLUMNS), len(self._canonical_headers))
+                   if c >= len(col_map) or col_map[c] < 0]
+        note = "회차 컬럼 순서가 달라 회차 이름으로 맞췄습니다."
+        if missing:
+            note += f" 없는 회차: {', '.join(missing)}"
+        return note
+
+    @staticmethod
+    def _sheet_of(workbook, sheet_name):
+        """이름으로 시트를 찾습니다 (이름이 없으면 활성 시트 - 이전 스냅샷 호환)."""
+        return workbook[sheet_name] if sheet_name else workbook.active
+
+    @staticmethod
+    def _read_sheet(file_path, sheet_name=None, columns=None, lazy_threshold=None, progress=None, cancel=None):
+        """
+        시트의 헤더(1~2행)와 학생 데이터(4행부터)를 문자열로 읽습니다.
+        columns를 주면 그 컬럼만 읽고 나머지는 빈 칸으로 둡니다. columns가 없고 헤더가
+        lazy_threshold보다 넓으면 명단 컬럼만 읽습니다.
+        progress(읽은 행 수, 읽은 바이트 수)와 cancel 확인은 LOAD_PROGRESS_ROWS행마다 합니다.
+        반환값: (headers, student_data, 읽은 컬럼 집합 또는 전체면 None)
+        """
+        # 메모리 효율적인 읽기 (읽은 바이트 수를 알 수 있도록 파일을 직접 열어서 전달)
+        handle = open(file_path, "rb")
+        try:
+            workbook = openpyxl.load_workbook(handle, data_only=True, read_only=True)
+        except BaseException:
+            handle.close()
+            raise
+
+        def checkpoint(rows):
+            if cancel is not None:
+                cancel.check()
+            if progress is not None:
+                progress(rows, handle.tell())
+        if progress is None and cancel is None:
+            checkpoint = None
+        try:
+            sheet = ScoreLogic._sheet_of(workbook, sheet_name)
 
             # 헤더 최적화 - 한 번에 처리
             headers = []
@@ -41,6 +525,24 @@ class ScoreLogic:
                 row1 = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True))
                 headers = [str(cell) if cell is not None else "" for cell in row1]
 
+            if columns is None and lazy_threshold is not None and len(headers) > lazy_threshold:
+                columns = ROSTER_COLUMNS
+            loaded_cols = set(columns) if columns is not None else None
+
+            # 반/번호/점수처럼 여러 행에 반복되는 값은 intern해서 한 문자열 객체를 공유하고,
+            # 행은 여유 공간 없이 딱 맞는 크기의 리스트로 보관 ([...][:]는 정확한 크기로 복사)
+            intern = sys.intern
+            if loaded_cols is None:
+                def convert(row):
+                    return [intern(str(val)) if val is not None else "" for val in row][:]
+                rows_iter = sheet.iter_rows(min_row=4, values_only=True)
+            else:
+                # 필요한 컬럼까지만 가져오고, 그중 읽지 않을 컬럼은 빈 칸으로
+                def convert(row):
+                    return [intern(str(val)) if val is not None and c in loaded_cols else ""
+                            for c, val in enumerate(row)][:]
+                rows_iter = sheet.iter_rows(min_row=4, max_col=max(loaded_cols) + 1, values_only=True)
+
             # 학생 데이터 최적화 - 미리 할당된 리스트 사용
             student_data = []
             if sheet.max_row > 3:
@@ -48,73 +550,464 @@ class ScoreLogic:
                 expected_rows = sheet.max_row - 3
                 student_data = [None] * expected_rows
                 
-                for idx, row in enumerate(sheet.iter_rows(min_row=4, values_only=True)):
+                for idx, row in enumerate(rows_iter):
+                    if checkpoint is not None and idx % LOAD_PROGRESS_ROWS == 0 and idx:
+                        checkpoint(idx)
                     if idx < expected_rows:
-                        student_data[idx] = [str(val) if val is not None else "" for val in row]
+                        student_data[idx] = convert(row)
                     else:
-                        student_data.append([str(val) if val is not None else "" for val in row])
+                        student_data.append(convert(row))
                 
                 # None 제거
                 student_data = [row for row in student_data if row is not None]
+            return headers, student_data, loaded_cols
+        finally:
+            # 읽기 전용 모드는 파일 핸들을 계속 잡고 있으므로 명시적으로 닫기
+            workbook.close()
+            handle.close()
+
+    @staticmethod
+    def _read_formulas(file_path, sheet_name=None):
+        """
+        시트의 수식 셀과 1~3행(가중치 등)의 값을 읽습니다.
+        반환값: ({(엑셀 row, 엑셀 col): 수식 문자열}, {(엑셀 row, 엑셀 col): 1~3행 값})
+        """
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            sheet = ScoreLogic._sheet_of(workbook, sheet_name)
+            cells = {}
+            constants = {}
+            for r_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+                for c_idx, value in enumerate(row, start=1):
+                    if value is None:
+                        continue
+                    if isinstance(value, str) and value.startswith("="):
+                        if r_idx >= 4:
+                            cells[(r_idx, c_idx)] = value
+                    elif r_idx < 4:
+                        constants[(r_idx, c_idx)] = value if isinstance(value, (int, float)) else str(value)
+            return cells, constants
+        finally:
+            workbook.close()
+
+    # ------------------------------------------------------------------
+    # 수식 (합계/평균 컬럼) - 입력한 셀에 의존하는 수식만 다시 계산
+    # ------------------------------------------------------------------
+    def _attach_formulas(self, file, formulas):
+        """시트의 수식을 컴파일해 의존 그래프를 만들고 전체를 한 번 계산합니다."""
+        file.pop('formulas', None)
+        file.pop('formula_source', None)
+        if not formulas or not formulas[0]:
+            return []
+        cells, constants = formulas
+        col_map = file.get('col_map')
+        # 파일 컬럼 -> 기준 컬럼
+        to_canonical = ({f: c for c, f in enumerate(col_map) if f >= 0} if col_map is not None
+                        else None)
+
+        def locate(row, col):
+            if row < 4:
+                return ("const", constants.get((row, col)))
+            c_idx = col - 1 if to_canonical is None else to_canonical.get(col - 1)
+            if c_idx is None:
+                return ("const", None)
+            return (row - 4, c_idx)
+
+        sheet = FormulaSheet()
+        for (row, col), text in cells.items():
+            cell = locate(row, col)
+            if cell[0] == "const":
+                continue
+            try:
+                sheet.add(cell, compile_formula(text, locate))
+            except FormulaError:
+                sheet.add_fixed(cell)  # 지원하지 않는 수식은 파일의 값을 그대로 표시
+        file['formulas'] = sheet
+        file['formula_source'] = formulas
+        return self._recalculate(file, sheet.all_in_order())
+
+    def _recalculate(self, file, order):
+        """order 순서로 수식 셀을 계산해 값이 바뀐 (data_row, col) 목록을 반환합니다."""
+        sheet = file['formulas']
+        data = file['student_data']
+        base_row = file['row_range'][0]
+        store_id = file.get('store_id')
+
+        def get(cell):
+            r_idx, c_idx = cell
+            if 0 <= r_idx < len(data):
+                row = data[r_idx]
+                return row[c_idx] if c_idx < len(row) else None
+            return None
+
+        changed = []
+        for r_idx, c_idx in order:
+            formula = sheet.formulas.get((r_idx, c_idx))
+            if formula is None or r_idx >= len(data):
+                continue
+            value = format_result(formula.evaluate(get))
+            row = data[r_idx]
+            if c_idx >= len(row):
+                row.extend([""] * (c_idx - len(row) + 1))
+            if row[c_idx] == value:
+                continue
+            row[c_idx] = value
+            changed.append((base_row + r_idx, c_idx))
+            if self._store is not None and store_id is not None:
+                self._store.queue_update(store_id, r_idx, c_idx, value)
+            keys = self._sort_keys.get(c_idx)
+            if keys is not None and base_row + r_idx < len(keys):
+                keys[base_row + r_idx] = self._make_sort_key(value)
+        self._update_grade_totals(changed)
+        return changed
+
+    def is_formula_cell(self, row_idx, col):
+        """데이터 row의 컬럼이 수식 셀인지 반환합니다."""
+        if row_idx < 0 or row_idx >= len(self.row_to_file_idx):
+            return False
+        file = self.files[self.row_to_file_idx[row_idx]]
+        sheet = file.get('formulas')
+        return bool(sheet) and sheet.is_formula((row_idx - file['row_range'][0], col))
+
+    def ensure_columns(self, columns):
+        """
+        지연 로딩한 시트에서 아직 읽지 않은 columns(데이터 컬럼 인덱스)를 읽어 채웁니다.
+        행은 (반, 번호, 성명)이 같을 때만 채우며, 백그라운드 스레드에서 호출할 수 있습니다.
+        반환값: 새로 읽은 컬럼이 있으면 True
+        """
+        loaded_any = False
+        # 읽기 잠금(rw 잠금)을 가진 채 호출하면 안 됨 - 파일은 잠금 밖에서 읽고 반영할 때만 쓰기 잠금
+        with self._column_lock:
+            with self._lock.read():
+                targets = []
+                for file in self.files:
+                    loaded = file.get('loaded_cols')
+                    missing = set(columns) - loaded if loaded is not None else None
+                    if missing:
+                        # 파일에 없는 회차는 읽을 것 없이 읽은 것으로 처리
+                        targets.append((file, missing, {c_idx: self._file_col(file, c_idx) for c_idx in missing}))
+
+            for file, missing, file_cols in targets:
+                wanted = {f for f in file_cols.values() if f >= 0}
+                new_data = ()
+                if wanted:
+                    try:
+                        _, new_data, _ = self._read_sheet(file['path'], file.get('sheet'),
+                                                          columns=ROSTER_COLUMNS | wanted)
+                    except Exception:
+                        continue  # 읽을 수 없으면 다음에 다시 시도
+
+                with self._lock.write():
+                    if not self._is_open(file) or file.get('loaded_cols') is None:
+                        continue
+                    dirty_cells = file['dirty_cells']
+                    for r_idx, row in enumerate(file['student_data'] if wanted else ()):
+                        new_row = new_data[r_idx] if r_idx < len(new_data) else None
+                        if new_row is None or _row_identity(new_row) != _row_identity(row):
+                            continue
+                        for c_idx in missing:
+                            f_idx = file_cols[c_idx]
+                            value = new_row[f_idx] if 0 <= f_idx < len(new_row) else ""
+                            if value == "" or (r_idx, c_idx) in dirty_cells:
+                                continue
+                            if c_idx >= len(row):
+                                row.extend([""] * (c_idx - len(row) + 1))
+                            row[c_idx] = value
+                            if self._store is not None:
+                                self._store.queue_update(file['store_id'], r_idx, c_idx, value)
+                    file['loaded_cols'] = file['loaded_cols'] | missing
+                    for c_idx in missing:
+                        self._sort_keys.pop(c_idx, None)
+                    if self._grade_weights and missing & self._grade_weights.keys():
+                        self._grade_totals = None
+                loaded_any = True
+        return loaded_any
+
+    def is_file_changed(self, path):
+        """불러온(또는 마지막으로 저장한) 뒤 디스크의 파일이 바뀌었는지 확인합니다."""
+        with self._lock.read():
+            file = next((f for f in self.files if f['path'] == path), None)
+        return self._is_changed_on_disk(file) if file is not None else False
+
+    def reload_file(self, path):
+        """
+        디스크에서 바뀐 파일을 다시 읽어 차이만 반영합니다 (열려 있는 시트 모두).
+        저장하지 않은 로컬 수정은, 디스크에서 같은 셀이 바뀌지 않았다면 유지합니다.
+        반환값: {changed_cells: [(data_row, col)], conflicts: [(data_row, col)],
+                 structure_changed: bool} 또는 파일이 없으면 None
+        """
+        with self._lock.read():
+            units = [(f, f.get('sheet'), self._loaded_file_cols(f)) for f in self.files if f['path'] == path]
+        if not units:
+            return None
+
+        # 디스크 읽기는 잠금 밖에서 (읽는 동안에도 점수 입력 가능)
+        fingerprint = file_fingerprint(path)
+        sheet_names, _ = list_sheets(path)
+        reads = []
+        for file, sheet_name, file_cols in units:
+            if sheet_name and sheet_name not in sheet_names:
+                continue  # 시트가 사라졌으면 현재 데이터를 유지
+            headers, new_data, _ = self._read_sheet(path, sheet_name, columns=file_cols)
+            formulas = self._read_formulas(path, sheet_name) if sheet_has_formulas(path, sheet_name) else None
+            reads.append((file, file_cols, headers, new_data, formulas))
+
+        changed_cells = []
+        conflicts = []
+        structure_changed = False
+        with self._lock.write():
+            self.sheet_catalog[path] = sheet_names
+            for file, file_cols, headers, new_data, formulas in reads:
+                if not self._is_open(file):
+                    continue
+                if headers != file['headers']:
+                    # 헤더가 바뀌면 스키마를 다시 맞춤 (기준 헤더에 새 회차가 추가될 수 있음)
+                    schema = self._schema_for(headers)
+                    file['schema'] = schema['fingerprint']
+                    file['col_map'] = schema['col_map']
+                    if file_cols is not None:
+                        file['loaded_cols'] = {c for c, f in enumerate(schema['col_map']) if f in file_cols}
+                else:
+                    schema = self.schemas.get(file.get('schema')) or self._schema_for(headers)
+                new_data = self._to_canonical(new_data, schema)
+                if self._reload_unit(file, headers, new_data, changed_cells, conflicts):
+                    structure_changed = True
+                    self.history.forget(file)  # 행 번호가 바뀌어 기록을 적용할 수 없음
+                    # 뒤쪽 시트의 row 번호가 맞도록 바로 갱신
+                    self._update_row_ranges()
+                if formulas or file.get('formulas'):
+                    # 수식도 다시 계산 (디스크의 캐시 값 대신 계산한 값을 표시)
+                    changed_cells.extend(self._attach_formulas(file, formulas))
+                file['fingerprint'] = fingerprint
+                file['dirty'] = bool(file['dirty_cells'])
+
+            if structure_changed:
+                self._update_row_to_file_idx_optimized()
+                self._invalidate_cache()
+            else:
+                if any(col < len(ROSTER_COLUMNS) for _, col in changed_cells):
+                    self._identity = None  # 반/번호/성명이 바뀜
+                self._update_grade_totals(changed_cells)
+
+        if structure_changed:
+            self._emit(FILE_RELOADED, path=path)
+        elif changed_cells:
+            self._emit(CELL_CHANGED, cells=changed_cells)
+        return {"changed_cells": changed_cells, "conflicts": conflicts,
+                "structure_changed": structure_changed}
+
+    def _loaded_file_cols(self, file):
+        """다시 읽을 파일 컬럼 집합 (전체 컬럼을 읽은 시트면 None)"""
+        loaded = file.get('loaded_cols')
+        if loaded is None:
+            return None
+        return {f for f in (self._file_col(file, c) for c in loaded) if f >= 0} | ROSTER_COLUMNS
+
+    def _is_open(self, file):
+        """잠금 밖에서 읽는 동안 시트가 닫히지 않았는지 확인합니다."""
+        return any(f is file for f in self.files)
+
+    def _reload_unit(self, file, headers, new_data, changed_cells, conflicts):
+        """시트 하나에 다시 읽은 내용을 반영하고, 행 구조가 바뀌었으면 True를 반환합니다."""
+        old_data = file['student_data']
+        dirty_cells = file['dirty_cells']
+        structure_changed = headers != file['headers'] or len(new_data) != len(old_data)
 
-            # row_range 계산 최적화
-            start_row = sum(len(f['student_data']) for f in self.files)
-            end_row = start_row + len(student_data) - 1 if student_data else start_row
+        if not structure_changed:
+            # 같은 모양이면 행 객체를 그대로 두고 바뀐 셀만 갱신 (캐시/정렬 키 유지)
+            base_row = file['row_range'][0]
+            # 메모리의 값(입력한 숫자)과 다시 읽은 값(문자열)은 표현이 달라도 같은 값이면 변경이 아님
+            same = self._same_value
+            for r_idx, (old_row, new_row) in enumerate(zip(old_data, new_data)):
+                if self._same_row(old_row, new_row):
+                    continue
+                for c_idx in range(max(len(old_row), len(new_row))):
+                    new_value = new_row[c_idx] if c_idx < len(new_row) else ""
+                    old_value = old_row[c_idx] if c_idx < len(old_row) else ""
+                    key = (r_idx, c_idx)
+                    if key in dirty_cells:
+                        if same(new_value, dirty_cells[key]):
+                            continue  # 디스크는 그대로 - 로컬 수정 유지
+                        conflicts.append((base_row + r_idx, c_idx))
+                        del dirty_cells[key]
+                    if same(new_value, old_value):
+                        continue
+                    if c_idx >= len(old_row):
+                        old_row.extend([""] * (c_idx - len(old_row) + 1))
+                    old_row[c_idx] = new_value
+                    changed_cells.append((base_row + r_idx, c_idx))
+                    if self._store is not None:
+                        self._store.queue_update(file['store_id'], r_idx, c_idx, new_value)
+                    keys = self._sort_keys.get(c_idx)
+                    if keys is not None:
+                        keys[base_row + r_idx] = self._make_sort_key(new_value)
+            return False
 
-            self.files.append({
-                "path": file_path,
-                "headers": headers,
-                "student_data": student_data,
-                "dirty": False,
-                "row_range": (start_row, end_row)
-            })
+        # 행 수나 헤더가 바뀌면 (반, 번호, 성명)으로 행을 맞춰 로컬 수정을 옮김
+        new_index = {}
+        for r_idx, row in enumerate(new_data):
+            new_index.setdefault(_row_identity(row), r_idx)
+        moved = {}
+        for (r_idx, c_idx), original in dirty_cells.items():
+            new_r = new_index.get(_row_identity(old_data[r_idx]))
+            new_row = new_data[new_r] if new_r is not None else None
+            disk_value = (new_row[c_idx] if c_idx < len(new_row) else "") if new_row else None
+            if new_row is None or not self._same_value(disk_value, original):
+                conflicts.append((file['row_range'][0] + r_idx, c_idx))
+                continue
+            if c_idx >= len(new_row):
+                new_row.extend([""] * (c_idx - len(new_row) + 1))
+            new_row[c_idx] = old_data[r_idx][c_idx]
+            moved[(new_r, c_idx)] = original
+        file['headers'] = headers
+        file['student_data'] = new_data
+        file['dirty_cells'] = moved
+        if self._store is not None:
+            file['store_id'] = self._store.replace_file(file['store_id'], headers, new_data, file.get('sheet'))
+        return True
+
+    def save_snapshot(self, path, ui_state=None):
+        """현재 상태(파일, 헤더, 데이터, 수정 셀)와 UI 상태를 스냅샷으로 저장합니다."""
+        write_snapshot(path, self.files, ui_state or {}, self.sheet_catalog)
+
+    def restore_snapshot(self, path):
+        """
+        스냅샷에서 상태를 복원합니다. 원본 엑셀은 읽지 않으므로 바로 표시할 수 있고,
+        원본이 바뀌었는지는 check_source_files()로 나중에 확인합니다.
+        반환값: (성공 여부, UI 상태 dict 또는 오류 메시지)
+        """
+        try:
+            files, ui_state, sheet_catalog = read_snapshot(path)
+        except Exception as e:
+            return False, f"세션을 복원하는 중 오류가 발생했습니다:\n{e}"
 
+        with self._lock.write():
+            removed = self._clear_locked()
+            # 스냅샷의 데이터는 이미 기준 헤더 순서 - 같은 순서로 스키마를 다시 계산
+            for file in files:
+                schema = self._schema_for(file['headers'])
+                file['schema'] = schema['fingerprint']
+                file['col_map'] = schema['col_map']
+            self.files.extend(files)
+            self.sheet_catalog.update(sheet_catalog)
+            self._update_row_ranges()
+            for file in files:
+                self._attach_formulas(file, file.pop('formula_source', None))
+            if self._store is not None:
+                for file in files:
+                    file['store_id'] = self._store.add_file(file['path'], file['headers'], file['student_data'],
+                                                            file.get('sheet'))
             self._update_row_to_file_idx_optimized()
             self._invalidate_cache()
-            return True, "성공"
-        except Exception as e:
-            return False, f"엑셀 파일을 불러오는 중 오류가 발생했습니다:\n{e}"
+        for file in removed:
+            self._emit(FILE_REMOVED, file=file)
+        for file in files:
+            self._emit(FILE_ADDED, file=file)
+        return True, ui_state
+
+    def check_source_files(self):
+        """
+        모든 원본 파일의 상태를 확인합니다 (백그라운드 스레드에서 호출 가능).
+        반환값: {'changed': [path], 'missing': [path]}
+        """
+        # 같은 통합 문서의 시트는 경로별로 한 번만 확인
+        with self._lock.read():
+            files = list({f['path']: f for f in self.files}.values())
+        result = {"changed": [], "missing": []}
+        if not files:
+            return result
+        workers = min(SAVE_WORKERS * 2, len(files))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            exists = list(pool.map(lambda f: os.path.exists(f['path']), files))
+            changed = list(pool.map(self._is_changed_on_disk, files))
+        for file, file_exists, is_changed in zip(files, exists, changed):
+            if not file_exists:
+                result["missing"].append(file['path'])
+            elif is_changed:
+                result["changed"].append(file['path'])
+        return result
+
+    def _update_row_ranges(self):
+        """파일별 row_range를 다시 계산합니다."""
+        start_row = 0
+        for f in self.files:
+            count = len(f['student_data'])
+            f['row_range'] = (start_row, start_row + count - 1 if count else start_row)
+            start_row += count
 
     def _update_row_to_file_idx_optimized(self):
         """row_to_file_idx를 최적화하여 갱신합니다."""
         total_rows = sum(len(f['student_data']) for f in self.files)
-        self.row_to_file_idx = [0] * total_rows
-        
+        # 다 채운 뒤에 바꿔 끼움 (잠금 없이 읽는 쪽이 채우는 중인 목록을 보지 않도록)
+        row_to_file_idx = [0] * total_rows
+
         current_row = 0
         for idx, f in enumerate(self.files):
             rows_count = len(f['student_data'])
             for i in range(rows_count):
-                self.row_to_file_idx[current_row + i] = idx
+                row_to_file_idx[current_row + i] = idx
             current_row += rows_count
+        self.row_to_file_idx = row_to_file_idx
 
     @property
     def headers(self):
         """헤더를 캐싱하여 반환합니다."""
-        if self._cached_headers is None and self.files:
-            self._cached_headers = self.files[0]['headers']
-        return self._cached_headers or []
+        with self._lock.read():
+            if self._cached_headers is None and self.files:
+                self._cached_headers = list(self._canonical_headers)
+            return self._cached_headers or []
 
     @property
     def student_data(self):
-        """학생 데이터를 캐싱하여 반환합니다."""
-        if self._cached_student_data is None:
-            # 제너레이터 대신 리스트 컴프리헨션으로 한 번에 생성
-            all_data = []
-            for f in self.files:
-                all_data.extend(f['student_data'])
-            self._cached_student_data = all_data
-        return self._cached_student_data
+        """학생 데이터를 캐싱하여 반환합니다 (행 목록은 GUI 스레드에서만 순회하세요)."""
+        with self._lock.read():
+            if self._cached_student_data is None:
+                # 제너레이터 대신 리스트 컴프리헨션으로 한 번에 생성
+                all_data = []
+                for f in self.files:
+                    all_data.extend(f['student_data'])
+                self._cached_student_data = all_data
+            return self._cached_student_data
 
     def update_score(self, row_idx, session_idx, score):
-        """특정 테이블 row의 점수를 해당 파일의 데이터에 반영하고 dirty 표시"""
+        """
+        특정 테이블 row의 점수를 해당 파일의 데이터에 반영하고 dirty 표시
+        반환값: 반영했으면 True, 행이 없거나 그 파일에 해당 회차 컬럼이 없으면 False
+        """
+        # 아직 읽지 않은 회차면 먼저 읽어 원래 값을 확보 (잠금 밖에서)
+        target_col = session_idx + 4
+        with self._lock.read():
+            file = self._file_of_row(row_idx)
+            needs_column = (file is not None and file.get('loaded_cols') is not None
+                            and target_col not in file['loaded_cols'])
+        if needs_column:
+            self.ensure_columns([target_col])
+
+        with self._lock.write():
+            cells = self._apply_score(row_idx, session_idx, score)
+        if cells is None:
+            return False
+        self._emit(CELL_CHANGED, cells=cells)
+        return True
+
+    def _file_of_row(self, row_idx):
         if row_idx < 0 or row_idx >= len(self.row_to_file_idx):
-            return
-            
-        file_idx = self.row_to_file_idx[row_idx]
-        file = self.files[file_idx]
+            return None
+        return self.files[self.row_to_file_idx[row_idx]]
+
+    def _apply_score(self, row_idx, session_idx, score):
+        """
+        update_score 본체 (쓰기 잠금 안에서 호출).
+        반환값: 바뀐 (data_row, col) 목록 (입력한 셀과 다시 계산된 수식 셀), 반영하지 못했으면 None
+        """
+        file = self._file_of_row(row_idx)
+        if file is None:
+            return None
         file_row_idx = row_idx - file['row_range'][0]
         target_col = session_idx + 4
-        
+        if self._file_col(file, target_col) < 0:
+            return None  # 이 파일에는 없는 회차
+
         if 0 <= file_row_idx < len(file['student_data']):
             student_row = file['student_data'][file_row_idx]
             
@@ -131,70 +1024,1065 @@ class ScoreLogic:
                 except (ValueError, TypeError):
                     pass
                     
-            student_row[target_col] = score
+            # 처음 수정할 때의 원래 값을 기억 (외부 변경과의 충돌 판단용)
+            old_value = student_row[target_col]
+            file['dirty_cells'].setdefault((file_row_idx, target_col), old_value)
             file['dirty'] = True
-            
-            # 캐시된 데이터도 업데이트
-            if self._cached_student_data is not None:
-                self._cached_student_data[row_idx][target_col] = score
 
-    def save_to_excel(self):
+            # 수식 셀에 직접 입력하면 엑셀처럼 값이 수식을 대체
+            removed = None
+            formulas = file.get('formulas')
+            if formulas and formulas.is_formula((file_row_idx, target_col)):
+                removed = formulas.formulas.get((file_row_idx, target_col))
+                self._set_formula(file, file_row_idx, target_col, None)
+            self.history.record((file, file_row_idx, target_col, old_value, score, removed))
+            return [(row_idx, target_col)] + self._write_cell(file, file_row_idx, target_col, score)
+        return None
+
+    def _write_cell(self, file, file_row_idx, col, value):
         """
-        dirty가 True인 파일만 저장합니다.
+        셀 값을 바꾸고 저장 엔진, 캐시, 정렬 키를 함께 갱신한 뒤 이 셀을 참조하는
+        수식만 다시 계산합니다 (dirty 표시는 호출하는 쪽에서).
+        반환값: 수식 재계산으로 값이 바뀐 (data_row, col) 목록
         """
-        saved = 0
-        errors = []
-        
-        for file in self.files:
-            if not file['dirty']:
+        row = file['student_data'][file_row_idx]
+        if col >= len(row):
+            row.extend([""] * (col - len(row) + 1))
+        row[col] = value
+        if self._store is not None:
+            self._store.queue_update(file['store_id'], file_row_idx, col, value)
+
+        # 캐시된 데이터도 업데이트
+        data_row = file['row_range'][0] + file_row_idx
+        if self._cached_student_data is not None:
+            self._cached_student_data[data_row][col] = value
+
+        # 정렬 키는 해당 셀만 갱신 (입력 중에 행이 움직이지 않도록 재정렬은 하지 않음)
+        keys = self._sort_keys.get(col)
+        if keys is not None:
+            keys[data_row] = self._make_sort_key(value)
+
+        self._update_grade_totals([(data_row, col)])
+
+        formulas = file.get('formulas')
+        if not formulas:
+            return []
+        return self._recalculate(file, formulas.affected([(file_row_idx, col)]))
+
+    def _set_formula(self, file, file_row_idx, col, formula):
+        """셀의 수식을 바꿉니다 (None이면 제거). 스냅샷용 수식 원본도 함께 갱신합니다."""
+        sheet = file['formulas']
+        key = (file_row_idx + 4, self._file_col(file, col) + 1)
+        if formula is None:
+            sheet.remove((file_row_idx, col))
+            file['formula_source'][0].pop(key, None)
+        else:
+            sheet.add((file_row_idx, col), formula)
+            file['formula_source'][0][key] = formula.text
+
+    # ------------------------------------------------------------------
+    # 실행 취소/다시 실행
+    # ------------------------------------------------------------------
+    @contextmanager
+    def batch_edits(self):
+        """with 블록 안의 update_score를 실행 취소 한 단계로 묶습니다."""
+        self.history.begin()
+        try:
+            yield
+        finally:
+            self.history.end()
+
+    def can_undo(self):
+        return self.history.can_undo()
+
+    def can_redo(self):
+        return self.history.can_redo()
+
+    def undo(self):
+        """
+        마지막 입력(또는 묶음)을 되돌립니다.
+        반환값: 값이 바뀐 (data_row, col) 목록 (첫 항목이 되돌린 셀), 되돌릴 것이 없으면 None
+        """
+        with self._lock.write():
+            step = self.history.pop_undo()
+            cells = None if step is None else self._replay(reversed(step), undo=True)
+        if cells:
+            self._emit(CELL_CHANGED, cells=cells)
+        return cells
+
+    def redo(self):
+        """되돌린 입력을 다시 적용합니다. 반환값은 undo()와 같습니다."""
+        with self._lock.write():
+            step = self.history.pop_redo()
+            cells = None if step is None else self._replay(step, undo=False)
+        if cells:
+            self._emit(CELL_CHANGED, cells=cells)
+        return cells
+
+    def _replay(self, deltas, undo):
+        changed = []
+        recalculated = []
+        for file, file_row_idx, col, old_value, new_value, formula in deltas:
+            if not any(f is file for f in self.files) or file_row_idx >= len(file['student_data']):
                 continue
-                
+            value = old_value if undo else new_value
+            row = file['student_data'][file_row_idx]
+            current = row[col] if col < len(row) else ""
+
+            # 디스크의 값으로 돌아오면 수정 표시를 지움 (저장 후에 되돌리면 다시 수정 상태)
+            dirty_cells = file['dirty_cells']
+            original = dirty_cells.get((file_row_idx, col), current)
+            if self._same_value(value, original):
+                dirty_cells.pop((file_row_idx, col), None)
+            else:
+                dirty_cells[(file_row_idx, col)] = original
+            file['dirty'] = bool(dirty_cells)
+
+            changed.append((file['row_range'][0] + file_row_idx, col))
+            recalculated.extend(self._write_cell(file, file_row_idx, col, value))
+            if formula is not None and file.get('formulas') is not None:
+                # 입력으로 지운 수식을 되살리거나 다시 지움
+                self._set_formula(file, file_row_idx, col, formula if undo else None)
+                if undo:
+                    cell = (file_row_idx, col)
+                    recalculated.extend(self._recalculate(file, [cell] + file['formulas'].affected([cell])))
+        return changed + recalculated
+
+    @staticmethod
+    def _same_value(a, b):
+        """셀 값 비교 - 숫자와 숫자 문자열(35와 '35', '7.0'과 7)은 같은 값으로 봄"""
+        a = "" if a is None else str(a)
+        b = "" if b is None else str(b)
+        if a == b:
+            return True
+        try:
+            return float(a) == float(b)
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _same_row(a, b):
+        """행 비교 - 셀마다 _same_value로, 짧은 행의 나머지는 빈 칸으로 봄"""
+        if a == b:
+            return True
+        same = ScoreLogic._same_value
+        return all(same(a[i] if i < len(a) else "", b[i] if i < len(b) else "")
+                   for i in range(max(len(a), len(b))))
+
+    def check_external_changes(self):
+        """불러온 뒤 다른 곳에서 수정된 dirty 파일 목록을 반환합니다.
+
+        크기/수정 시각이 같으면 파일을 읽지 않고, 다를 때만 앞/뒤 구간 해시를
+        비교합니다. 느린 네트워크 드라이브를 고려해 파일별로 병렬 확인합니다.
+        """
+        with self._lock.read():
+            targets = [file for file in self.files if file['dirty'] and file.get('fingerprint')]
+        if not targets:
+            return []
+        workers = min(SAVE_WORKERS * 2, len(targets))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            changed = list(pool.map(self._is_changed_on_disk, targets))
+        return [file for file, is_changed in zip(targets, changed) if is_changed]
+
+    @staticmethod
+    def _is_changed_on_disk(file):
+        """기록한 지문과 디스크의 파일을 비교합니다. 파일이 없으면 변경 없음으로 봅니다."""
+        recorded = file['fingerprint']
+        try:
+            st = os.stat(file['path'])
+            if st.st_size == recorded['size'] and st.st_mtime_ns == recorded['mtime_ns']:
+                return False
+            current_hash = _fast_hash(file['path'], st.st_size)
+        except OSError:
+            return False
+        if current_hash == recorded['hash']:
+            # 수정 시각만 바뀐 경우 - 다음 확인을 위해 지문만 갱신
+            file['fingerprint'] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": current_hash}
+            return False
+        return True
+
+    def save_to_excel(self, merge_paths=(), progress=None, cancel=None, grades=False):
+        """
+        dirty가 True인 시트만 저장합니다.
+        같은 통합 문서의 시트는 한 번에 기록하고, 파일마다 임시 파일에 쓴 뒤 원본과
+        교체하며, 서로 다른 파일은 병렬로 저장합니다.
+        merge_paths에 있는 파일은 디스크의 최신 내용 위에 수정한 셀만 기록합니다.
+        progress(dict)는 파일 하나를 마칠 때마다 {"stage": "save", "path", "status", "files_done",
+        "file_count"}로 호출됩니다 (워커 스레드에서). cancel이 취소되면 아직 원본과 교체하지 않은
+        파일은 저장하지 않습니다 (원본과 수정 표시는 그대로).
+        grades가 True이면 수정하지 않은 시트도 포함해 모든 시트에 환산 총점/등급 컬럼을 기록합니다.
+        반환값: 파일별 결과 목록 [{path, status('saved'/'merged'/'failed'/'cancelled'), elapsed, error}]
+        """
+        grades = grades and self._prepare_grades()
+        groups = defaultdict(list)
+        with self._lock.read():
+            for file in self.files:
+                if file['dirty'] or grades:
+                    groups[file['path']].append(file)
+        if not groups:
+            return []
+
+        merge_paths = set(merge_paths)
+        workers = min(SAVE_WORKERS, len(groups))
+        done = [0]
+        done_lock = threading.Lock()
+
+        def save(item):
+            result = self._save_file(item[0], item[1], item[0] in merge_paths, cancel, grades)
+            if progress is not None:
+                with done_lock:
+                    done[0] += 1
+                    files_done = done[0]
+                progress({"stage": "save", "path": item[0], "status": result['status'],
+                          "files_done": files_done, "file_count": len(groups)})
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(save, list(groups.items())))
+
+    def _save_file(self, path, units, merge=False, cancel=None, grades=False):
+        """통합 문서 하나의 수정한 시트들을 저장하고 결과를 반환합니다 (워커 스레드에서 실행)."""
+        start = time.perf_counter()
+        try:
+            if cancel is not None:
+                cancel.check()
+            # 저장하는 동안에도 입력할 수 있도록 잠금 안에서 시트 내용을 복사해 두고 그 복사본을 기록
+            with self._lock.read():
+                views = [self._save_view(file) for file in units]
+                if grades:
+                    for file, view in zip(units, views):
+                        view['grades'] = self._file_grades(file)
+            workbook = openpyxl.load_workbook(path)
             try:
-                # 메모리 효율적인 저장
-                workbook = openpyxl.load_workbook(file['path'])
-                sheet = workbook.active
-                
-                # 배치 업데이트를 위한 데이터 준비
-                updates = []
-                for r_idx, row_data in enumerate(file['student_data']):
-                    for c_idx, cell_data in enumerate(row_data):
-                        value = cell_data
-                        # 숫자 변환 최적화
-                        if value and value != '':
-                            try:
-                                f_value = float(value)
-                                value = int(f_value) if f_value.is_integer() else f_value
-                            except (ValueError, TypeError):
-                                pass
-                        updates.append((r_idx + 4, c_idx + 1, value))
-                
-                # 배치로 셀 업데이트
-                for row_num, col_num, value in updates:
-                    cell = sheet.cell(row=row_num, column=col_num)
-                    cell.value = value
-                    if isinstance(value, (int, float)):
-                        cell.number_format = 'General'
-                
-                # 불필요한 행 삭제
-                if sheet.max_row > len(file['student_data']) + 3:
-                    sheet.delete_rows(len(file['student_data']) + 4, sheet.max_row)
-                
-                workbook.save(file['path'])
+                for view in views:
+                    sheet = self._sheet_of(workbook, view.get('sheet'))
+                    if merge:
+                        self._write_dirty_cells(sheet, view)
+                    elif view['dirty']:
+                        self._write_sheet(sheet, view)  # 수정하지 않은 시트에는 총점만 기록
+                    if grades:
+                        self._write_grade_columns(sheet, view)
+                # 원본과 교체하기 직전이 마지막 취소 지점
+                if cancel is not None:
+                    cancel.check()
+                self._atomic_save(workbook, path)
+            finally:
                 workbook.close()  # 명시적으로 닫기
-                file['dirty'] = False
-                saved += 1
-                
-            except Exception as e:
-                errors.append(f"{file['path']}: {e}")
-        
-        if errors:
-            return False, f"일부 파일 저장 실패:\n" + "\n".join(errors)
-        if saved == 0:
+            # 같은 파일의 다른 시트도 새 지문으로 갱신 (자기 저장을 외부 변경으로 보지 않도록)
+            fingerprint = file_fingerprint(path)
+            with self._lock.write():
+                for file, view in zip(units, views):
+                    self._finish_save(file, view, merge)
+                for file in self.files:
+                    if file['path'] == path:
+                        file['fingerprint'] = dict(fingerprint)
+            return {"path": path, "status": "merged" if merge else "saved",
+                    "elapsed": time.perf_counter() - start, "error": None}
+        except OperationCancelled:
+            return {"path": path, "status": "cancelled",
+                    "elapsed": time.perf_counter() - start, "error": None}
+        except Exception as e:
+            return {"path": path, "status": "failed",
+                    "elapsed": time.perf_counter() - start, "error": str(e)}
+
+    @staticmethod
+    def _save_view(file):
+        """저장용 복사본 - 행과 수정 셀 목록을 복사한 file dict (복사 시점의 내용을 기록)"""
+        view = dict(file)
+        view['student_data'] = [list(row) for row in file['student_data']]
+        view['dirty_cells'] = dict(file['dirty_cells'])
+        view['source_rows'] = file['student_data']
+        return view
+
+    def _finish_save(self, file, view, merge):
+        """
+        저장한 셀의 수정 표시를 지웁니다 (쓰기 잠금 안에서 호출).
+        저장하는 동안 다시 입력한 셀은, 저장한 값을 원래 값으로 삼아 수정 상태로 남깁니다.
+        """
+        if file['student_data'] is not view['source_rows']:
+            return  # 저장하는 동안 다시 읽어 행이 바뀜 - 수정 표시는 그대로 둠
+        saved_rows = view['student_data']
+        remaining = {}
+        for (r_idx, c_idx), original in file['dirty_cells'].items():
+            if merge and (r_idx, c_idx) not in view['dirty_cells']:
+                remaining[(r_idx, c_idx)] = original  # 기록하지 않은 셀
+                continue
+            saved = saved_rows[r_idx][c_idx] if r_idx < len(saved_rows) and c_idx < len(saved_rows[r_idx]) else ""
+            row = file['student_data'][r_idx]
+            current = row[c_idx] if c_idx < len(row) else ""
+            if not self._same_value(current, saved):
+                remaining[(r_idx, c_idx)] = saved
+        file['dirty_cells'] = remaining
+        file['dirty'] = bool(remaining)
+
+    @staticmethod
+    def _write_sheet(sheet, file):
+        """학생 데이터를 시트에 기록합니다 (읽지 않은 컬럼과 수식 셀은 건너뜀)."""
+        loaded_cols = file.get('loaded_cols')
+        # 수식 셀은 값으로 덮어쓰지 않고 파일의 수식을 그대로 둠
+        formulas = file.get('formulas')
+        # 배치 업데이트를 위한 데이터 준비
+        updates = []
+        col_map = file.get('col_map')
+        # 내보낸 환산 총점/등급 컬럼은 불러온 뒤의 옛 값으로 덮어쓰지 않음
+        exported = {f for f, h in enumerate(file.get('headers') or ()) if _normalize_label(h) in GRADE_HEADERS}
+        for r_idx, row_data in enumerate(file['student_data']):
+            for c_idx, cell_data in enumerate(row_data):
+                if loaded_cols is not None and c_idx not in loaded_cols:
+                    continue
+                if formulas and formulas.is_formula((r_idx, c_idx)):
+                    continue
+                # 기준 컬럼 -> 파일 컬럼 (파일에 없는 회차는 건너뜀)
+                f_idx = c_idx if col_map is None else (col_map[c_idx] if c_idx < len(col_map) else -1)
+                if f_idx < 0 or f_idx in exported:
+                    continue
+                value = cell_data
+                # 숫자 변환 최적화
+                if value and value != '':
+                    try:
+                        f_value = float(value)
+                        value = int(f_value) if f_value.is_integer() else f_value
+                    except (ValueError, TypeError):
+                        pass
+                updates.append((r_idx + 4, f_idx + 1, value))
+
+        # 배치로 셀 업데이트
+        for row_num, col_num, value in updates:
+            cell = sheet.cell(row=row_num, column=col_num)
+            cell.value = value
+            if isinstance(value, (int, float)):
+                cell.number_format = 'General'
+
+        # 읽지 않은 컬럼에 입력한 셀이 있으면 그 셀만 기록
+        if loaded_cols is not None:
+            ScoreLogic._write_dirty_cells(sheet, file)
+
+        # 불필요한 행 삭제
+        if sheet.max_row > len(file['student_data']) + 3:
+            sheet.delete_rows(len(file['student_data']) + 4, sheet.max_row)
+
+    @staticmethod
+    def _write_grade_columns(sheet, view):
+        """
+        환산 총점/등급을 1행 이름이 같은 컬럼에 기록합니다 (없으면 마지막 컬럼 뒤에 추가).
+        학생 데이터에 읽어 둔 같은 이름의 컬럼은 _write_sheet가 건너뛰므로 이 값이 남습니다.
+        """
+        header_cols = {}
+        for cell in next(sheet.iter_rows(min_row=1, max_row=1), ()):
+            if cell.value is not None:
+                header_cols.setdefault(_normalize_label(cell.value), cell.column)
+        next_col = sheet.max_column + 1
+        columns = []
+        for header in GRADE_HEADERS:
+            col = header_cols.get(header)
+            if col is None:
+                col = next_col
+                next_col += 1
+                sheet.cell(row=1, column=col).value = header
+            columns.append(col)
+
+        total_col, grade_col = columns
+        for r_idx, result in enumerate(view['grades']):
+            total, grade = result if result is not None else (None, None)
+            cell = sheet.cell(row=r_idx + 4, column=total_col)
+            cell.value = total
+            if total is not None:
+                cell.number_format = 'General'
+            sheet.cell(row=r_idx + 4, column=grade_col).value = grade
+
+    @staticmethod
+    def _write_dirty_cells(sheet, file):
+        """수정한 셀만 시트에 기록합니다 (다른 곳에서 바뀐 셀은 그대로 둠)."""
+        student_data = file['student_data']
+        for r_idx, c_idx in file['dirty_cells']:
+            f_idx = ScoreLogic._file_col(file, c_idx)
+            if f_idx < 0:
+                continue
+            value = student_data[r_idx][c_idx]
+            if value and value != '':
+                try:
+                    f_value = float(value)
+                    value = int(f_value) if f_value.is_integer() else f_value
+                except (ValueError, TypeError):
+                    pass
+            cell = sheet.cell(row=r_idx + 4, column=f_idx + 1)
+            cell.value = value
+            if isinstance(value, (int, float)):
+                cell.number_format = 'General'
+
+    @staticmethod
+    def _atomic_save(workbook, path):
+        """같은 폴더의 임시 파일에 저장하고 fsync 후 원본과 교체합니다.
+
+        저장 도중 실패해도 원본 파일은 그대로 남습니다.
+        """
+        atomic_write(path, ".xlsx", workbook.save)
+
+    @staticmethod
+    def summarize_save_results(results):
+        """save_to_excel 결과를 (성공 여부, 메시지)로 요약합니다."""
+        if not results:
             return False, "저장할 변경사항이 없습니다."
-        return True, f"{saved}개 파일에 변경 내용이 저장되었습니다."
+        failed = [r for r in results if r['status'] == "failed"]
+        cancelled = sum(1 for r in results if r['status'] == "cancelled")
+        saved = len(results) - len(failed) - cancelled
+        total_time = max(r['elapsed'] for r in results)
+        if failed:
+            lines = [f"{r['path']}: {r['error']}" for r in failed]
+            return False, (f"일부 파일 저장 실패 ({saved}개 저장, {len(failed)}개 실패):\n"
+                           + "\n".join(lines))
+        if cancelled:
+            return False, f"저장을 취소했습니다 ({saved}개 저장, {cancelled}개 저장하지 않음)."
+        merged = sum(1 for r in results if r['status'] == "merged")
+        merged_text = f" (그중 {merged}개는 최신 파일에 병합)" if merged else ""
+        return True, f"{saved}개 파일에 변경 내용이 저장되었습니다{merged_text}. ({total_time:.2f}초)"
 
     def clear_data(self):
         """데이터를 초기화합니다."""
+        with self._lock.write():
+            removed = self._clear_locked()
+        for file in removed:
+            self._emit(FILE_REMOVED, file=file)
+
+    def _clear_locked(self):
+        """clear_data 본체 (쓰기 잠금 안에서 호출). 닫은 시트 목록을 반환합니다."""
+        removed = list(self.files)
         self.files.clear()
-        self.row_to_file_idx.clear()
-        self._invalidate_cache()
\ No newline at end of file
+        self.sheet_catalog.clear()
+        self._canonical_headers = []
+        self._canonical_slots = {}
+        self.schemas.clear()
+        self.row_to_file_idx = []
+        self.history.clear()
+        if self._store is not None:
+            self._store.clear()
+        self._sort_spec = None
+        self._filter_spec = None
+        self._invalidate_cache()
+        return removed
+
+    # ------------------------------------------------------------------
+    # 검색/통계 (sqlite 엔진은 인덱스 쿼리, memory 엔진은 순회)
+    # ------------------------------------------------------------------
+    def find_students(self, number=None, name=None, class_name=None):
+        """번호/성명/반이 모두 일치하는 학생의 데이터 row 목록을 반환합니다 (None인 조건은 무시)."""
+        with self._lock.read():
+            if self._store is not None:
+                base_rows = {f['store_id']: f['row_range'][0] for f in self.files}
+                return [base_rows[file_id] + row_idx
+                        for file_id, row_idx in self._store.find_students(number, name, class_name)]
+
+            conditions = [(col, str(value).strip()) for col, value in ((1, class_name), (2, number), (3, name))
+                          if value is not None]
+            return [i for i, row in enumerate(self.student_data)
+                    if all((str(row[col]).strip() if col < len(row) else "") == value
+                           for col, value in conditions)]
+
+    # ------------------------------------------------------------------
+    # 학생 식별 색인 (이동반) - 여러 파일에 나오는 같은 학생을 (반, 번호, 성명)으로 찾음
+    # ------------------------------------------------------------------
+    @staticmethod
+    def identity_key(row):
+        """행의 (반, 번호, 성명) 키 (앞뒤 공백 제거)"""
+        return tuple(str(row[c]).strip() if c < len(row) else "" for c in IDENTITY_COLUMNS)
+
+    def _identity_index(self):
+        """
+        (반, 번호, 성명), (번호, 성명), 성명 -> 데이터 row 목록 색인 (읽기 잠금 안에서 호출).
+        행 구성이 바뀌면 _invalidate_cache에서 비우고 다음 조회 때 한 번 다시 만듭니다.
+        """
+        index = self._identity
+        if index is None:
+            full, by_number, by_name = defaultdict(list), defaultdict(list), defaultdict(list)
+            for data_row, row in enumerate(self.student_data):
+                key = self.identity_key(row)
+                if not key[2]:
+                    continue  # 이름이 없는 행 (빈 행, 합계 행 등)
+                full[key].append(data_row)
+                by_number[key[1:]].append(data_row)
+                by_name[key[2]].append(data_row)
+            index = self._identity = (dict(full), dict(by_number), dict(by_name))
+        return index
+
+    def lookup_student(self, name, number=None, class_name=None):
+        """
+        색인에서 학생의 데이터 row 목록을 찾습니다 (반/번호가 None이거나 비어 있으면 그 조건은 무시).
+        여러 개면 같은 학생이 여러 파일에 있거나 키가 모호한 경우입니다.
+        """
+        name = str(name).strip()
+        number = str(number).strip() if number is not None else ""
+        class_name = str(class_name).strip() if class_name is not None else ""
+        with self._lock.read():
+            full, by_number, by_name = self._identity_index()
+            if number and class_name:
+                return list(full.get((class_name, number, name), ()))
+            if number:
+                return list(by_number.get((number, name), ()))
+            rows = by_name.get(name, ())
+            if class_name:
+                student_data = self.student_data
+                rows = [r for r in rows if str(student_data[r][1]).strip() == class_name]
+            return list(rows)
+
+    def identity_report(self):
+        """
+        여러 행에 나오는 학생을 찾습니다.
+        반환값: {duplicates: {(반, 번호, 성명): [data_row, ...]} - 같은 키가 두 번 이상,
+                conflicts: {(반, 번호): [성명, ...]} - 같은 반/번호에 다른 이름}
+        """
+        with self._lock.read():
+            full, _, _ = self._identity_index()
+            duplicates = {key: list(rows) for key, rows in full.items() if len(rows) > 1}
+            names = defaultdict(set)
+            for class_name, number, name in full:
+                if number:
+                    names[(class_name, number)].add(name)
+        conflicts = {key: sorted(found) for key, found in names.items() if len(found) > 1}
+        return {"duplicates": duplicates, "conflicts": conflicts}
+
+    def student_label(self, data_row):
+        """학생을 '파일 반-번호 성명'으로 표시합니다 (여러 파일 중 고를 때 사용)."""
+        with self._lock.read():
+            file = self._file_of_row(data_row)
+            if file is None:
+                return ""
+            class_name, number, name = self.identity_key(self.student_data[data_row])
+            return f"{self.display_name(file)} {class_name}반 {number}번 {name}"
+
+    def session_statistics(self, session_idx):
+        """회차의 숫자 점수 통계 {count, mean, min, max}를 반환합니다 (점수가 없으면 None 값)."""
+        col = session_idx + 4
+        self.ensure_columns([col])
+        if self._store is not None:
+            return self._store.column_statistics(col)
+
+        count = 0
+        total = 0.0
+        minimum = maximum = None
+        with self._lock.read():
+            for row in self.student_data:
+                if col >= len(row) or row[col] == "":
+                    continue
+                try:
+                    value = float(row[col])
+                except (ValueError, TypeError):
+                    continue
+                count += 1
+                total += value
+                minimum = value if minimum is None else min(minimum, value)
+                maximum = value if maximum is None else max(maximum, value)
+        return {"count": count, "mean": total / count if count else None, "min": minimum, "max": maximum}
+
+    def session_count(self):
+        """헤더 기준 회차 수를 반환합니다."""
+        return max(0, len(self.headers) - 4)
+
+    def score_series(self, data_row):
+        """
+        학생 한 명의 회차별 점수를 희소 목록 [(회차 인덱스, 점수)]로 반환합니다.
+        빈 회차, 숫자가 아닌 값, 학생의 파일에 없거나 아직 읽지 않은 회차는 건너뜁니다.
+        """
+        with self._lock.read():
+            file = self._file_of_row(data_row)
+            if file is None:
+                return []
+            row = self.student_data[data_row]
+            loaded = file.get('loaded_cols')
+            points = []
+            for col in range(len(ROSTER_COLUMNS), len(row)):
+                value = row[col]
+                if value == "" or (loaded is not None and col not in loaded) or self._file_col(file, col) < 0:
+                    continue
+                if check_number(value):
+                    continue  # 숫자가 아니거나 inf/nan인 값
+                points.append((col - 4, float(value)))
+            return points
+
+    def export_data(self, path, fmt="csv", roster_cols=(1, 2, 3), sessions=None, progress=None):
+        """
+        불러온 모든 파일을 하나의 파일로 스트리밍 내보내기합니다 (백그라운드 스레드에서 호출 가능).
+        roster_cols: 명단 컬럼 (1=반, 2=번호, 3=성명), sessions: 회차 인덱스 목록 (None이면 전체)
+        반환값: (성공 여부, 메시지)
+        """
+        if not self.files:
+            return False, "내보낼 데이터가 없습니다."
+        if sessions is None:
+            sessions = range(self.session_count())
+        columns = list(roster_cols) + [s + 4 for s in sessions]
+        if not columns:
+            return False, "내보낼 컬럼을 선택하세요."
+        self.ensure_columns(columns)
+
+        headers = self.headers
+        header = [headers[c].replace("\n", " ") if c < len(headers) and headers[c] else f"{c - 3}회"
+                  for c in columns]
+
+        with self._lock.read():
+            files = list(self.files)
+
+        def rows():
+            for file in files:
+                if self._store is not None:
+                    yield from self._store.iter_rows(file['store_id'], columns)
+                    continue
+                # 파일 하나씩 잠금 안에서 필요한 컬럼만 복사한 뒤 잠금 밖에서 기록
+                # (반/번호/성명은 SQLite 엔진, 식별 색인과 같이 앞뒤 공백을 제거)
+                with self._lock.read():
+                    if not self._is_open(file):
+                        continue
+                    projected = [[(str(row[c]).strip() if c in IDENTITY_COLUMNS else row[c]) if c < len(row) else ""
+                                  for c in columns]
+                                 for row in file['student_data']]
+                yield from projected
+
+        try:
+            count = export_rows(path, fmt, header, rows(), progress)
+        except Exception as e:
+            return False, f"내보내는 중 오류가 발생했습니다:\n{e}"
+        return True, f"{count}명의 데이터를 내보냈습니다.\n{path}"
+
+    def report_jobs(self, directory):
+        """
+        시트마다 보고서 작업 dict를 만듭니다 (회차 컬럼을 모두 읽은 뒤 호출, core.report 참고).
+        성명이 빈 행과 시트에 없는 회차는 넣지 않고, 환산 총점 계산 방식이 있으면 총점/등급도 넣습니다.
+        """
+        generated = time.strftime("%Y-%m-%d %H:%M")
+        used = set()
+        jobs = []
+        with self._lock.read():
+            grading = self._grading
+            for file in self.files:
+                title = os.path.splitext(os.path.basename(file['path']))[0]
+                if file.get('sheet') and len(self.sheet_catalog.get(file['path'], ())) > 1:
+                    title += f" {file['sheet']}"
+                columns = [c for c in range(len(ROSTER_COLUMNS), len(self._canonical_headers))
+                           if self._file_col(file, c) >= 0 and self._session_label(c) not in GRADE_HEADERS]
+                grades = self._file_grades(file) if grading else [None] * len(file['student_data'])
+                rows = []
+                for row, grade in zip(file['student_data'], grades):
+                    if len(row) <= 3 or not str(row[3]).strip():
+                        continue
+                    total, band = grade if grade is not None else (None, None)
+                    rows.append([str(row[1]).strip(), str(row[2]).strip(), str(row[3]).strip(),
+                                 [row[c] if c < len(row) else "" for c in columns], total, band])
+                jobs.append({"path": os.path.join(directory, report_file_name(title, used)),
+                             "title": title, "source": self.display_name(file), "generated": generated,
+                             "sessions": [self._session_label(c) for c in columns], "rows": rows,
+                             "grades": [band for _, band in grading['bands']] if grading else None})
+        return jobs
+
+    def generate_reports(self, directory, progress=None, cancel=None, workers=None):
+        """
+        불러온 모든 시트의 반별 보고서(HTML)를 directory에 만듭니다 (백그라운드 스레드에서 호출).
+        보고서는 워커 프로세스에서 병렬로 렌더링합니다. progress/cancel은 core.report.generate_reports 참고.
+        directory가 없으면 만듭니다.
+        반환값: 시트별 결과 목록 [{path, source, status('done'/'failed'/'cancelled'), elapsed, error}]
+        """
+        with self._lock.read():
+            columns = list(range(len(ROSTER_COLUMNS), len(self._canonical_headers)))
+        self.ensure_columns(columns)
+        self._prepare_grades()
+        os.makedirs(directory, exist_ok=True)
+        return generate_reports(self.report_jobs(directory), workers, progress, cancel)
+
+    # ------------------------------------------------------------------
+    # 점수 검증 규칙
+    # ------------------------------------------------------------------
+    def _session_label(self, col):
+        headers = self._canonical_headers
+        return _normalize_label(headers[col]) if col < len(headers) else f"{col - 3}회"
+
+    def set_validation_rule(self, session_idx, rule):
+        """
+        회차의 검증 규칙을 설정합니다 (rule이 비어 있으면 해제).
+        rule: {"min", "max", "step", "allowed", "required"} 중 필요한 항목
+        반환값: (성공 여부, 메시지)
+        """
+        label = self._session_label(session_idx + 4)
+        try:
+            rule = normalize_rule(rule)
+        except (ValueError, TypeError) as e:
+            return False, f"검증 규칙이 올바르지 않습니다: {e}"
+        with self._lock.write():
+            if rule is None:
+                self._rules.pop(label, None)
+                self._rule_checks.pop(label, None)
+                return True, "검증 규칙을 해제했습니다."
+            self._rules[label] = rule
+            self._rule_checks[label] = compile_rule(rule)
+        return True, "검증 규칙을 설정했습니다."
+
+    def validation_rule(self, session_idx):
+        """회차의 검증 규칙 dict를 반환합니다 (없으면 None)."""
+        rule = self._rules.get(self._session_label(session_idx + 4))
+        return dict(rule) if rule else None
+
+    def validation_rules(self):
+        """설정 저장용 - {회차 이름: 규칙}"""
+        return {label: dict(rule) for label, rule in self._rules.items()}
+
+    def load_validation_rules(self, rules):
+        """저장해 둔 {회차 이름: 규칙}을 불러옵니다 (잘못된 규칙은 건너뜀)."""
+        compiled = {}
+        for label, rule in (rules or {}).items():
+            try:
+                rule = normalize_rule(rule)
+            except (ValueError, TypeError):
+                continue
+            if rule:
+                compiled[label] = (rule, compile_rule(rule))
+        with self._lock.write():
+            self._rules = {label: rule for label, (rule, _) in compiled.items()}
+            self._rule_checks = {label: check for label, (_, check) in compiled.items()}
+
+    def validate_score(self, session_idx, score):
+        """
+        점수를 검사해 위반 메시지를 반환합니다 (통과하면 None).
+        숫자가 아닌 값은 규칙이 없는 회차에서도 막고, 빈 칸은 규칙의 required만 확인합니다.
+        """
+        message = check_number(score)
+        if message:
+            return message
+        check = self._rule_checks.get(self._session_label(session_idx + 4))
+        return check(score) if check is not None else None
+
+    def update_scores(self, entries):
+        """
+        여러 점수를 한 번에 입력합니다 (붙여넣기/가져오기). 규칙을 통과한 항목만 반영하며
+        반영한 입력은 실행 취소 한 단계로 묶입니다.
+        entries: [(data_row, session_idx, score)]
+        반환값: (반영한 개수, 위반 목록 [(data_row, session_idx, score, 메시지)])
+        """
+        violations = []
+        accepted = []
+        for row_idx, session_idx, score in entries:
+            message = self.validate_score(session_idx, score)
+            if message:
+                violations.append((row_idx, session_idx, score, message))
+            else:
+                accepted.append((row_idx, session_idx, score))
+        if accepted:
+            self.ensure_columns({session_idx + 4 for _, session_idx, _ in accepted})
+
+        applied = 0
+        cells = []
+        with self._lock.write(), self.batch_edits():
+            for row_idx, session_idx, score in accepted:
+                changed = self._apply_score(row_idx, session_idx, score)
+                if changed is None:
+                    violations.append((row_idx, session_idx, score, "이 파일에는 없는 회차입니다."))
+                    continue
+                applied += 1
+                cells.extend(changed)
+        if cells:
+            self._emit(CELL_CHANGED, cells=cells)
+        return applied, violations
+
+    def validate_all(self):
+        """
+        불러온 모든 시트를 회차 규칙으로 검사합니다 (저장 전 확인용).
+        성명이 빈 행과 수식 셀은 검사하지 않습니다.
+        반환값: 파일/행 순서의 위반 목록 [{file, row(엑셀 행 번호), name, session, value, message}]
+        """
+        columns = {c: self._rule_checks[self._session_label(c)]
+                   for c in range(len(ROSTER_COLUMNS), len(self._canonical_headers))
+                   if self._session_label(c) in self._rule_checks}
+        if not columns:
+            return []
+        self.ensure_columns(list(columns))
+
+        violations = []
+        with self._lock.read():
+            for file in self.files:
+                data = file['student_data']
+                formulas = file.get('formulas')
+                rows = [r_idx for r_idx, row in enumerate(data) if len(row) > 3 and str(row[3]).strip()]
+                found = []
+                for col, check in columns.items():
+                    if self._file_col(file, col) < 0:
+                        continue
+                    values = [data[r][col] if col < len(data[r]) else "" for r in rows]
+                    for index, message in check_values(check, values):
+                        r_idx = rows[index]
+                        if formulas and formulas.is_formula((r_idx, col)):
+                            continue
+                        found.append((r_idx, col, values[index], message))
+                found.sort()
+                for r_idx, col, value, message in found:
+                    violations.append({"file": file, "row": r_idx + 4, "name": str(data[r_idx][3]).strip(),
+                                       "session": self._session_label(col), "value": value, "message": message})
+        return violations
+
+    # ------------------------------------------------------------------
+    # 환산 총점과 등급
+    # ------------------------------------------------------------------
+    def set_grading_scheme(self, scheme):
+        """
+        환산 총점 계산 방식을 설정합니다 (scheme이 비어 있으면 해제).
+        scheme: {"sessions": {회차 이름: {"weight", "cap"}}, "digits", "rounding", "bands"}
+        반환값: (성공 여부, 메시지)
+        """
+        try:
+            scheme = normalize_scheme(scheme)
+        except (ValueError, TypeError) as e:
+            return False, f"환산 총점 계산 방식이 올바르지 않습니다: {e}"
+        with self._lock.write():
+            self._grading = scheme
+            self._grade_weights = None
+            self._grade_totals = None
+        if scheme is None:
+            return True, "환산 총점 계산을 해제했습니다."
+        return True, f"{len(scheme['sessions'])}개 회차로 환산 총점을 계산합니다."
+
+    def grading_scheme(self):
+        """설정 저장용 - 정규화한 계산 방식 dict (없으면 None)"""
+        scheme = self._grading
+        if scheme is None:
+            return None
+        return {"sessions": {label: dict(item) for label, item in scheme['sessions'].items()},
+                "digits": scheme['digits'], "rounding": scheme['rounding'],
+                "bands": [list(band) for band in scheme['bands']]}
+
+    def _grade_weight_map(self):
+        """계산 방식의 회차 이름과 같은 기준 컬럼 {col: (weight, cap)} (내보낸 총점/등급 컬럼은 제외)"""
+        if self._grade_weights is None:
+            sessions = self._grading['sessions'] if self._grading else {}
+            weights = {}
+            for col in range(len(ROSTER_COLUMNS), len(self._canonical_headers)):
+                label = self._session_label(col)
+                if label in sessions and label not in GRADE_HEADERS:
+                    weights[col] = (sessions[label]['weight'], sessions[label]['cap'])
+            self._grade_weights = weights
+        return self._grade_weights
+
+    def _update_grade_totals(self, cells):
+        """바뀐 셀 중 가중치가 있는 컬럼의 행만 총점을 다시 계산합니다 (쓰기 잠금 안에서 호출)."""
+        totals = self._grade_totals
+        if totals is None or not cells:
+            return
+        weights = self._grade_weight_map()
+        rows = {r for r, c in cells if c in weights and r < len(totals)}
+        if not rows:
+            return
+        data = self.student_data
+        for data_row in rows:
+            totals[data_row] = row_total(data[data_row], weights)
+
+    def _grade_totals_locked(self):
+        """데이터 row별 총점 (없으면 회차 컬럼 단위로 전체 계산, 읽기 잠금 안에서 호출)"""
+        if self._grade_totals is None:
+            data = self.student_data
+            columns = [([row[col] if col < len(row) else "" for row in data], weight, cap)
+                       for col, (weight, cap) in self._grade_weight_map().items()]
+            self._grade_totals = compute_totals(columns, len(data))
+        return self._grade_totals
+
+    def _grade_of(self, row, total):
+        """성명이 있는 행의 (반올림한 총점, 등급), 없으면 None"""
+        if len(row) <= 3 or not str(row[3]).strip():
+            return None
+        scheme = self._grading
+        rounded = round_total(total, scheme['digits'], scheme['rounding'])
+        return rounded, grade_for(rounded, scheme['bands'])
+
+    def _prepare_grades(self, load=True):
+        """
+        계산에 필요한 회차 컬럼을 읽어 둡니다 (잠금 밖에서 호출).
+        계산 방식이 없거나, load가 False인데 읽지 않은 컬럼이 있으면 False
+        """
+        if self._grading is None:
+            return False
+        with self._lock.read():
+            columns = set(self._grade_weight_map())
+            missing = any(f.get('loaded_cols') is not None and columns - f['loaded_cols'] for f in self.files)
+        if missing:
+            if not load:
+                return False
+            self.ensure_columns(columns)
+        return True
+
+    def grade_results(self):
+        """
+        모든 학생의 환산 총점과 등급을 데이터 row 순서로 반환합니다.
+        반환값: [(총점, 등급) 또는 성명이 빈 행은 None], 계산 방식이 없으면 []
+        """
+        if not self._prepare_grades():
+            return []
+        with self._lock.read():
+            totals = self._grade_totals_locked()
+            return [self._grade_of(row, total) for row, total in zip(self.student_data, totals)]
+
+    def student_grade(self, data_row, load=True):
+        """
+        학생 한 명의 (환산 총점, 등급) (계산 방식이 없거나 성명이 빈 행이면 None).
+        load가 False이면 디스크를 읽지 않고, 읽지 않은 회차가 남아 있으면 None
+        """
+        if not self._prepare_grades(load):
+            return None
+        with self._lock.read():
+            if not 0 <= data_row < len(self.row_to_file_idx):
+                return None
+            total = self._grade_totals_locked()[data_row]
+            return self._grade_of(self.student_data[data_row], total)
+
+    def _file_grades(self, file):
+        """저장용 - 시트 한 장의 행별 (총점, 등급) 또는 None (읽기 잠금 안에서 호출)"""
+        totals = self._grade_totals_locked()
+        start = file['row_range'][0]
+        rows = file['student_data']
+        return [self._grade_of(row, total) for row, total in zip(rows, totals[start:start + len(rows)])]
+
+    def close(self):
+        """저장 엔진을 닫습니다."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+            self.storage = "memory"
+
+    # ------------------------------------------------------------------
+    # 메모리 사용량
+    # ------------------------------------------------------------------
+    def memory_report(self, top=10):
+        """
+        시트별, 자료 구조별 메모리 사용량을 반환합니다.
+        여러 시트가 공유하는 문자열(intern한 반/번호/점수)은 처음 나온 시트에만 포함되고,
+        자료 구조에는 시트 데이터와 공유하지 않는 부분만 포함됩니다.
+        반환값: {files: [{name, rows, data, total}], structures: {이름: 바이트}, total,
+                traced: tracemalloc 측정값 또는 None}
+        """
+        traced = traced_memory(top)  # 크기를 재는 동안의 할당이 섞이지 않도록 먼저 측정
+        seen = set()
+        files = []
+        with self._lock.read():
+            for file in self.files:
+                data = deep_size(file['student_data'], seen)
+                files.append({"name": self.display_name(file), "rows": len(file['student_data']),
+                              "data": data, "total": data + deep_size(file, seen)})
+            structures = {
+                "row_to_file_idx": deep_size(self.row_to_file_idx, seen),
+                "학생 데이터 캐시": deep_size(self._cached_student_data, seen),
+                "정렬/필터 뷰": deep_size((self._sort_keys, self._view_order, self._view_pos), seen),
+                "실행 취소 기록": deep_size(self.history, seen),
+                "헤더/스키마": deep_size((self._canonical_headers, self._canonical_slots, self.schemas,
+                                     self.sheet_catalog), seen),
+            }
+        total = sum(f['total'] for f in files) + sum(structures.values())
+        return {"files": files, "structures": structures, "total": total, "traced": traced}
+
+    # ------------------------------------------------------------------
+    # 정렬/필터 뷰
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _make_sort_key(value):
+        """숫자는 숫자 순서로, 빈 값은 항상 뒤로 가도록 정렬 키를 만듭니다."""
+        if value is None or value == "":
+            return (2, 0.0, "")
+        try:
+            return (0, float(value), "")
+        except (ValueError, TypeError):
+            return (1, 0.0, str(value).strip())
+
+    def _keys_for_column(self, col):
+        """컬럼의 정렬 키 목록을 한 번만 계산해 캐싱합니다."""
+        keys = self._sort_keys.get(col)
+        if keys is None:
+            make_key = self._make_sort_key
+            keys = [make_key(row[col] if col < len(row) else "") for row in self.student_data]
+            self._sort_keys[col] = keys
+        return keys
+
+    def _rebuild_view(self):
+        """현재 정렬/필터 조건으로 순열 인덱스를 다시 만듭니다."""
+        if self._sort_spec is None and self._filter_spec is None:
+            self._view_order = None
+            self._view_pos = None
+            return
+
+        total_rows = len(self.row_to_file_idx)
+        order = range(total_rows)
+
+        if self._filter_spec is not None:
+            col, value = self._filter_spec
+            data = self.student_data
+            order = [i for i in order
+                     if col < len(data[i]) and str(data[i][col]).strip() == value]
+
+        if self._sort_spec is not None:
+            col, descending = self._sort_spec
+            keys = self._keys_for_column(col)
+            # sorted는 안정 정렬이므로 같은 키는 원래 순서를 유지
+            order = sorted(order, key=keys.__getitem__, reverse=descending)
+            if descending:
+                # 내림차순에서도 숫자 -> 문자 -> 빈 값 순서는 유지
+                order = sorted(order, key=lambda i: keys[i][0])
+
+        order = list(order)
+        pos = [-1] * total_rows
+        for view_row, data_row in enumerate(order):
+            pos[data_row] = view_row
+        self._view_order = order
+        self._view_pos = pos
+
+    def sort_view(self, col, descending=False):
+        """데이터 컬럼 기준으로 뷰를 정렬합니다. col이 None이면 원래 순서로 되돌립니다."""
+        if col is not None:
+            self.ensure_columns([col])
+        with self._lock.write():
+            self._sort_spec = None if col is None else (col, descending)
+            self._rebuild_view()
+
+    def filter_view(self, col, value):
+        """데이터 컬럼 값이 value인 행만 보이도록 필터링합니다. value가 None이면 해제합니다."""
+        with self._lock.write():
+            self._filter_spec = None if value is None else (col, str(value).strip())
+            self._rebuild_view()
+
+    @property
+    def sort_spec(self):
+        return self._sort_spec
+
+    @property
+    def filter_spec(self):
+        return self._filter_spec
+
+    # 뷰 인덱스(row_to_file_idx, _view_order, _view_pos)는 제자리에서 고치지 않고 새 목록으로
+    # 바꿔 끼우므로, 아래 조회는 잠금 없이 참조를 한 번만 읽어 사용
+    def view_row_count(self):
+        """뷰에 보이는 행 수를 반환합니다."""
+        order = self._view_order
+        if order is None:
+            return len(self.row_to_file_idx)
+        return len(order)
+
+    def view_rows(self):
+        """뷰 순서대로 데이터 row 인덱스를 반환합니다."""
+        order = self._view_order
+        if order is None:
+            return range(len(self.row_to_file_idx))
+        return order
+
+    def view_to_data_row(self, view_row):
+        """뷰 row를 데이터 row로 변환합니다. 범위를 벗어나면 -1을 반환합니다."""
+        if view_row < 0:
+            return -1
+        order = self._view_order
+        if order is None:
+            return view_row if view_row < len(self.row_to_file_idx) else -1
+        return order[view_row] if view_row < len(order) else -1
+
+    def data_to_view_row(self, data_row):
+        """데이터 row를 뷰 row로 변환합니다. 필터로 숨겨졌으면 -1을 반환합니다."""
+        pos = self._view_pos
+        if data_row < 0 or data_row >= len(self.row_to_file_idx):
+            return -1
+        if pos is None:
+            return data_row
+        return pos[data_row] if data_row < len(pos) else -1
+
+    def distinct_values(self, col):
+        """컬럼의 고유 값을 정렬 순서대로 반환합니다 (필터 목록용)."""
+        self.ensure_columns([col])
+        with self._lock.read():
+            values = {str(row[col]).strip() for row in self.student_data if col < len(row)}
+        values.discard("")
+        return sorted(values, key=self._make_sort_key)
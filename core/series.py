@@ -0,0 +1,42 @@
+"""
+학생 한 명의 회차별 점수 추이
+
+점수는 빈 회차를 뺀 희소 목록 [(회차 인덱스, 점수)]로 다루므로 입력하지 않은 회차는
+계산에 들어가지 않습니다.
+"""
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def series_deltas(points):
+    """[(회차, 점수)] -> [(회차, 점수, 직전 점수 대비 변화 또는 None)]"""
+    result = []
+    previous = None
+    for session_idx, value in points:
+        result.append((session_idx, value, None if previous is None else value - previous))
+        previous = value
+    return result
+
+
+def series_trend(points):
+    """회차에 대한 점수의 최소제곱 기울기 (회차당 변화, 점수가 2개 미만이면 None)"""
+    n = len(points)
+    if n < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def sparkline(values):
+    """점수 목록을 막대 문자열로 표시합니다 (예: ▂▅█)."""
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_CHARS[len(SPARK_CHARS) // 2] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (high - low)
+    return "".join(SPARK_CHARS[round((v - low) * scale)] for v in values)
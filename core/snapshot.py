@@ -0,0 +1,164 @@
+"""
+채점 세션 스냅샷 - ScoreLogic 상태를 작은 바이너리 파일로 저장/복원합니다.
+
+형식 (리틀 엔디언):
+    MAGIC(4) | version(u16) | reserved(u16) | meta_len(u32) | meta(JSON, UTF-8)
+    | string_count(u32) | string_offsets(u32 * (string_count + 1)) | string_blob
+    | cells(u32 * 전체 셀 수) | row_lengths(u32 * 전체 행 수)
+
+셀 값은 모두 문자열 테이블의 인덱스로 저장되어 반, 빈칸처럼 반복되는 값은 한 번만
+기록됩니다. 복원은 한 번에 모두 읽는 방식입니다 - ScoreLogic은 모든 행을 리스트로 들고
+있어야 하므로, 파일을 한 번의 read()로 읽고 배열을 그대로 풀어 행을 만듭니다.
+같은 문자열은 객체 하나를 공유하므로 행 데이터의 크기는 엑셀에서 불러올 때와 같습니다.
+"""
+import json
+import os
+import struct
+import sys
+from array import array
+from core.atomic import atomic_write
+
+MAGIC = b"ISNP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHI")
+_COUNT = struct.Struct("<I")
+
+
+def default_snapshot_path():
+    """마지막 세션 스냅샷의 기본 위치"""
+    base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "InputScore", "last_session.isnp")
+
+
+def _u32_array(values):
+    arr = array("I", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def _read_u32(buffer, offset, count):
+    arr = array("I")
+    arr.frombytes(buffer[offset:offset + count * 4])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr, offset + count * 4
+
+
+def _formula_meta(source):
+    """수식 원본({(row, col): 수식}, {(row, col): 1~3행 값})을 JSON용 목록으로 바꿉니다."""
+    if not source:
+        return None
+    cells, constants = source
+    return {"cells": [[r, c, text] for (r, c), text in cells.items()],
+            "constants": [[r, c, value] for (r, c), value in constants.items()]}
+
+
+def write_snapshot(path, files, ui_state, sheet_catalog=None):
+    """파일 목록(ScoreLogic.files), 시트 목록과 UI 상태를 스냅샷으로 저장합니다 (임시 파일 후 교체)."""
+    strings = {}  # 값 -> 인덱스
+
+    def intern(value):
+        value = "" if value is None else str(value)
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    cells = []
+    row_lengths = []
+    meta_files = []
+    for f in files:
+        for row in f['student_data']:
+            row_lengths.append(len(row))
+            cells.extend(intern(value) for value in row)
+        meta_files.append({
+            "path": f['path'],
+            "sheet": f.get('sheet'),
+            "headers": f['headers'],
+            "rows": len(f['student_data']),
+            "loaded_cols": sorted(f['loaded_cols']) if f.get('loaded_cols') is not None else None,
+            "dirty": f['dirty'],
+            "dirty_cells": [[r, c, intern(original)] for (r, c), original in f['dirty_cells'].items()],
+            "fingerprint": f.get('fingerprint'),
+            "formulas": _formula_meta(f.get('formula_source')),
+        })
+
+    meta = json.dumps({"files": meta_files, "cell_count": len(cells), "ui": ui_state,
+                       "sheets": sheet_catalog or {}},
+                      ensure_ascii=False).encode("utf-8")
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    def write(out):
+        out.write(_HEADER.pack(MAGIC, VERSION, 0, len(meta)))
+        out.write(meta)
+        out.write(_COUNT.pack(len(encoded)))
+        _u32_array(offsets).tofile(out)
+        out.write(b"".join(encoded))
+        _u32_array(cells).tofile(out)
+        _u32_array(row_lengths).tofile(out)
+
+    atomic_write(path, ".isnp", write)
+
+
+def read_snapshot(path):
+    """스냅샷을 읽어 (files, ui_state, sheet_catalog)를 반환합니다 (모든 행을 한 번에 만듦).
+
+    files 항목은 ScoreLogic.files와 같은 형태이며 row_range는 호출하는 쪽에서 계산합니다.
+    """
+    with open(path, "rb") as f:
+        data = memoryview(f.read())
+    if len(data) < _HEADER.size:
+        raise ValueError("스냅샷 파일이 손상되었습니다.")
+    magic, version, _, meta_len = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("지원하지 않는 스냅샷 형식입니다.")
+    offset = _HEADER.size
+    meta = json.loads(bytes(data[offset:offset + meta_len]).decode("utf-8"))
+    offset += meta_len
+
+    (string_count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    string_offsets, offset = _read_u32(data, offset, string_count + 1)
+    blob_start = offset
+    strings = [sys.intern(str(data[blob_start + a:blob_start + b], "utf-8"))
+               for a, b in zip(string_offsets, string_offsets[1:])]
+    offset = blob_start + string_offsets[-1]
+
+    total_rows = sum(f['rows'] for f in meta['files'])
+    cells, offset = _read_u32(data, offset, meta['cell_count'])
+    row_lengths, offset = _read_u32(data, offset, total_rows)
+    if len(row_lengths) != total_rows or len(cells) != meta['cell_count']:
+        raise ValueError("스냅샷 파일이 손상되었습니다.")
+    data.release()
+
+    files = []
+    cell_pos = 0
+    row_pos = 0
+    for meta_file in meta['files']:
+        student_data = []
+        for length in row_lengths[row_pos:row_pos + meta_file['rows']]:
+            student_data.append([strings[i] for i in cells[cell_pos:cell_pos + length]])
+            cell_pos += length
+        row_pos += meta_file['rows']
+        files.append({
+            "path": meta_file['path'],
+            "sheet": meta_file.get('sheet'),
+            "headers": meta_file['headers'],
+            "student_data": student_data,
+            "loaded_cols": set(meta_file['loaded_cols']) if meta_file.get('loaded_cols') is not None else None,
+            "dirty": meta_file['dirty'],
+            "dirty_cells": {(r, c): strings[i] for r, c, i in meta_file['dirty_cells']},
+            "fingerprint": meta_file['fingerprint'],
+        })
+        formulas = meta_file.get('formulas')
+        if formulas:
+            files[-1]["formula_source"] = ({(r, c): text for r, c, text in formulas['cells']},
+                                           {(r, c): value for r, c, value in formulas['constants']})
+    return files, meta.get('ui', {}), meta.get('sheets', {})
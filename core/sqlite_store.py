@@ -0,0 +1,255 @@
+import json
+import sqlite3
+import threading
+
+# 이 개수만큼 쌓이면 한 트랜잭션으로 기록
+WRITE_BATCH_SIZE = 500
+
+# iter_rows가 한 번에 읽는 행 수
+ITER_BATCH_SIZE = 1000
+
+# 스키마가 바뀌면 올림 (다르면 테이블을 다시 만듦 - 데이터는 실행마다 다시 채우는 캐시)
+SCHEMA_VERSION = 2
+
+# 명단 컬럼 (반, 번호, 성명) - 나머지 컬럼은 scores 테이블에 희소 저장
+ROSTER_COLUMNS = (1, 2, 3)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    UNIQUE (path, sheet)
+);
+CREATE TABLE IF NOT EXISTS students (
+    file_id INTEGER NOT NULL,
+    row_idx INTEGER NOT NULL,
+    class TEXT NOT NULL,
+    number TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (file_id, row_idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_students_identity ON students (class, number, name);
+CREATE INDEX IF NOT EXISTS idx_students_number ON students (number);
+CREATE INDEX IF NOT EXISTS idx_students_name ON students (name);
+CREATE TABLE IF NOT EXISTS scores (
+    file_id INTEGER NOT NULL,
+    row_idx INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    num REAL,
+    PRIMARY KEY (file_id, row_idx, col)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scores_col ON scores (col, num);
+"""
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+class SqliteStore:
+    """명단과 점수를 SQLite에 보관하는 저장 엔진 (ScoreLogic(storage="sqlite")에서 사용)
+
+    명단(반, 번호, 성명)은 students 테이블에, 그 밖의 비어 있지 않은 셀은
+    scores 테이블에 (file_id, row_idx, col) 키로 희소 저장합니다.
+    점수 수정은 모아 두었다가 WRITE_BATCH_SIZE개 단위로 한 트랜잭션에 기록합니다.
+    """
+
+    def __init__(self, db_path=":memory:"):
+        self.db_path = db_path
+        # 저장/내보내기 워커 스레드에서도 사용하므로 잠금으로 직렬화
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        self._pending = {}  # (file_id, row_idx, col) -> value
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS scores; DROP TABLE IF EXISTS students; DROP TABLE IF EXISTS files;")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+            # 이전 실행에서 남은 데이터는 사용하지 않음
+            self._clear_tables()
+
+    def _clear_tables(self):
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM scores")
+        self._conn.execute("DELETE FROM students")
+        self._conn.execute("DELETE FROM files")
+        self._conn.execute("COMMIT")
+
+    def add_file(self, path, headers, rows, sheet=None):
+        """시트 하나의 명단과 점수를 한 트랜잭션으로 기록하고 file_id를 반환합니다."""
+        students = []
+        scores = []
+        for r_idx, row in enumerate(rows):
+            roster = [str(row[c]).strip() if c < len(row) else "" for c in ROSTER_COLUMNS]
+            students.append((r_idx, *roster))
+            for c_idx, value in enumerate(row):
+                if c_idx in ROSTER_COLUMNS or value == "" or value is None:
+                    continue
+                scores.append((r_idx, c_idx, str(value), _to_number(value)))
+
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO files (path, sheet, headers, row_count) VALUES (?, ?, ?, ?)",
+                    (path, sheet or "", json.dumps(headers, ensure_ascii=False), len(rows)))
+                file_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO students (file_id, row_idx, class, number, name) VALUES (?, ?, ?, ?, ?)",
+                    [(file_id, *s) for s in students])
+                conn.executemany(
+                    "INSERT INTO scores (file_id, row_idx, col, value, num) VALUES (?, ?, ?, ?, ?)",
+                    [(file_id, *s) for s in scores])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return file_id
+
+    def replace_file(self, file_id, headers, rows, sheet=None):
+        """시트의 내용을 통째로 다시 기록합니다 (다시 읽기 등). 새 file_id를 반환합니다."""
+        with self._lock:
+            path = self._conn.execute("SELECT path FROM files WHERE id = ?", (file_id,)).fetchone()[0]
+            self.remove_file(file_id)
+            return self.add_file(path, headers, rows, sheet)
+
+    def remove_file(self, file_id):
+        with self._lock:
+            self.flush()
+            conn = self._conn
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM scores WHERE file_id = ?", (file_id,))
+            conn.execute("DELETE FROM students WHERE file_id = ?", (file_id,))
+            conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            conn.execute("COMMIT")
+
+    def queue_update(self, file_id, row_idx, col, value):
+        """셀 수정을 대기열에 넣고, 충분히 쌓이면 한 번에 기록합니다."""
+        with self._lock:
+            self._pending[(file_id, row_idx, col)] = value
+            if len(self._pending) >= WRITE_BATCH_SIZE:
+                self.flush()
+
+    def flush(self):
+        """대기 중인 수정을 한 트랜잭션으로 기록합니다."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            upserts = []
+            deletes = []
+            roster_updates = []
+            for (file_id, row_idx, col), value in pending.items():
+                if col in ROSTER_COLUMNS:
+                    roster_updates.append((file_id, row_idx, col, "" if value is None else str(value).strip()))
+                elif value == "" or value is None:
+                    deletes.append((file_id, row_idx, col))
+                else:
+                    upserts.append((file_id, row_idx, col, str(value), _to_number(value)))
+
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scores (file_id, row_idx, col, value, num) VALUES (?, ?, ?, ?, ?)",
+                    upserts)
+                conn.executemany(
+                    "DELETE FROM scores WHERE file_id = ? AND row_idx = ? AND col = ?", deletes)
+                for file_id, row_idx, col, value in roster_updates:
+                    column = {1: "class", 2: "number", 3: "name"}[col]
+                    conn.execute(f"UPDATE students SET {column} = ? WHERE file_id = ? AND row_idx = ?",
+                                 (value, file_id, row_idx))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._clear_tables()
+
+    def find_students(self, number=None, name=None, class_name=None):
+        """조건에 맞는 학생의 (file_id, row_idx) 목록을 반환합니다 (인덱스 사용)."""
+        conditions = []
+        params = []
+        for column, value in (("class", class_name), ("number", number), ("name", name)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value).strip())
+        where = " AND ".join(conditions) if conditions else "1"
+        with self._lock:
+            self.flush()
+            return self._conn.execute(
+                f"SELECT file_id, row_idx FROM students WHERE {where} ORDER BY file_id, row_idx",
+                params).fetchall()
+
+    def column_statistics(self, col):
+        """컬럼의 숫자 값 통계 {count, mean, min, max}를 반환합니다."""
+        with self._lock:
+            self.flush()
+            count, mean, minimum, maximum = self._conn.execute(
+                "SELECT COUNT(num), AVG(num), MIN(num), MAX(num) FROM scores WHERE col = ? AND num IS NOT NULL",
+                (col,)).fetchone()
+        return {"count": count, "mean": mean, "min": minimum, "max": maximum}
+
+    def iter_rows(self, file_id, columns):
+        """
+        파일의 행을 row 순서대로 [columns 순서의 값 목록]으로 내보냅니다 (스트리밍).
+        ITER_BATCH_SIZE행씩 row_idx 순으로 읽어 바로 내보내며, 잠금은 각 묶음을 읽는 동안에만 잡습니다.
+        """
+        score_cols = [c for c in columns if c not in ROSTER_COLUMNS]
+        marks = ",".join("?" * len(score_cols))
+        roster_index = {1: 1, 2: 2, 3: 3}
+        with self._lock:
+            row_count = self._conn.execute(
+                "SELECT row_count FROM files WHERE id = ?", (file_id,)).fetchone()[0]
+
+        for start in range(0, row_count, ITER_BATCH_SIZE):
+            end = min(start + ITER_BATCH_SIZE, row_count)
+            with self._lock:
+                self.flush()
+                students = self._conn.execute(
+                    "SELECT row_idx, class, number, name FROM students "
+                    "WHERE file_id = ? AND row_idx >= ? AND row_idx < ? ORDER BY row_idx",
+                    (file_id, start, end)).fetchall()
+                scores = []
+                if score_cols:
+                    scores = self._conn.execute(
+                        f"SELECT row_idx, col, value FROM scores WHERE file_id = ? AND row_idx >= ? "
+                        f"AND row_idx < ? AND col IN ({marks}) ORDER BY row_idx",
+                        (file_id, start, end, *score_cols)).fetchall()
+
+            # 두 결과를 row_idx 순서로 합치며 한 행씩 내보냄
+            s_pos = 0
+            c_pos = 0
+            for row_idx in range(start, end):
+                if s_pos < len(students) and students[s_pos][0] == row_idx:
+                    student = students[s_pos]
+                    s_pos += 1
+                else:
+                    student = (row_idx, "", "", "")
+                row_scores = {}
+                while c_pos < len(scores) and scores[c_pos][0] == row_idx:
+                    row_scores[scores[c_pos][1]] = scores[c_pos][2]
+                    c_pos += 1
+                yield [student[roster_index[c]] if c in ROSTER_COLUMNS else row_scores.get(c, "")
+                       for c in columns]
+
+    def close(self):
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                self._conn.close()
@@ -0,0 +1,120 @@
+"""
+회차별 점수 검증 규칙
+
+규칙은 {"min", "max", "step", "allowed", "required"} dict이며 compile_rule()로 한 번만
+검사 함수로 만들어 둡니다. 검사 함수는 위반이면 메시지를, 통과하면 None을 반환합니다.
+규칙이 없는 회차도 check_number()로 숫자가 아닌 값(빈 칸 제외)은 막습니다.
+"""
+import math
+
+# 부동소수점 오차 허용 범위 (0.1 단위 등)
+_EPSILON = 1e-9
+
+NOT_NUMBER_MESSAGE = "숫자만 입력가능합니다."
+
+
+def check_number(value):
+    """빈 칸이 아닌데 숫자(유한한 값)가 아니면 메시지를, 아니면 None을 반환합니다."""
+    text = "" if value is None else str(value).strip()
+    if not text:
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        return NOT_NUMBER_MESSAGE
+    return None if math.isfinite(number) else NOT_NUMBER_MESSAGE
+
+
+def _as_float(value):
+    return float(value) if value is not None and value != "" else None
+
+
+def normalize_rule(rule):
+    """규칙 dict를 검사하고 빈 항목을 뺀 형태로 반환합니다 (규칙이 없으면 None). 잘못되면 ValueError"""
+    if not rule:
+        return None
+    minimum = _as_float(rule.get("min"))
+    maximum = _as_float(rule.get("max"))
+    step = _as_float(rule.get("step"))
+    allowed = [float(v) for v in rule.get("allowed") or ()]
+    required = bool(rule.get("required"))
+    if minimum is not None and maximum is not None and minimum > maximum:
+        raise ValueError("최솟값이 최댓값보다 큽니다.")
+    if step is not None and step <= 0:
+        raise ValueError("단위는 0보다 커야 합니다.")
+    normalized = {}
+    if minimum is not None:
+        normalized["min"] = minimum
+    if maximum is not None:
+        normalized["max"] = maximum
+    if step is not None:
+        normalized["step"] = step
+    if allowed:
+        normalized["allowed"] = sorted(set(allowed))
+    if required:
+        normalized["required"] = True
+    return normalized or None
+
+
+def _text(number):
+    return str(int(number)) if float(number).is_integer() else str(number)
+
+
+def compile_rule(rule):
+    """정규화한 규칙을 검사 함수 check(value) -> 메시지 또는 None으로 컴파일합니다."""
+    rule = normalize_rule(rule) or {}
+    checks = []
+    minimum, maximum = rule.get("min"), rule.get("max")
+    if minimum is not None and maximum is not None:
+        message = f"{_text(minimum)}~{_text(maximum)} 사이의 점수만 입력할 수 있습니다."
+        checks.append(lambda v: None if minimum - _EPSILON <= v <= maximum + _EPSILON else message)
+    elif minimum is not None:
+        message = f"{_text(minimum)} 이상의 점수만 입력할 수 있습니다."
+        checks.append(lambda v: None if v >= minimum - _EPSILON else message)
+    elif maximum is not None:
+        message = f"{_text(maximum)} 이하의 점수만 입력할 수 있습니다."
+        checks.append(lambda v: None if v <= maximum + _EPSILON else message)
+    if "step" in rule:
+        step = rule["step"]
+        base = minimum if minimum is not None else 0.0
+        step_message = f"{_text(step)} 단위로만 입력할 수 있습니다."
+
+        def check_step(v):
+            q = (v - base) / step
+            return None if abs(q - round(q)) <= _EPSILON * max(1.0, abs(q)) else step_message
+        checks.append(check_step)
+    if "allowed" in rule:
+        allowed = rule["allowed"]
+        allowed_message = f"입력할 수 있는 점수: {', '.join(_text(v) for v in allowed)}"
+        checks.append(lambda v: None if any(abs(v - a) <= _EPSILON for a in allowed) else allowed_message)
+    required = rule.get("required", False)
+
+    def check(value):
+        text = "" if value is None else str(value).strip()
+        if not text:
+            return "점수를 입력해야 합니다." if required else None
+        message = check_number(text)
+        if message:
+            return message
+        number = float(text)
+        for item in checks:
+            message = item(number)
+            if message:
+                return message
+        return None
+
+    return check
+
+
+def check_values(check, values):
+    """값 목록을 한 번에 검사해 [(인덱스, 메시지)]를 반환합니다 (같은 값은 한 번만 검사)."""
+    results = {}
+    violations = []
+    for index, value in enumerate(values):
+        key = "" if value is None else str(value).strip()
+        message = results.get(key, False)
+        if message is False:
+            message = results[key] = check(key)
+        if message:
+            violations.append((index, message))
+    return violations
@@ -1,12 +1,14 @@
 from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import QCoreApplication
-from ui.main_window import MainWindow
+from PySide6.QtCore import QCoreApplication, QSettings, QTimer
+from ui.main_window import MainWindow, RESTORE_ON_STARTUP_KEY
 from core.score_logic import ScoreLogic
 from services.tts_manager import TTSManager
 import sys
 import traceback
 import gc
+import os
 import atexit
+import multiprocessing
 
 def cleanup_resources():
     """애플리케이션 종료 시 리소스 정리"""
@@ -14,6 +16,10 @@ def cleanup_resources():
         # TTS 매니저 정리
         if hasattr(cleanup_resources, 'tts_manager'):
             cleanup_resources.tts_manager.stop()
+
+        # 저장 엔진 정리
+        if hasattr(cleanup_resources, 'logic'):
+            cleanup_resources.logic.close()
         
         # 가비지 컬렉션 강제 실행
         gc.collect()
@@ -40,11 +46,32 @@ def setup_application():
     
     return app
 
+def should_restore_session():
+    """마지막 세션 복원 여부 (--restore-session / --no-restore-session 옵션이 설정보다 우선)"""
+    if "--no-restore-session" in sys.argv:
+        return False
+    if "--restore-session" in sys.argv:
+        return True
+    return QSettings().value(RESTORE_ON_STARTUP_KEY, False, type=bool)
+
+def storage_options():
+    """저장 엔진 선택 (--storage=sqlite 이면 학교 전체 명단용 SQLite 엔진 사용)"""
+    storage = "memory"
+    for arg in sys.argv[1:]:
+        if arg.startswith("--storage="):
+            storage = arg.split("=", 1)[1]
+    if storage != "sqlite":
+        return {"storage": "memory"}
+    base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".config")
+    os.makedirs(os.path.join(base, "InputScore"), exist_ok=True)
+    return {"storage": "sqlite", "db_path": os.path.join(base, "InputScore", "roster.db")}
+
 def create_components():
     """컴포넌트 생성 및 초기화"""
     try:
         # 로직 컴포넌트 생성
-        logic = ScoreLogic()
+        logic = ScoreLogic(**storage_options())
+        cleanup_resources.logic = logic
         
         # TTS 매니저 생성 (싱글톤)
         tts = TTSManager()
@@ -83,6 +110,10 @@ def main():
         
         # 윈도우 표시
         window.show()
+
+        # 마지막 세션 복원 (창을 먼저 띄운 뒤 실행)
+        if should_restore_session():
+            QTimer.singleShot(0, lambda: window.restore_session_snapshot(quiet=True))
         
         # 초기 가비지 컬렉션
         gc.collect()
@@ -122,5 +153,7 @@ def main():
             pass
 
 if __name__ == "__main__":
+    # 반별 보고서의 워커 프로세스가 exe(PyInstaller)로 묶인 앱에서도 시작되도록
+    multiprocessing.freeze_support()
     exit_code = main()
     sys.exit(exit_code)
\ No newline at end of file
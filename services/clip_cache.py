@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+
+
+class ClipCache:
+    """미리 합성한 음성 클립(WAV 바이트)을 (text, rate) 키로 보관하는 LRU 캐시
+
+    전체 바이트 수가 max_bytes를 넘으면 가장 오래 사용하지 않은 클립부터 제거합니다.
+    워커 스레드와 워밍업 스레드가 함께 사용하므로 내부적으로 잠금을 사용합니다.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._clips = OrderedDict()  # (text, rate) -> bytes
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text, rate):
+        """클립을 반환합니다. 없으면 None"""
+        key = (text, rate)
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is not None:
+                self._clips.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return clip
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._clips
+
+    def put(self, text, rate, clip):
+        """클립을 저장하고 용량을 넘으면 오래된 클립을 제거합니다."""
+        if not clip or len(clip) > self.max_bytes:
+            return
+        key = (text, rate)
+        with self._lock:
+            old = self._clips.pop(key, None)
+            if old is not None:
+                self._total_bytes -= len(old)
+            self._clips[key] = clip
+            self._total_bytes += len(clip)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._clips.popitem(last=False)
+                self._total_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._clips.clear()
+            self._total_bytes = 0
+
+    def __len__(self):
+        return len(self._clips)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def stats(self):
+        """{size, bytes, max_bytes, hits, misses, evictions, hit_rate}를 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._clips),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,57 @@
+import os
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+
+class WorkbookWatcher(QObject):
+    """불러온 엑셀 파일의 변경을 감시하고, 짧은 시간에 몰린 이벤트를 한 번으로 묶어 알립니다.
+
+    저장 프로그램은 보통 임시 파일에 쓴 뒤 이름을 바꾸므로 감시 대상에서 빠지는데,
+    디바운스가 끝난 뒤 파일이 있으면 다시 감시 목록에 추가합니다.
+    """
+
+    fileChanged = Signal(str)
+
+    def __init__(self, debounce_ms=500, parent=None):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._pending = set()
+        self._paths = set()
+
+        # 디바운스 타이머 - 마지막 이벤트 후 debounce_ms 동안 조용하면 처리
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._flush)
+
+    def set_paths(self, paths):
+        """감시할 파일 목록을 교체합니다."""
+        paths = set(paths)
+        removed = self._paths - paths
+        if removed:
+            self._watcher.removePaths([p for p in removed if p in self._watcher.files()])
+        added = [p for p in paths - self._paths if os.path.exists(p)]
+        if added:
+            self._watcher.addPaths(added)
+        self._paths = paths
+        self._pending &= paths
+
+    def clear(self):
+        self.set_paths([])
+        self._timer.stop()
+
+    def _on_file_changed(self, path):
+        if path not in self._paths:
+            return
+        self._pending.add(path)
+        self._timer.start()  # 이벤트가 올 때마다 다시 시작
+
+    def _flush(self):
+        pending, self._pending = self._pending, set()
+        watched = set(self._watcher.files())
+        for path in sorted(pending):
+            # 이름 바꾸기로 교체된 파일은 감시 목록에서 빠지므로 다시 추가
+            if path not in watched and os.path.exists(path):
+                self._watcher.addPath(path)
+            if os.path.exists(path):
+                self.fileChanged.emit(path)
@@ -0,0 +1,280 @@
+from abc import ABC, abstractmethod
+import io
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+try:
+    import winsound  # 메모리 WAV 재생 (Windows 전용)
+except ImportError:
+    winsound = None
+
+# SAPI SpAudioFormat.Type - 22kHz 16bit mono
+SAPI_FORMAT_22KHZ_16BIT_MONO = 22
+CLIP_SAMPLE_RATE = 22050
+
+
+def pcm_to_wav(pcm, sample_rate=CLIP_SAMPLE_RATE):
+    """16bit mono PCM 바이트를 WAV 바이트로 감쌉니다."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class TTSMetrics:
+    """큐 대기/합성/재생 시간을 단계별로 집계합니다 (count, total, max, last)."""
+
+    STAGES = ("queue_wait", "synthesis", "playback")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {stage: [0, 0.0, 0.0, 0.0] for stage in self.STAGES}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            stat = self._stats.setdefault(stage, [0, 0.0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+            stat[3] = seconds
+
+    def summary(self):
+        """단계별 {count, total, avg, max, last} (초 단위)를 반환합니다."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": count,
+                    "total": total,
+                    "avg": total / count if count else 0.0,
+                    "max": max_value,
+                    "last": last,
+                }
+                for stage, (count, total, max_value, last) in self._stats.items()
+            }
+
+
+class TTSBackend(ABC):
+    """음성 엔진 인터페이스 - 합성(synthesize), 재생(play), 취소(cancel)
+
+    synthesize는 재생 가능한 클립(bytes)을 만들고, play는 재생이 끝나거나
+    cancel이 호출될 때까지 대기합니다. 시간 측정은 timed_* 래퍼가 담당합니다.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.metrics = TTSMetrics()
+
+    def thread_init(self):
+        """엔진을 사용할 새 스레드에서 한 번 호출됩니다."""
+        pass
+
+    @abstractmethod
+    def synthesize(self, text, rate=None):
+        """텍스트를 클립으로 합성합니다. 실패하면 None"""
+
+    @abstractmethod
+    def play(self, clip):
+        """클립을 재생합니다 (재생이 끝날 때까지 대기)."""
+
+    @abstractmethod
+    def cancel(self):
+        """재생 중인 음성을 중단합니다."""
+
+    def timed_synthesize(self, text, rate=None):
+        start = time.perf_counter()
+        clip = self.synthesize(text, rate)
+        self.metrics.record("synthesis", time.perf_counter() - start)
+        return clip
+
+    def timed_play(self, clip):
+        start = time.perf_counter()
+        self.play(clip)
+        self.metrics.record("playback", time.perf_counter() - start)
+
+    def close(self):
+        self.cancel()
+
+
+class SapiBackend(TTSBackend):
+    """Windows SAPI 엔진 - 메모리 스트림으로 합성하고 winsound로 재생합니다."""
+
+    name = "sapi"
+
+    def __init__(self):
+        super().__init__()
+        import win32com.client  # Windows 전용 - 사용 시점에 임포트
+        if winsound is None:
+            raise RuntimeError("winsound를 사용할 수 없습니다.")
+        self._client = win32com.client
+        # 엔진이 없는 환경이면 여기서 예외 발생
+        self._client.Dispatch("SAPI.SpVoice")
+        self._thread_local = threading.local()  # 스레드별 합성용 SpVoice
+
+    def thread_init(self):
+        """새 스레드에서 COM을 초기화합니다."""
+        try:
+            import pythoncom
+            pythoncom.CoInitialize()
+        except Exception:
+            pass
+
+    def _get_voice(self):
+        voice = getattr(self._thread_local, 'voice', None)
+        if voice is None:
+            voice = self._client.Dispatch("SAPI.SpVoice")
+            voice.Volume = 100
+            self._thread_local.voice = voice
+        return voice
+
+    def synthesize(self, text, rate=None):
+        voice = self._get_voice()
+        audio_format = self._client.Dispatch("SAPI.SpAudioFormat")
+        audio_format.Type = SAPI_FORMAT_22KHZ_16BIT_MONO
+        stream = self._client.Dispatch("SAPI.SpMemoryStream")
+        stream.Format = audio_format
+        voice.AudioOutputStream = stream
+        voice.Rate = rate if rate is not None else 0
+        voice.Speak(text)
+        pcm = bytes(stream.GetData())
+        return pcm_to_wav(pcm) if pcm else None
+
+    def play(self, clip):
+        winsound.PlaySound(clip, winsound.SND_MEMORY | winsound.SND_NODEFAULT)
+
+    def cancel(self):
+        try:
+            winsound.PlaySound(None, 0)
+        except Exception:
+            pass
+
+
+class OfflineBackend(TTSBackend):
+    """espeak-ng(또는 espeak)로 합성하고 aplay/paplay로 재생하는 로컬 엔진 (Linux용)"""
+
+    name = "offline"
+
+    SYNTH_COMMANDS = ("espeak-ng", "espeak")
+    PLAYER_COMMANDS = (("aplay", "-q", "-"), ("paplay",))
+    BASE_WPM = 175
+
+    def __init__(self, voice="ko"):
+        super().__init__()
+        self._synth = next((c for c in self.SYNTH_COMMANDS if shutil.which(c)), None)
+        if self._synth is None:
+            raise RuntimeError("espeak-ng/espeak를 찾을 수 없습니다.")
+        self._player = next((c for c in self.PLAYER_COMMANDS if shutil.which(c[0])), None)
+        self.voice = voice
+        self._process = None
+        self._process_lock = threading.Lock()
+
+    def synthesize(self, text, rate=None):
+        # SAPI 속도(-10~10)를 분당 단어 수로 근사 변환
+        wpm = int(self.BASE_WPM * (1.1 ** (rate or 0)))
+        result = subprocess.run(
+            [self._synth, "-v", self.voice, "-s", str(wpm), "--stdout", text],
+            capture_output=True, timeout=10,
+        )
+        return result.stdout or None
+
+    def play(self, clip):
+        if self._player is None:
+            return
+        with self._process_lock:
+            self._process = subprocess.Popen(
+                list(self._player), stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            process = self._process
+        try:
+            process.communicate(clip, timeout=30)
+        except (subprocess.TimeoutExpired, OSError):
+            process.kill()
+        finally:
+            with self._process_lock:
+                if self._process is process:
+                    self._process = None
+
+    def cancel(self):
+        with self._process_lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.terminate()
+
+
+class NullBackend(TTSBackend):
+    """소리를 내지 않는 엔진 - 음성 장치가 없는 환경이나 테스트용"""
+
+    name = "null"
+
+    def synthesize(self, text, rate=None):
+        return text.encode("utf-8")
+
+    def play(self, clip):
+        pass
+
+    def cancel(self):
+        pass
+
+
+class RecordingBackend(NullBackend):
+    """합성/재생/취소 호출을 기록하는 테스트·벤치마크용 엔진
+
+    synth_delay, play_delay로 실제 엔진의 지연을 흉내낼 수 있으며,
+    재생 중 cancel이 호출되면 남은 대기를 즉시 끝냅니다.
+    """
+
+    name = "recording"
+
+    def __init__(self, synth_delay=0.0, play_delay=0.0):
+        super().__init__()
+        self.synth_delay = synth_delay
+        self.play_delay = play_delay
+        self.events = []  # [(시각, 동작, 텍스트)]
+        self._cancelled = threading.Event()
+
+    def _record(self, action, text):
+        self.events.append((time.perf_counter(), action, text))
+
+    def synthesize(self, text, rate=None):
+        if self.synth_delay:
+            time.sleep(self.synth_delay)
+        self._record("synthesize", text)
+        return super().synthesize(text, rate)
+
+    def play(self, clip):
+        text = clip.decode("utf-8") if clip else ""
+        self._record("play", text)
+        self._cancelled.clear()
+        if self.play_delay and self._cancelled.wait(self.play_delay):
+            self._record("interrupted", text)
+
+    def cancel(self):
+        self._record("cancel", None)
+        self._cancelled.set()
+
+    def played(self):
+        """재생된 텍스트 목록"""
+        return [text for _, action, text in self.events if action == "play"]
+
+
+def create_default_backend():
+    """현재 플랫폼에서 사용할 수 있는 엔진을 선택합니다 (SAPI -> 오프라인 -> 무음)."""
+    candidates = [SapiBackend] if sys.platform == "win32" else []
+    candidates.append(OfflineBackend)
+    for backend_cls in candidates:
+        try:
+            return backend_cls()
+        except Exception:
+            continue
+    return NullBackend()
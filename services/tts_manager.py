@@ -1,184 +1,399 @@
 from abc import ABC, abstractmethod
-import win32com.client
 import time
 import threading
-from queue import Queue, Empty
 import re
 
+from services.clip_cache import ClipCache
+from services.lru_cache import LRUCache
+from services.tts_backends import TTSBackend, create_default_backend
+
+# 미리 합성해 둘 점수 문자열 (0~100, .5 단위)
+COMMON_SCORE_TEXTS = [str(i) for i in range(101)] + [f"{i}.5" for i in range(100)]
+
+# 발화 종류별 우선순위 (숫자가 작을수록 우선) - 점수 확인이 이름보다 먼저
+UTTERANCE_PRIORITY = {"score": 0, "name": 1}
+
+# 같은 종류의 같은 텍스트를 다시 읽지 않는 간격 (초)
+DEDUPE_INTERVAL = 0.3
+
+# 다음 학생 이름을 미리 합성하는 최대 개수
+PREFETCH_LIMIT = 3
+
+# 이름 -> 발음용 형태 캐시 크기 (한 학년 명단이 모두 들어가는 크기)
+NAME_CACHE_SIZE = 4096
+
 class ITTSManager(ABC):
     @abstractmethod
-    def speak_name(self, name: str):
+    def speak_name(self, name: str, rate=None):
+        pass
+
+    def speak_score(self, score: str, rate=None):
+        """점수를 읽습니다. 기본 구현은 speak_name과 같습니다."""
+        self.speak_name(score, rate=rate)
+
+    def warm_up(self, items):
+        """(텍스트, 속도) 목록을 미리 합성해 둡니다 (선택 구현)."""
+        pass
+
+    def prefetch(self, items):
+        """곧 읽을 (텍스트, 속도) 목록을 먼저 합성해 둡니다 (선택 구현)."""
+        pass
+
+    def cancel_prefetch(self):
+        pass
+
+    def get_metrics(self):
+        """큐 대기/합성/재생 시간 통계를 반환합니다 (선택 구현)."""
+        return {}
+
+    def preload_names(self, names):
+        """명단의 이름을 발음용 형태로 미리 변환해 둡니다 (선택 구현)."""
+        pass
+
+    def get_cache_stats(self):
+        """캐시 적중/미스/제거 통계를 반환합니다 (선택 구현)."""
+        return {}
+
+    def stop(self):
         pass
 
 class TTSManager(ITTSManager):
     _instance = None
     _lock = threading.Lock()
-    
-    def __new__(cls):
+
+    def __new__(cls, backend=None):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
                     cls._instance._initialized = False
         return cls._instance
-    
-    def __init__(self):
+
+    def __init__(self, backend: TTSBackend = None):
         if self._initialized:
             return
-            
+
         self._initialized = True
-        self.speaker = None
-        self.last_speak_time = 0
-        self.last_spoken_name = None
-        
-        # 성능 최적화를 위한 변수들
-        self._tts_queue = Queue(maxsize=5)  # TTS 큐 크기 제한
+        self.backend = None
+
+        # 최신 요청 우선 스케줄러 - 발화 종류마다 대기 슬롯은 하나뿐이라
+        # 새 요청이 오면 이전(오래된) 요청은 버려집니다.
+        self._cond = threading.Condition()
+        self._pending = {}  # kind -> (text, rate, 요청 시각)
+        self._current_kind = None  # 재생 중인 발화 종류
+        self._last_spoken = {}  # kind -> (text, 시각) - 종류별 중복 제거
         self._worker_thread = None
         self._is_running = False
-        self._name_cache = {}  # 이름 처리 결과 캐싱
+        self._name_cache = LRUCache(maxsize=NAME_CACHE_SIZE)  # 이름 -> 발음용 형태
         self._english_pattern = re.compile(r'[a-zA-Z]')  # 영어 패턴 컴파일
-        
-        self.setup()
-    
-    def setup(self):
-        """TTS 엔진을 초기화합니다."""
+        self._number_pattern = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)')  # 숫자 패턴
+
+        # 미리 합성한 음성 클립 캐시 - 합성 지연 없이 바로 재생
+        self._clip_cache = ClipCache()
+        self._warmup_generation = 0
+        self._inflight = {}  # 합성 중인 (text, rate) -> threading.Event
+        self._inflight_lock = threading.Lock()  # 재생/워밍업/선합성 스레드가 함께 사용
+
+        # 다음 학생 이름 선합성 - 새 힌트가 오면 이전 힌트는 버려집니다.
+        self._prefetch_cond = threading.Condition()
+        self._prefetch_items = []
+        self._prefetch_thread = None
+
+        self.setup(backend)
+
+    def setup(self, backend=None):
+        """TTS 엔진을 초기화합니다. backend가 없으면 플랫폼에 맞는 엔진을 고릅니다."""
         try:
-            self.speaker = win32com.client.Dispatch("SAPI.SpVoice")
-            # 음성 속성 설정
-            self.speaker.Rate = 0  # 음성 속도 (기본값)
-            self.speaker.Volume = 100  # 음량 최대
-            
+            self.backend = backend if backend is not None else create_default_backend()
+
             # 워커 스레드 시작
             self._start_worker_thread()
-            
+
         except Exception as e:
-            self.speaker = None
-    
+            self.backend = None
+
+    def set_backend(self, backend: TTSBackend):
+        """음성 엔진을 교체합니다 (테스트/벤치마크용). 캐시된 클립은 버립니다."""
+        if self.backend is not None:
+            self.backend.cancel()
+        self._warmup_generation += 1
+        self._clip_cache.clear()
+        self.backend = backend
+        with self._cond:
+            self._last_spoken.clear()
+        self._start_worker_thread()
+
     def _start_worker_thread(self):
         """TTS 처리를 위한 워커 스레드를 시작합니다."""
         if self._worker_thread is None or not self._worker_thread.is_alive():
-            self._is_running = True
+            with self._cond:
+                self._is_running = True
             self._worker_thread = threading.Thread(target=self._tts_worker, daemon=True)
             self._worker_thread.start()
-    
+
     def _tts_worker(self):
-        """TTS 작업을 처리하는 워커 스레드"""
-        while self._is_running:
+        """TTS 작업을 처리하는 워커 스레드 - 요청이 없으면 깨어나지 않고 대기합니다."""
+        backend = None
+        while True:
+            with self._cond:
+                while self._is_running and not self._pending:
+                    self._cond.wait()
+                if not self._is_running:
+                    return
+                kind = min(self._pending, key=UTTERANCE_PRIORITY.__getitem__)
+                text, rate, request_time = self._pending.pop(kind)
+                self._current_kind = kind
+
             try:
-                (name, rate), current_time = self._tts_queue.get(timeout=0.1)
-                # 중복 제거 - 큐에서 가져온 후 다시 확인
-                if (self.last_spoken_name == name and 
-                    current_time - self.last_speak_time < 0.3):
-                    self._tts_queue.task_done()
+                # 엔진이 바뀌었으면 이 스레드에서 다시 초기화
+                if backend is not self.backend:
+                    backend = self.backend
+                    if backend is not None:
+                        backend.thread_init()
+                if backend is None:
+                    continue
+                backend.metrics.record("queue_wait", time.time() - request_time)
+
+                to_speak = self._process_name_for_speech(text)
+                if not to_speak:
+                    continue
+                clip = self._get_clip(backend, to_speak, rate)
+                # 합성하는 동안 더 새로운 요청이 왔으면 재생하지 않음
+                if clip is None or self._is_superseded(kind):
                     continue
-                
-                # TTS 처리
-                if self.speaker:
-                    to_speak = self._process_name_for_speech(name)
-                    if to_speak:
-                        try:
-                            original_rate = self.speaker.Rate
-                            if rate is not None:
-                                self.speaker.Rate = rate
-                            self.speaker.Speak(to_speak)
-                            self.speaker.Rate = original_rate
-                            self.last_speak_time = current_time
-                            self.last_spoken_name = name
-                        except Exception:
-                            pass
-                
-                self._tts_queue.task_done()
-                
-            except Empty:
-                # 타임아웃 - 계속 대기
+                with self._cond:
+                    self._last_spoken[kind] = (text, time.time())
+                backend.timed_play(clip)
+            except Exception:
+                # 오류는 무시하고 다음 요청 처리
+                pass
+            finally:
+                with self._cond:
+                    self._current_kind = None
+
+    def _is_superseded(self, kind):
+        """kind보다 우선순위가 같거나 높은 새 요청이 대기 중인지 확인합니다."""
+        priority = UTTERANCE_PRIORITY[kind]
+        with self._cond:
+            return any(UTTERANCE_PRIORITY[k] <= priority for k in self._pending)
+
+    def _get_clip(self, backend, to_speak, rate):
+        """캐시된 클립을 반환하고, 없으면 합성해서 캐시에 넣습니다.
+
+        같은 클립을 선합성 스레드가 만들고 있으면 중복 합성하지 않고 기다립니다.
+        """
+        clip = self._clip_cache.get(to_speak, rate)
+        if clip is not None:
+            return clip
+        with self._inflight_lock:
+            inflight = self._inflight.get((to_speak, rate))
+        if inflight is not None and inflight.wait(timeout=2.0):
+            clip = self._clip_cache.get(to_speak, rate)
+            if clip is not None:
+                return clip
+        return self._synthesize_into_cache(backend, to_speak, rate)
+
+    def _synthesize_into_cache(self, backend, to_speak, rate, skip_existing=False):
+        """클립을 합성해 캐시에 넣습니다. 합성 중에는 _inflight에 표시됩니다.
+
+        skip_existing이면 이미 캐시에 있거나 다른 스레드가 합성 중인 클립은 합성하지 않고
+        None을 반환합니다 (워밍업/선합성용).
+        """
+        key = (to_speak, rate)
+        done = threading.Event()
+        with self._inflight_lock:
+            running = self._inflight.get(key)
+            if skip_existing and (running is not None or key in self._clip_cache):
+                return None
+            if running is None:
+                self._inflight[key] = done
+        try:
+            clip = backend.timed_synthesize(to_speak, rate)
+            self._clip_cache.put(to_speak, rate, clip)
+            return clip
+        finally:
+            with self._inflight_lock:
+                # 다른 스레드가 등록한 표시는 지우지 않음
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+            done.set()
+
+    def warm_up(self, items):
+        """(이름, 속도) 목록의 음성 클립을 백그라운드에서 미리 합성합니다.
+
+        새로 호출하면 진행 중이던 이전 워밍업은 중단됩니다.
+        """
+        if self.backend is None:
+            return
+        self._warmup_generation += 1
+        items = list(dict.fromkeys(items))  # 순서 유지 중복 제거
+        threading.Thread(target=self._warm_up_worker,
+                         args=(self.backend, items, self._warmup_generation),
+                         daemon=True).start()
+
+    def _warm_up_worker(self, backend, items, generation):
+        """워밍업 스레드 - 캐시에 없는 클립만 합성합니다."""
+        backend.thread_init()
+        for name, rate in items:
+            if generation != self._warmup_generation or not self._is_running:
+                return
+            to_speak = self._process_name_for_speech(name)
+            if not to_speak:
                 continue
+            try:
+                self._synthesize_into_cache(backend, to_speak, rate, skip_existing=True)
+            except Exception:
+                return
+
+    def prefetch(self, items):
+        """곧 읽을 (이름, 속도) 목록을 앞에서부터 최대 PREFETCH_LIMIT개 미리 합성합니다.
+
+        호출할 때마다 이전 힌트를 대체하므로, 사용자가 다른 행으로 이동하면
+        아직 합성하지 않은 이전 힌트는 자동으로 취소됩니다.
+        """
+        if self.backend is None:
+            return
+        items = list(dict.fromkeys(items))[:PREFETCH_LIMIT]
+        with self._prefetch_cond:
+            self._prefetch_items = items
+            self._prefetch_cond.notify()
+        if self._prefetch_thread is None or not self._prefetch_thread.is_alive():
+            self._prefetch_thread = threading.Thread(target=self._prefetch_worker, daemon=True)
+            self._prefetch_thread.start()
+
+    def cancel_prefetch(self):
+        """대기 중인 선합성 힌트를 버립니다."""
+        with self._prefetch_cond:
+            self._prefetch_items = []
+
+    def _prefetch_worker(self):
+        """선합성 스레드 - 힌트가 없으면 대기합니다."""
+        backend = None
+        while True:
+            with self._prefetch_cond:
+                while self._is_running and not self._prefetch_items:
+                    self._prefetch_cond.wait()
+                if not self._is_running:
+                    return
+                current = self.backend
+                if current is None:
+                    # 엔진이 없으면 합성할 수 없으므로 남은 힌트를 버림
+                    self._prefetch_items = []
+                    continue
+                name, rate = self._prefetch_items.pop(0)
+
+            if backend is not current:
+                backend = current
+                backend.thread_init()
+            to_speak = self._process_name_for_speech(name)
+            if not to_speak:
+                continue
+            try:
+                self._synthesize_into_cache(backend, to_speak, rate, skip_existing=True)
             except Exception:
-                # 기타 오류 - 무시하고 계속
                 continue
-    
+
+    def get_metrics(self):
+        """현재 엔진의 큐 대기/합성/재생 시간 통계를 반환합니다."""
+        if self.backend is None:
+            return {}
+        summary = self.backend.metrics.summary()
+        summary["backend"] = self.backend.name
+        return summary
+
+    def _speech_form(self, name):
+        """이름의 발음용 형태를 계산합니다 (숫자는 전체, 영어는 "영어", 그 외 마지막 글자)."""
+        if self._number_pattern.fullmatch(name):
+            return name
+        if self._english_pattern.search(name):
+            return "영어"
+        return name[-1]
+
     def _process_name_for_speech(self, name):
-        """이름을 TTS용으로 처리합니다 (캐싱 사용)"""
+        """이름을 TTS용으로 처리합니다 (LRU 캐시 사용)"""
         if not name:
             return None
-        
-        # 캐시에서 확인
-        if name in self._name_cache:
-            return self._name_cache[name]
-        
-        # 숫자(정수/실수)만으로 이루어진 경우 전체 읽기
-        try:
-            float(str(name))
-            is_number = True
-        except ValueError:
-            is_number = False
-        if is_number:
-            result = name
-        # 영어가 포함되어 있는지 확인 (정규식 사용)
-        elif self._english_pattern.search(name):
-            result = "영어"
-        else:
-            # 마지막 글자만 발음
-            result = name[-1] if name else ""
-        
-        # 캐시 크기 제한 (메모리 사용량 조절)
-        if len(self._name_cache) > 100:
-            # 가장 오래된 항목 일부 제거
-            items_to_remove = list(self._name_cache.keys())[:20]
-            for key in items_to_remove:
-                del self._name_cache[key]
-        
-        self._name_cache[name] = result
+        result = self._name_cache.get(name)
+        if result is None:
+            result = self._speech_form(name)
+            self._name_cache.put(name, result)
         return result
-    
+
+    def preload_names(self, names):
+        """새로 불러온 명단의 발음용 형태를 미리 계산해 워커가 계산하지 않도록 합니다."""
+        cache = self._name_cache
+        for name in dict.fromkeys(names):
+            if name and name not in cache:
+                cache.put(name, self._speech_form(name))
+
+    def get_cache_stats(self):
+        """이름 캐시와 음성 클립 캐시의 적중/미스/제거 통계를 반환합니다."""
+        return {
+            "names": self._name_cache.stats(),
+            "clips": self._clip_cache.stats(),
+        }
+
     def speak_name(self, name, rate=None):
         """이름(또는 숫자)을 음성으로 읽습니다 (비동기 처리, 속도 조절 가능)"""
-        if not self.speaker or not name:
+        self._request("name", name, rate)
+
+    def speak_score(self, score, rate=None):
+        """입력한 점수를 읽습니다. 이름보다 우선하며 재생 중인 이름을 끊습니다."""
+        self._request("score", score, rate)
+
+    def _request(self, kind, text, rate):
+        """발화 요청을 등록합니다.
+
+        같은 종류의 대기 요청은 새 요청으로 교체되고, 우선순위가 낮은 대기 요청은
+        버려집니다. 재생 중인 발화가 같은 종류이거나 우선순위가 낮으면 즉시 중단됩니다.
+        """
+        if self.backend is None or not text:
             return
-            
+
         current_time = time.time()
-        
-        # 같은 이름이면 0.3초 이내 중복 호출 방지
-        if (self.last_spoken_name == name and 
-            current_time - self.last_speak_time < 0.3):
-            return
-        
+        with self._cond:
+            # 같은 종류, 같은 텍스트를 0.3초 이내에 다시 요청하면 무시
+            last = self._last_spoken.get(kind)
+            if last and last[0] == text and current_time - last[1] < DEDUPE_INTERVAL:
+                return
+            if self._pending.get(kind, (None,))[0] == text:
+                return
+
+            self._pending[kind] = (text, rate, current_time)
+            # 점수를 입력했으면 아직 읽지 않은 이름은 이미 지난 요청
+            priority = UTTERANCE_PRIORITY[kind]
+            for other in [k for k in self._pending if UTTERANCE_PRIORITY[k] > priority]:
+                del self._pending[other]
+            current = self._current_kind
+            interrupt = (current is not None and
+                         priority <= UTTERANCE_PRIORITY[current])
+            self._cond.notify()
+
+        if interrupt:
+            self.backend.cancel()
+
         # 워커 스레드가 실행 중이 아니면 시작
         if not self._is_running or not self._worker_thread.is_alive():
             self._start_worker_thread()
-        
-        # 큐가 가득 찬 경우 가장 오래된 항목 제거
-        try:
-            while self._tts_queue.full():
-                try:
-                    self._tts_queue.get_nowait()
-                    self._tts_queue.task_done()
-                except Empty:
-                    break
-            
-            # 새 TTS 작업 추가 (rate도 함께 전달)
-            self._tts_queue.put_nowait(((name, rate), current_time))
-            
-        except Exception:
-            # 큐 작업 실패 시 무시
-            pass
-    
+
     def stop(self):
         """TTS 매니저를 정지합니다."""
-        self._is_running = False
+        self._warmup_generation += 1  # 진행 중인 워밍업 중단
+        with self._cond:
+            self._is_running = False
+            self._pending.clear()
+            self._cond.notify_all()
+        with self._prefetch_cond:
+            self._prefetch_items = []
+            self._prefetch_cond.notify_all()
+        if self.backend is not None:
+            self.backend.cancel()
         if self._worker_thread and self._worker_thread.is_alive():
             self._worker_thread.join(timeout=1.0)
-        
-        # 큐 정리
-        try:
-            while not self._tts_queue.empty():
-                self._tts_queue.get_nowait()
-                self._tts_queue.task_done()
-        except Empty:
-            pass
-    
+
     def __del__(self):
         """소멸자에서 정리 작업 수행"""
         try:
             self.stop()
         except Exception:
-            pass
\ No newline at end of file
+            pass
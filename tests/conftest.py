@@ -0,0 +1,103 @@
+"""
+테스트 공통 설정 - 프로젝트 폴더를 import 경로에 넣고, 작은 성적 엑셀 파일을 만드는
+make_workbook, 불러오기/디스크 확인용 load_logic, read_row, edit_externally 픽스처를 제공합니다.
+
+엑셀 형식은 앱과 같습니다: 1~2행 헤더(회차 이름), 3행 비움, 4행부터 학생
+(학년, 반, 번호, 성명, 회차 점수...).
+"""
+import os
+import sys
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def write_workbook(path, students, sessions=("1회", "2회", "3회"), extra_headers=(), formulas=None):
+    """
+    students: [(반, 번호, 성명, [점수...])], formulas: {(엑셀 row, 엑셀 col): "=..."}
+    extra_headers는 회차 뒤에 붙는 컬럼 이름 (합계 등)
+    """
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["학년", "반", "번호", "성명", *sessions, *extra_headers])
+    sheet.append([None] * 4 + ["수행"] * len(sessions))
+    sheet.append([])
+    for class_name, number, name, scores in students:
+        sheet.append([2, class_name, number, name, *scores])
+    for (row, col), text in (formulas or {}).items():
+        sheet.cell(row=row, column=col).value = text
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def make_workbook(tmp_path):
+    """write_workbook(이름, students, ...)를 tmp_path 안에서 실행하는 함수"""
+    def make(name, students, **kwargs):
+        return write_workbook(tmp_path / name, students, **kwargs)
+    return make
+
+
+@pytest.fixture
+def class_students():
+    """반 하나의 학생 5명 (빈 칸과 숫자가 아닌 값 포함)"""
+    return [
+        ("1", "1", "김가람", [10, 20, 30]),
+        ("1", "2", "이나래", [15, None, 25]),
+        ("1", "3", "박다온", [5, 5, "결석"]),
+        ("1", "4", "최라온", [None, None, None]),
+        ("1", "5", "정마루", [8, 9, 10]),
+    ]
+
+
+def excel_row(path, row):
+    """디스크의 엑셀 row (1부터) 값 목록"""
+    workbook = openpyxl.load_workbook(path)
+    try:
+        return [cell.value for cell in workbook.active[row]]
+    finally:
+        workbook.close()
+
+
+def edit_workbook(path, edits=None, append=None):
+    """다른 프로그램에서 파일을 고친 것처럼 셀을 바꾸고 수정 시각을 옮깁니다."""
+    workbook = openpyxl.load_workbook(path)
+    sheet = workbook.active
+    for (row, col), value in (edits or {}).items():
+        sheet.cell(row=row, column=col).value = value
+    if append:
+        sheet.append(append)
+    workbook.save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+@pytest.fixture
+def read_row():
+    """read_row(path, 엑셀 row) -> 디스크의 값 목록"""
+    return excel_row
+
+
+@pytest.fixture
+def edit_externally():
+    """edit_externally(path, {(row, col): 값}, append=[...]) - 외부 프로그램의 수정 흉내"""
+    return edit_workbook
+
+
+@pytest.fixture
+def load_logic():
+    """load_logic(*paths, **ScoreLogic 인자) -> 파일을 모두 불러온 ScoreLogic (끝나면 close)"""
+    from core.score_logic import ScoreLogic
+    created = []
+
+    def load(*paths, **kwargs):
+        logic = ScoreLogic(**kwargs)
+        created.append(logic)
+        for _, ok, message in logic.load_excel_files(list(paths)):
+            assert ok, message
+        return logic
+    yield load
+    for logic in created:
+        logic.close()
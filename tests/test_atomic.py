@@ -0,0 +1,47 @@
+import os
+import stat
+
+import pytest
+
+from core.atomic import atomic_write
+
+
+def _leftovers(directory):
+    return [name for name in os.listdir(directory) if name.startswith(".~")]
+
+
+def test_atomic_write_replaces_file_and_returns_writer_result(tmp_path):
+    path = tmp_path / "out.txt"
+    path.write_text("old", encoding="utf-8")
+
+    result = atomic_write(str(path), ".txt", lambda out: out.write("새 내용"), mode="w", encoding="utf-8")
+
+    assert result == len("새 내용")
+    assert path.read_text(encoding="utf-8") == "새 내용"
+    assert _leftovers(tmp_path) == []
+
+
+def test_atomic_write_keeps_permissions(tmp_path):
+    path = tmp_path / "out.bin"
+    path.write_bytes(b"old")
+    os.chmod(path, 0o640)
+
+    atomic_write(str(path), ".bin", lambda out: out.write(b"new"))
+
+    assert path.read_bytes() == b"new"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_atomic_write_failure_keeps_original(tmp_path):
+    path = tmp_path / "out.bin"
+    path.write_bytes(b"old")
+
+    def writer(out):
+        out.write(b"partial")
+        raise RuntimeError("쓰기 실패")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(str(path), ".bin", writer)
+
+    assert path.read_bytes() == b"old"
+    assert _leftovers(tmp_path) == []
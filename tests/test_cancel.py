@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from core import score_logic
+from core.cancel import CancelToken, OperationCancelled
+from core.score_logic import LOAD_CANCELLED_MESSAGE, ScoreLogic
+
+
+def roster(class_name, count):
+    return [(class_name, str(i + 1), f"학생{i + 1}", [i, None, None]) for i in range(count)]
+
+
+def test_token():
+    token = CancelToken()
+    token.check()
+    token.cancel()
+    assert token.is_cancelled()
+    with pytest.raises(OperationCancelled):
+        token.check()
+
+
+def test_pre_cancelled_load_adds_nothing(make_workbook, class_students):
+    token = CancelToken()
+    token.cancel()
+    paths = [make_workbook("1반.xlsx", class_students), make_workbook("2반.xlsx", class_students)]
+    logic = ScoreLogic()
+    assert logic.load_excel_files(paths, cancel=token) == [(path, False, LOAD_CANCELLED_MESSAGE) for path in paths]
+    assert logic.files == [] and logic.row_to_file_idx == [] and logic.sheet_catalog == {}
+
+
+def test_cancel_during_multi_file_load_adds_nothing(make_workbook, monkeypatch):
+    monkeypatch.setattr(score_logic, "LOAD_PROGRESS_ROWS", 2)
+    paths = [make_workbook(f"{n}반.xlsx", roster(str(n), 5)) for n in (1, 2, 3)]
+    token = CancelToken()
+
+    def progress(info):
+        if info['file_index'] == 1 and info['rows'] >= 2:
+            token.cancel()  # 두 번째 파일을 읽는 도중에 취소
+    logic = ScoreLogic()
+    results = logic.load_excel_files(paths, progress=progress, cancel=token)
+    assert {message for _, _, message in results} == {LOAD_CANCELLED_MESSAGE}
+    assert logic.files == [] and logic.student_data == []
+
+    # 취소한 뒤에도 다시 불러올 수 있음
+    assert all(ok for _, ok, _ in logic.load_excel_files(paths))
+    assert len(logic.student_data) == 15
+
+
+def test_progress_every_load_progress_rows(make_workbook, monkeypatch):
+    monkeypatch.setattr(score_logic, "LOAD_PROGRESS_ROWS", 2)
+    paths = [make_workbook("1반.xlsx", roster("1", 5)), make_workbook("2반.xlsx", roster("2", 3))]
+    events = []
+    results = ScoreLogic().load_excel_files(paths, progress=events.append)
+    assert all(ok for _, ok, _ in results)
+    assert [(e['file_index'], e['rows'], e['files_done']) for e in events] == [
+        (0, 0, 0), (0, 2, 0), (0, 4, 0), (0, 5, 1),
+        (1, 0, 1), (1, 2, 1), (1, 3, 2)]
+    assert all(e['stage'] == "load" and e['file_count'] == 2 for e in events)
+    assert events[3]['bytes'] == events[3]['total_bytes']
+
+
+def test_cancelled_save_keeps_file_and_dirty_cells(make_workbook, class_students, load_logic):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path)
+    logic.update_score(0, 0, "11")
+    original = open(path, "rb").read()
+
+    token = CancelToken()
+    token.cancel()
+    results = logic.save_to_excel(cancel=token)
+    assert [r['status'] for r in results] == ["cancelled"]
+    assert ScoreLogic.summarize_save_results(results) == (
+        False, "저장을 취소했습니다 (0개 저장, 1개 저장하지 않음).")
+    assert open(path, "rb").read() == original
+    assert logic.files[0]['dirty'] and logic.files[0]['dirty_cells'] == {(0, 4): "10"}
+
+
+def test_cancel_while_writing_does_not_replace_file(make_workbook, class_students, load_logic, monkeypatch):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path)
+    logic.update_score(0, 0, "11")
+    original = open(path, "rb").read()
+
+    token = CancelToken()
+    write_sheet = ScoreLogic._write_sheet
+
+    def cancel_after_write(sheet, file):
+        write_sheet(sheet, file)
+        token.cancel()  # 시트를 기록한 뒤, 원본과 교체하기 전에 취소
+    monkeypatch.setattr(ScoreLogic, "_write_sheet", staticmethod(cancel_after_write))
+
+    assert logic.save_to_excel(cancel=token)[0]['status'] == "cancelled"
+    assert open(path, "rb").read() == original
+    assert logic.files[0]['dirty_cells'] == {(0, 4): "10"}
+    assert os.listdir(os.path.dirname(path)) == ["1반.xlsx"]  # 임시 파일도 남지 않음
@@ -0,0 +1,85 @@
+import csv
+import json
+
+import pytest
+
+from core import exporter
+from core.exporter import export_rows, iter_columnar
+from core.score_logic import ScoreLogic
+
+HEADER = ["반", "번호", "성명", "1회"]
+ROWS = [["1", "1", "김가람", "10"], ["1", "2", "이나래, 주니어", ""], ["2", "1", '"박"다온', "9.5"],
+        ["2", "2", "최라온", None]]
+
+
+def test_csv_round_trip(tmp_path):
+    path = tmp_path / "out.csv"
+    assert export_rows(path, "csv", HEADER, iter(ROWS)) == 4
+    assert path.read_bytes().startswith(b"\xef\xbb\xbf")  # 엑셀용 BOM
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        assert list(csv.reader(f)) == [HEADER] + [["" if v is None else v for v in row] for row in ROWS]
+
+
+def test_jsonl_round_trip_types_values(tmp_path):
+    path = tmp_path / "out.jsonl"
+    assert export_rows(path, "jsonl", HEADER, ROWS) == 4
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert records[0] == {"반": 1, "번호": 1, "성명": "김가람", "1회": 10}
+    assert records[1]["1회"] is None and records[2]["1회"] == 9.5 and records[3]["1회"] is None
+
+
+def test_columnar_round_trip_across_row_groups(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, "ROW_GROUP_SIZE", 3)
+    path = tmp_path / "out.iscl"
+    rows = [[str(i % 2), str(i), f"학생{i}", "" if i % 3 else str(i * 10)] for i in range(10)]
+    assert export_rows(path, "columnar", HEADER, iter(rows)) == 10
+    assert list(iter_columnar(path)) == rows
+    assert list(iter_columnar(path, ["성명", "반"])) == [[row[2], row[0]] for row in rows]
+
+
+def test_columnar_wide_dictionary(tmp_path):
+    path = tmp_path / "out.iscl"
+    rows = [[str(i)] for i in range(70000)]  # 사전이 u16 인덱스를 넘는 경우
+    export_rows(path, "columnar", ["값"], rows)
+    assert list(iter_columnar(path)) == rows
+
+
+def test_progress_and_failure_keep_target_intact(tmp_path):
+    path = tmp_path / "out.csv"
+    calls = []
+    export_rows(path, "csv", HEADER, ROWS, progress=calls.append)
+    assert calls == [4]
+
+    def broken_rows():
+        yield ROWS[0]
+        raise RuntimeError("중단")
+    with pytest.raises(RuntimeError):
+        export_rows(path, "csv", HEADER, broken_rows())
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        assert len(list(csv.reader(f))) == 5  # 이전 내보내기 그대로
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.csv"]
+
+    with pytest.raises(ValueError):
+        export_rows(tmp_path / "out.xlsx", "xlsx", HEADER, ROWS)
+
+
+def test_other_file_is_not_columnar(tmp_path):
+    path = tmp_path / "out.iscl"
+    path.write_bytes(b"PK\x03\x04" + b"\x00" * 16)
+    with pytest.raises(ValueError):
+        list(iter_columnar(path))
+
+
+def test_score_logic_export_selected_columns(make_workbook, class_students, tmp_path):
+    logic = ScoreLogic()
+    assert logic.export_data(tmp_path / "empty.csv")[0] is False
+    assert logic.load_excel_data(make_workbook("class.xlsx", class_students))[0]
+    logic.update_score(3, 1, "7")
+
+    path = tmp_path / "out.iscl"
+    assert logic.export_data(path, "columnar", roster_cols=(3,), sessions=[1]) == (
+        True, f"5명의 데이터를 내보냈습니다.\n{path}")
+    rows = list(iter_columnar(path))
+    assert rows[0] == ["김가람", "20"] and rows[3] == ["최라온", "7"] and rows[1] == ["이나래", ""]
+    assert logic.export_data(tmp_path / "none.csv", roster_cols=(), sessions=[]) == (
+        False, "내보낼 컬럼을 선택하세요.")
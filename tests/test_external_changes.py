@@ -0,0 +1,26 @@
+import os
+
+from core.score_logic import ScoreLogic
+
+
+def test_merge_save_keeps_external_changes(make_workbook, class_students, load_logic, read_row, edit_externally):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path)
+    logic.update_score(0, 0, "11")
+    edit_externally(path, {(5, 5): 99})
+
+    results = logic.save_to_excel(merge_paths=[path])
+    assert results[0]['status'] == "merged"
+    assert "병합" in ScoreLogic.summarize_save_results(results)[1]
+    assert read_row(path, 4)[4] == 11 and read_row(path, 5)[4] == 99
+    assert not logic.files[0]['dirty']
+
+
+def test_touched_file_is_not_an_external_change(make_workbook, class_students, load_logic):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path)
+    logic.update_score(0, 0, "11")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    assert logic.check_external_changes() == []  # 내용(해시)이 같으면 변경 아님
+    assert not logic.is_file_changed(path)
@@ -0,0 +1,125 @@
+import pytest
+
+from core.formulas import (ERROR_DIV0, ERROR_VALUE, FormulaError, FormulaSheet, _round, compile_formula,
+                           format_result)
+
+
+def locate(row, col):
+    """엑셀 좌표를 셀 키로 - 3행까지는 상수 (가중치 행)"""
+    if row < 4:
+        return ("const", {(2, 1): 0.4, (2, 2): 0.6}.get((row, col)))
+    return (row, col)
+
+
+def evaluate(text, values):
+    return compile_formula(text, locate).evaluate(lambda cell: values.get(cell))
+
+
+def test_arithmetic_and_precedence():
+    assert evaluate("=A4+B4*2", {(4, 1): "1", (4, 2): "3"}) == 7
+    assert evaluate("=(A4+B4)*2", {(4, 1): "1", (4, 2): "3"}) == 8
+    assert evaluate("=-A4^2", {(4, 1): "3"}) == -9
+    assert evaluate("=2^3^2", {}) == 512
+
+
+def test_aggregate_functions_skip_blanks_and_text():
+    values = {(4, 1): "10", (4, 2): "", (4, 3): "결석", (4, 4): "20"}
+    assert evaluate("=SUM(A4:D4)", values) == 30
+    assert evaluate("=AVERAGE(A4:D4)", values) == 15
+    assert evaluate("=COUNT(A4:D4)", values) == 2
+    assert evaluate("=MAX(A4:D4)", values) == 20
+    assert evaluate("=MIN(A4:D4)", values) == 10
+
+
+def test_sumproduct_uses_constant_weight_row():
+    assert evaluate("=SUMPRODUCT(A2:B2,A4:B4)", {(4, 1): "10", (4, 2): "20"}) == pytest.approx(16)
+
+
+def test_round_is_half_up_like_excel():
+    assert evaluate("=ROUND(A4,1)", {(4, 1): "2.25"}) == 2.3
+    assert evaluate("=ROUND(A4,0)", {(4, 1): "-2.5"}) == -3
+    assert _round(2.675, 2) == 2.68
+
+
+def test_errors_become_cell_values():
+    assert evaluate("=A4/B4", {(4, 1): "1", (4, 2): ""}) == ERROR_DIV0
+    assert evaluate("=A4+1", {(4, 1): "abc"}) == ERROR_VALUE
+    assert evaluate("=AVERAGE(A4:B4)", {}) == ERROR_DIV0
+    # 다른 수식의 오류 값은 그대로 전파
+    assert evaluate("=SUM(A4:B4)", {(4, 1): ERROR_DIV0}) == ERROR_DIV0
+
+
+@pytest.mark.parametrize("value", [float("inf"), float("nan"), 1e300])
+def test_round_of_non_finite_or_huge_value_is_value_error(value):
+    assert evaluate("=ROUND(A4*10,5)", {(4, 1): value}) == ERROR_VALUE
+
+
+@pytest.mark.parametrize("text", ["=A4+", "=FOO(A4)", "=SUM(A4", "=A4:B4", "=A4 B4"])
+def test_unsupported_formulas_raise(text):
+    with pytest.raises(FormulaError):
+        compile_formula(text, locate)
+
+
+def test_format_result():
+    assert format_result(3.0) == "3"
+    assert format_result(2.5) == "2.5"
+    assert format_result(0.1 + 0.2) == "0.3"
+    assert format_result(float("inf")) == ERROR_VALUE
+    assert format_result(ERROR_DIV0) == ERROR_DIV0
+
+
+def test_sheet_recalculates_dependents_in_order():
+    sheet = FormulaSheet()
+    total = compile_formula("=A4+B4", locate)
+    average = compile_formula("=C4/2", locate)
+    sheet.add((4, 3), total)
+    sheet.add((4, 4), average)
+    assert sheet.affected([(4, 1)]) == [(4, 3), (4, 4)]
+    assert sheet.affected([(4, 5)]) == []
+    assert sheet.all_in_order().index((4, 3)) < sheet.all_in_order().index((4, 4))
+
+    sheet.remove((4, 3))
+    assert sheet.affected([(4, 1)]) == []
+    assert not sheet.is_formula((4, 3)) and sheet.is_formula((4, 4))
+
+
+def test_sheet_circular_references_are_still_ordered():
+    sheet = FormulaSheet()
+    sheet.add((4, 1), compile_formula("=B4", locate))
+    sheet.add((4, 2), compile_formula("=A4", locate))
+    assert sorted(sheet.all_in_order()) == [(4, 1), (4, 2)]
+
+
+def test_fixed_formula_cells_are_formula_cells():
+    sheet = FormulaSheet()
+    sheet.add_fixed((4, 1))
+    assert sheet and sheet.is_formula((4, 1))
+
+
+def test_score_logic_recalculates_total_column_after_entry(make_workbook):
+    from core.score_logic import ScoreLogic
+
+    students = [("1", "1", "김가람", [10, 20, 30, None]), ("1", "2", "이나래", [1, 2, None, None])]
+    path = make_workbook("formula.xlsx", students, extra_headers=("합계",),
+                         formulas={(4, 8): "=SUM(E4:G4)", (5, 8): "=SUM(E5:G5)"})
+    logic = ScoreLogic()
+    assert logic.load_excel_data(path)[0]
+    assert logic.student_data[0][7] == "60" and logic.student_data[1][7] == "3"
+    assert logic.is_formula_cell(0, 7) and not logic.is_formula_cell(0, 4)
+
+    logic.update_score(1, 2, "7")
+    assert logic.student_data[1][7] == "10"
+    assert logic.student_data[0][7] == "60"
+
+
+def test_score_logic_loads_sheet_with_round_overflow(make_workbook):
+    from core.score_logic import ScoreLogic
+
+    students = [("1", "1", "김가람", [1e300, None, None, None])]
+    path = make_workbook("huge.xlsx", students, extra_headers=("환산",),
+                         formulas={(4, 8): "=ROUND(E4*10,5)"})
+    logic = ScoreLogic()
+    ok, message = logic.load_excel_data(path)
+    assert ok, message
+    assert len(logic.files) == 1 and len(logic.row_to_file_idx) == 1
+    assert logic.student_data[0][7] == ERROR_VALUE
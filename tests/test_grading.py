@@ -0,0 +1,106 @@
+import pytest
+
+from core.grading import (DEFAULT_BANDS, column_contributions, compute_totals, format_bands, grade_for,
+                          normalize_scheme, parse_bands, round_total, row_total, score_value)
+from core.score_logic import ScoreLogic
+
+SCHEME = {"sessions": {"1회 수행": {"weight": 1, "cap": 12}, "2회 수행": {"weight": "0.5"},
+                       "3회 수행": {"weight": ""}},
+          "digits": 1, "bands": "15:A, 10:B, 0:C"}
+
+
+def test_normalize_scheme():
+    scheme = normalize_scheme(SCHEME)
+    assert scheme == {"sessions": {"1회 수행": {"weight": 1.0, "cap": 12.0},
+                                   "2회 수행": {"weight": 0.5, "cap": None}},
+                      "digits": 1, "rounding": "half_up",
+                      "bands": [[15.0, "A"], [10.0, "B"], [0.0, "C"]]}
+    assert normalize_scheme(None) is None
+    assert normalize_scheme({"sessions": {"1회": {"weight": 0}}}) is None
+    assert normalize_scheme({"sessions": {"1회": {"weight": 1}}})['bands'] == DEFAULT_BANDS
+
+
+@pytest.mark.parametrize("scheme", [
+    {"sessions": {"1회": {"weight": -1}}},
+    {"sessions": {"1회": {"weight": 1, "cap": 0}}},
+    {"sessions": {"1회": {"weight": 1}}, "digits": 5},
+    {"sessions": {"1회": {"weight": 1}}, "rounding": "even"},
+    {"sessions": {"1회": {"weight": 1}}, "bands": [[90, "A"], [90, "B"]]},
+    {"sessions": {"1회": {"weight": 1}}, "bands": [[90, " "]]},
+])
+def test_normalize_scheme_rejects_invalid(scheme):
+    with pytest.raises(ValueError):
+        normalize_scheme(scheme)
+
+
+def test_parse_and_format_bands():
+    assert parse_bands("90:A\n80.5:B, ,0:C") == [[90.0, "A"], [80.5, "B"], [0.0, "C"]]
+    assert format_bands([[90.0, "A"], [80.5, "B"]]) == "90:A, 80.5:B"
+    with pytest.raises(ValueError):
+        parse_bands("90 A")
+
+
+def test_score_values_cap_and_ignore_non_numbers():
+    assert score_value("15", 0.5, 10) == 5
+    assert score_value("", 1, None) == 0 and score_value("결석", 1, None) == 0
+    assert score_value("inf", 1, None) == 0 and score_value(float("nan"), 1, None) == 0
+    assert column_contributions(["1", "2", "1", None], 2, None) == [2, 4, 2, 0]
+
+
+def test_compute_totals_matches_row_total():
+    rows = [["", "", "", "", "10", "4"], ["", "", "", "", "20"], ["", "", "", ""]]
+    weights = {4: (1.0, 15.0), 5: (0.5, None)}
+    columns = [([row[col] if col < len(row) else "" for row in rows], weight, cap)
+               for col, (weight, cap) in weights.items()]
+    assert compute_totals(columns, len(rows)) == [12, 15, 0]
+    assert [row_total(row, weights) for row in rows] == [12, 15, 0]
+
+
+def test_round_total():
+    assert round_total(2.675, 2) == 2.68  # 부동소수점으로는 2.67
+    assert round_total(2.5, 0) == 3 and isinstance(round_total(2.5, 0), int)
+    assert round_total(2.59, 1, "down") == 2.5
+    assert round_total(2.51, 1, "up") == 2.6
+    assert round_total(1e300, 2) == 1e300
+
+
+def test_grade_for():
+    bands = [[15.0, "A"], [10.0, "B"], [0.0, "C"]]
+    assert grade_for(15, bands) == "A" and grade_for(14.9, bands) == "B"
+    assert grade_for(-1, bands) == "C"
+    assert grade_for(1, []) == ""
+
+
+def test_score_logic_grades_update_after_entry(make_workbook, class_students):
+    logic = ScoreLogic()
+    assert logic.load_excel_data(make_workbook("class.xlsx", class_students))[0]
+    assert logic.grade_results() == []
+    assert logic.set_grading_scheme(SCHEME) == (True, "2개 회차로 환산 총점을 계산합니다.")
+    assert logic.grade_results() == [(20.0, "A"), (12.0, "B"), (7.5, "C"), (0.0, "C"), (12.5, "B")]
+
+    logic.update_score(3, 1, "25")
+    assert logic.student_grade(3) == (12.5, "B")
+    logic.undo()
+    assert logic.student_grade(3) == (0.0, "C")
+
+    assert logic.grading_scheme()['bands'] == [[15.0, "A"], [10.0, "B"], [0.0, "C"]]
+    assert not logic.set_grading_scheme({"sessions": {"1회 수행": {"weight": -1}}})[0]
+    assert logic.set_grading_scheme(None) == (True, "환산 총점 계산을 해제했습니다.")
+    assert logic.student_grade(0) is None
+
+
+def test_save_grade_columns(make_workbook, class_students, load_logic, read_row):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path)
+    logic.set_grading_scheme({"sessions": {"1회 수행": {"weight": 1}}, "digits": 0, "bands": "10:A, 0:B"})
+    assert logic.save_to_excel(grades=True)[0]['status'] == "saved"
+    assert read_row(path, 1)[-2:] == ["환산 총점", "등급"]
+    assert read_row(path, 4)[-2:] == [10, "A"] and read_row(path, 6)[-2:] == [5, "B"]
+
+    # 다시 불러와 저장해도 총점 컬럼이 회차로 계산되거나 중복되지 않음
+    logic = load_logic(path)
+    logic.set_grading_scheme({"sessions": {"1회 수행": {"weight": 2}}, "digits": 0, "bands": "10:A, 0:B"})
+    logic.update_score(0, 0, "1")
+    logic.save_to_excel(grades=True)
+    assert read_row(path, 1)[-2:] == ["환산 총점", "등급"]
+    assert read_row(path, 4)[-2:] == [2, "B"]
@@ -0,0 +1,78 @@
+from core.history import EditHistory
+from core.score_logic import ScoreLogic
+
+
+def test_undo_redo_moves_steps_between_stacks():
+    history = EditHistory()
+    history.record("a")
+    history.record("b")
+    assert history.pop_undo() == ("b",)
+    assert history.can_redo()
+    assert history.pop_redo() == ("b",)
+    assert not history.can_redo()
+    assert history.pop_undo() == ("b",) and history.pop_undo() == ("a",)
+    assert history.pop_undo() is None and not history.can_undo()
+
+
+def test_new_edit_clears_redo():
+    history = EditHistory()
+    history.record("a")
+    history.pop_undo()
+    history.record("b")
+    assert not history.can_redo()
+
+
+def test_nested_batch_is_one_step():
+    history = EditHistory()
+    history.begin()
+    history.record("a")
+    history.begin()
+    history.record("b")
+    history.end()
+    assert not history.can_undo()  # 바깥 묶음이 끝나기 전에는 기록되지 않음
+    history.end()
+    assert history.pop_undo() == ("a", "b")
+
+    history.begin()
+    history.end()
+    assert not history.can_undo()  # 빈 묶음은 기록하지 않음
+
+
+def test_limit_drops_oldest_steps():
+    history = EditHistory(limit=3)
+    for delta in "abcde":
+        history.record(delta)
+    assert [history.pop_undo() for _ in range(4)] == [("e",), ("d",), ("c",), None]
+
+
+def test_forget_drops_steps_of_file():
+    first, second = {}, {}
+    history = EditHistory()
+    history.record((first, 0, 4, "", 1, None))
+    history.record((second, 0, 4, "", 2, None))
+    history.pop_undo()
+    history.forget(second)
+    assert not history.can_redo()
+    assert history.pop_undo()[0][0] is first
+
+
+def test_score_logic_undo_redo_restores_values_and_dirty_state(make_workbook, class_students):
+    logic = ScoreLogic()
+    assert logic.load_excel_data(make_workbook("class.xlsx", class_students))[0]
+    file = logic.files[0]
+
+    logic.update_score(0, 0, "50")
+    with logic.batch_edits():
+        logic.update_score(1, 0, "1")
+        logic.update_score(2, 0, "2")
+    assert file['dirty']
+
+    assert logic.undo() == [(2, 4), (1, 4)]
+    assert logic.student_data[1][4] == "15" and logic.student_data[2][4] == "5"
+    assert logic.undo() == [(0, 4)]
+    assert logic.student_data[0][4] == "10"
+    assert not file['dirty'] and not file['dirty_cells']
+    assert logic.undo() is None
+
+    assert logic.redo() == [(0, 4)]
+    assert logic.student_data[0][4] == 50 and file['dirty']
@@ -0,0 +1,52 @@
+from core.score_logic import ScoreLogic
+
+FIRST = [("1", "1", "김가람", [1, 2, 3]), ("1", "2", "이나래", [4, 5, 6]), ("1", "3", "", [None, None, None])]
+SECOND = [(" 1", "1 ", "김가람", [7, 8, 9]), ("1", "2", "이나라", [1, 1, 1]), ("2", "1", "박다온", [2, 2, 2])]
+
+
+def test_identity_key_strips_spaces():
+    assert ScoreLogic.identity_key(["2", " 1 ", "3", "김가람 ", "10"]) == ("1", "3", "김가람")
+    assert ScoreLogic.identity_key(["2", "1"]) == ("1", "", "")
+
+
+def test_same_student_in_two_files(make_workbook, load_logic):
+    logic = load_logic(make_workbook("1반.xlsx", FIRST), make_workbook("이동반.xlsx", SECOND))
+    assert logic.lookup_student("김가람", 1, 1) == [0, 3]
+    assert logic.lookup_student("김가람", "1") == [0, 3]
+    assert logic.lookup_student(" 김가람 ") == [0, 3]
+    assert logic.lookup_student("박다온", class_name="2") == [5]
+    assert logic.lookup_student("박다온", class_name="1") == []
+    assert logic.lookup_student("") == []  # 이름이 없는 행은 색인하지 않음
+    assert logic.student_label(3) == "이동반.xlsx 1반 1번 김가람"
+
+
+def test_identity_report(make_workbook, load_logic):
+    logic = load_logic(make_workbook("1반.xlsx", FIRST), make_workbook("이동반.xlsx", SECOND))
+    report = logic.identity_report()
+    assert report['duplicates'] == {("1", "1", "김가람"): [0, 3]}
+    assert report['conflicts'] == {("1", "2"): ["이나라", "이나래"]}
+
+
+def test_index_is_rebuilt_after_reload(make_workbook, load_logic, edit_externally):
+    path = make_workbook("1반.xlsx", FIRST)
+    logic = load_logic(path)
+    assert logic.lookup_student("이나래") == [1]
+
+    edit_externally(path, {(5, 4): "이나라"})  # 성명만 바뀜 (행 구조는 그대로)
+    result = logic.reload_file(path)
+    assert not result['structure_changed'] and (1, 3) in result['changed_cells']
+    assert logic.lookup_student("이나래") == [] and logic.lookup_student("이나라") == [1]
+
+    edit_externally(path, append=[2, "1", "4", "최라온"])  # 행 추가
+    assert logic.reload_file(path)['structure_changed']
+    assert logic.lookup_student("최라온", 4, 1) == [3]
+
+
+def test_index_follows_added_and_closed_files(make_workbook, load_logic):
+    first = make_workbook("1반.xlsx", FIRST)
+    logic = load_logic(first)
+    assert logic.lookup_student("박다온") == []
+    logic.load_excel_data(make_workbook("이동반.xlsx", SECOND))
+    assert logic.lookup_student("박다온") == [5]
+    logic.clear_data()
+    assert logic.lookup_student("김가람") == []
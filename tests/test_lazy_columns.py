@@ -0,0 +1,24 @@
+def test_wide_sheet_loads_sessions_on_demand(make_workbook, class_students, load_logic, read_row):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path, lazy_threshold=2)
+    file = logic.files[0]
+    assert file['loaded_cols'] == {0, 1, 2, 3}
+    logic.update_score(0, 2, "31")
+    assert 6 in file['loaded_cols'] and 4 not in file['loaded_cols']
+
+    logic.save_to_excel()
+    assert read_row(path, 4)[4:7] == [10, 20, 31]  # 읽지 않은 회차는 그대로
+
+
+def test_narrow_sheet_loads_everything(make_workbook, class_students, load_logic):
+    logic = load_logic(make_workbook("1반.xlsx", class_students))
+    assert logic.files[0]['loaded_cols'] is None
+    assert logic.student_data[0][4:7] == ["10", "20", "30"]
+
+
+def test_columns_are_read_when_needed(make_workbook, class_students, load_logic):
+    logic = load_logic(make_workbook("1반.xlsx", class_students), lazy_threshold=2)
+    assert logic.student_data[0][4:7] in ([], ["", "", ""])
+    assert logic.session_statistics(1) == {"count": 3, "mean": 34 / 3, "min": 5.0, "max": 20.0}
+    assert logic.student_data[0][5] == "20"
+    assert logic.files[0]['loaded_cols'] == {0, 1, 2, 3, 5}
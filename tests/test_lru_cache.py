@@ -0,0 +1,57 @@
+from services.clip_cache import ClipCache
+from services.lru_cache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert len(cache) == 2
+
+
+def test_get_refreshes_recency():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "a" in cache and "b" not in cache
+
+    cache.put("a", 10)  # 다시 넣어도 최근 사용으로
+    cache.put("d", 4)
+    assert cache.get("a") == 10 and "c" not in cache
+
+
+def test_stats_count_hits_misses_and_evictions():
+    cache = LRUCache(maxsize=2)
+    assert cache.stats()['hit_rate'] == 0.0
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    assert cache.get("x", "없음") == "없음"
+    cache.put("b", 2)
+    cache.put("c", 3)
+    cache.put("d", 4)
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1, "evictions": 2,
+                             "hit_rate": 2 / 3}
+    cache.clear()
+    assert cache.stats()['size'] == 0 and cache.stats()['evictions'] == 2
+
+
+def test_clip_cache_evicts_by_bytes():
+    cache = ClipCache(max_bytes=10)
+    cache.put("가", None, b"1234")
+    cache.put("나", None, b"5678")
+    assert cache.get("가", None) == b"1234"  # 가장 최근 사용
+    cache.put("다", 0, b"90")
+    cache.put("라", None, b"abc")
+    assert ("나", None) not in cache and ("가", None) in cache
+    assert cache.total_bytes == 9
+
+    cache.put("큼", None, b"x" * 11)  # 용량보다 큰 클립은 넣지 않음
+    cache.put("빈", None, b"")
+    assert cache.get("큼", None) is None and ("빈", None) not in cache
+    assert cache.stats() == {"size": 3, "bytes": 9, "max_bytes": 10, "hits": 1, "misses": 1,
+                             "evictions": 1, "hit_rate": 0.5}
@@ -0,0 +1,61 @@
+import sys
+import tracemalloc
+
+from core.memory import deep_size, format_size, traced_memory
+
+
+def test_deep_size_counts_shared_objects_once():
+    shared = ["x" * 100]
+    first = deep_size([shared, shared])
+    assert first == sys.getsizeof([shared, shared]) + sys.getsizeof(shared) + sys.getsizeof(shared[0])
+
+    seen = set()
+    deep_size(shared, seen)
+    assert deep_size([shared], seen) == sys.getsizeof([shared])  # 이미 잰 부분은 제외
+    assert deep_size({"k": shared}) > deep_size(shared)
+
+
+def test_format_size():
+    assert format_size(512) == "512B"
+    assert format_size(1536) == "1.5KB"
+    assert format_size(3 * 1024 ** 2) == "3.0MB"
+    assert format_size(2 * 1024 ** 3) == "2.0GB"
+
+
+def test_traced_memory():
+    assert not tracemalloc.is_tracing()
+    assert traced_memory() is None
+    tracemalloc.start()
+    try:
+        data = [str(i) * 10 for i in range(1000)]
+        traced = traced_memory(top=3)
+    finally:
+        tracemalloc.stop()
+    assert traced['peak'] >= traced['current'] > 0 and len(traced['top']) <= 3
+    assert data
+
+
+def test_loaded_cells_are_interned(make_workbook, class_students, load_logic):
+    logic = load_logic(make_workbook("1반.xlsx", class_students),
+                       make_workbook("2반.xlsx", [("1", "9", "한바다", [10, 5, 5])]))
+    data = logic.student_data
+    assert data[0][1] is data[1][1]  # 같은 반
+    assert data[0][0] is data[5][0]  # 파일이 달라도 같은 학년 문자열을 공유
+    assert data[0][4] is data[5][4]  # 같은 점수
+    assert data[2][5] is data[2][4]
+
+
+def test_memory_report_lists_files_and_structures(make_workbook, class_students, load_logic):
+    logic = load_logic(make_workbook("1반.xlsx", class_students),
+                       make_workbook("2반.xlsx", [("2", "1", "한바다", [1, 2, 3])]))
+    logic.sort_view(4)
+    logic.update_score(0, 0, "1")
+    report = logic.memory_report()
+
+    assert [(f['name'], f['rows']) for f in report['files']] == [("1반.xlsx", 5), ("2반.xlsx", 1)]
+    assert all(0 < f['data'] < f['total'] for f in report['files'])
+    assert set(report['structures']) == {"row_to_file_idx", "학생 데이터 캐시", "정렬/필터 뷰", "실행 취소 기록",
+                                         "헤더/스키마"}
+    assert report['structures']['정렬/필터 뷰'] > 0 and report['structures']['실행 취소 기록'] > 0
+    assert report['total'] == (sum(f['total'] for f in report['files']) + sum(report['structures'].values()))
+    assert report['traced'] is None
@@ -0,0 +1,68 @@
+import html
+import re
+
+from core.report import report_file_name, summarize_report_results, write_report
+
+
+def statistics_rows(path):
+    """보고서의 '회차별 통계' 표를 [[회차, 응시, 미입력, 평균, 표준편차, 최고, 최저]]로 읽습니다."""
+    text = open(path, encoding="utf-8").read()
+    table = text.split("<h2>회차별 통계</h2>", 1)[1].split("</table>", 1)[0]
+    body = table.split("<tbody>", 1)[1]
+    return [[html.unescape(cell) for cell in re.findall(r"<t[dh]>(.*?)</t[dh]>", row)]
+            for row in re.findall(r"<tr>(.*?)</tr>", body)]
+
+
+def test_report_file_name():
+    used = set()
+    assert report_file_name("2학년 1반", used) == "2학년 1반.html"
+    assert report_file_name("2학년 1반", used) == "2학년 1반 (2).html"
+    assert report_file_name('a/b:c*"', used) == "a_b_c__.html"
+    assert report_file_name("  ", used) == "보고서.html"
+
+
+def test_write_report_statistics(tmp_path):
+    path = tmp_path / "1반.html"
+    write_report(str(path), {
+        "title": "1반 <요약>", "source": "1반.xlsx", "generated": "2026-10-19 09:00",
+        "sessions": ["1회", "2회"], "grades": None,
+        "rows": [["1", "1", "김가람", ["10", ""], None, None],
+                 ["1", "2", "이나래", ["20", "결석"], None, None],
+                 ["1", "3", "박다온", ["", "7.5"], None, None]],
+    })
+    text = path.read_text(encoding="utf-8")
+    assert "<title>1반 &lt;요약&gt;</title>" in text and "학생 3명" in text
+    assert statistics_rows(path) == [["1회", "2", "1", "15", "5", "20", "10"],
+                                     ["2회", "1", "1", "7.5", "0", "7.5", "7.5"]]
+    assert [p.name for p in tmp_path.iterdir()] == ["1반.html"]
+
+
+def test_generate_reports_into_new_directory(make_workbook, class_students, load_logic, tmp_path):
+    logic = load_logic(make_workbook("1반.xlsx", class_students),
+                       make_workbook("2반.xlsx", [("2", "1", "한바다", [4, 6, 8])]))
+    logic.set_grading_scheme({"sessions": {"1회 수행": {"weight": 1}}, "digits": 0, "bands": "10:A, 0:B"})
+    directory = tmp_path / "보고서" / "2학기"
+    progress = []
+    results = logic.generate_reports(str(directory), progress=progress.append, workers=2)
+
+    assert [r['status'] for r in results] == ["done", "done"], results
+    assert summarize_report_results(results, str(directory)) == (True, f"2개 반의 보고서를 만들었습니다.\n{directory}")
+    assert sorted(p.name for p in directory.iterdir()) == ["1반.html", "2반.html"]
+    assert sorted(e['files_done'] for e in progress) == [1, 2]
+
+    stats = statistics_rows(directory / "1반.html")
+    assert stats[0] == ["1회 수행", "4", "1", "9.5", "3.64", "15", "5"]
+    assert stats[2][1:3] == ["3", "1"]  # 3회 - 숫자가 아닌 '결석'은 응시/미입력 모두 아님
+    assert stats[-1][0] == "환산 총점"
+    text = (directory / "1반.html").read_text(encoding="utf-8")
+    assert "<h2>등급 분포</h2>" in text
+
+
+def test_summarize_failed_and_cancelled():
+    assert summarize_report_results([], "d") == (False, "보고서를 만들 데이터가 없습니다.")
+    results = [{"path": "a", "source": "1반", "status": "failed", "error": "오류"},
+               {"path": "b", "source": "2반", "status": "done", "error": None}]
+    assert summarize_report_results(results, "d") == (
+        False, "일부 보고서를 만들지 못했습니다 (1개 완료, 1개 실패):\n1반: 오류")
+    results[0]['status'] = "cancelled"
+    assert summarize_report_results(results, "d") == (False, "보고서 만들기를 취소했습니다 (1개 완료, 1개 만들지 않음).")
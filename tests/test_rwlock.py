@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from core.rwlock import RWLock
+
+
+def test_reentrant_read_and_write():
+    lock = RWLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+    with lock.read():
+        with lock.read():
+            pass
+    # 모두 풀린 뒤에는 다른 스레드가 쓰기 잠금을 얻을 수 있음
+    acquired = threading.Event()
+
+    def writer():
+        with lock.write():
+            acquired.set()
+    thread = threading.Thread(target=writer)
+    thread.start()
+    thread.join(1)
+    assert acquired.is_set()
+
+
+def test_read_to_write_upgrade_raises():
+    lock = RWLock()
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+    with lock.write():
+        pass
+
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    inside = threading.Barrier(3, timeout=2)
+
+    def reader():
+        with lock.read():
+            inside.wait()  # 세 스레드가 동시에 읽기 잠금 안에 있어야 통과
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(2)
+    assert not inside.broken
+
+
+def test_writer_excludes_readers_and_writers():
+    lock = RWLock()
+    events = []
+    lock.acquire_write()
+
+    def reader():
+        with lock.read():
+            events.append("read")
+
+    def writer():
+        with lock.write():
+            events.append("write")
+    threads = [threading.Thread(target=reader), threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    events.append("released")
+    lock.release_write()
+    for thread in threads:
+        thread.join(2)
+    assert events[0] == "released" and sorted(events[1:]) == ["read", "write"]
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = RWLock()
+    events = []
+    lock.acquire_read()
+
+    def writer():
+        with lock.write():
+            events.append("write")
+
+    def reader():
+        with lock.read():
+            events.append("read")
+    writer_thread = threading.Thread(target=writer)
+    writer_thread.start()
+    time.sleep(0.05)  # 쓰기 스레드가 대기하도록
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    time.sleep(0.05)
+    assert events == []
+    lock.release_read()
+    writer_thread.join(2)
+    reader_thread.join(2)
+    assert events == ["write", "read"]
+
+
+def test_score_logic_events_and_concurrent_entry(make_workbook, class_students):
+    from core.score_logic import CELL_CHANGED, ScoreLogic
+
+    logic = ScoreLogic()
+    assert logic.load_excel_data(make_workbook("class.xlsx", class_students))[0]
+    events = []
+    unsubscribe = logic.subscribe(events.append)
+
+    def enter(session_idx):
+        for row in range(len(class_students)):
+            logic.update_score(row, session_idx, str(row + session_idx))
+    threads = [threading.Thread(target=enter, args=(session_idx,)) for session_idx in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    for row in range(len(class_students)):
+        assert logic.student_data[row][4:7] == [row, row + 1, row + 2]
+    assert {event['type'] for event in events} == {CELL_CHANGED}
+    changed = {cell for event in events for cell in event['cells']}
+    assert (0, 4) in changed and (4, 6) in changed
+
+    unsubscribe()
+    count = len(events)
+    logic.update_score(0, 0, "99")
+    assert len(events) == count
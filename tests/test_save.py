@@ -0,0 +1,22 @@
+import os
+
+from core.score_logic import ScoreLogic
+
+
+def test_save_writes_dirty_sheets_only(make_workbook, class_students, load_logic, read_row):
+    first = make_workbook("1반.xlsx", class_students)
+    second = make_workbook("2반.xlsx", [("2", "1", "한바다", [1, 2, 3])])
+    logic = load_logic(first, second)
+    untouched = os.stat(second).st_mtime_ns
+    assert ScoreLogic.summarize_save_results(logic.save_to_excel()) == (False, "저장할 변경사항이 없습니다.")
+
+    logic.update_score(3, 2, "12.5")
+    logic.update_score(0, 0, "")
+    results = logic.save_to_excel()
+    assert [(r['path'], r['status']) for r in results] == [(first, "saved")]
+    assert ScoreLogic.summarize_save_results(results)[0]
+    assert read_row(first, 7)[4:7] == [None, None, 12.5]
+    assert read_row(first, 4)[4] is None
+    assert os.stat(second).st_mtime_ns == untouched
+    assert not logic.files[0]['dirty'] and not logic.files[0]['dirty_cells']
+    assert logic.check_external_changes() == []
@@ -0,0 +1,22 @@
+def test_sessions_align_across_different_headers(make_workbook, load_logic, read_row):
+    first = make_workbook("1반.xlsx", [("1", "1", "김가람", [1, 2])], sessions=("1회", "2회"))
+    second = make_workbook("2반.xlsx", [("2", "1", "한바다", [9, 8])], sessions=("2회", "1회"))
+    logic = load_logic(first, second)
+    assert logic.session_count() == 2
+    assert logic.student_data[1][4:6] == ["8", "9"]
+
+    logic.update_score(1, 0, "7")
+    assert logic.save_to_excel()[0]['status'] == "saved"
+    assert read_row(second, 4)[4:6] == [9, 7]  # 파일의 원래 컬럼 순서로 기록
+
+
+def test_missing_session_is_skipped_and_noted(make_workbook, load_logic):
+    first = make_workbook("1반.xlsx", [("1", "1", "김가람", [1, 2])], sessions=("1회", "2회"))
+    second = make_workbook("2반.xlsx", [("2", "1", "한바다", [3])], sessions=("2회",))
+    logic = load_logic(first, second)
+    assert logic.update_score(1, 1, "5")
+    assert not logic.update_score(1, 0, "5")  # 이 파일에는 없는 회차
+    assert logic.student_data[1][4:6] == ["", 5]
+    assert len(logic.schema_groups()) == 2
+    assert logic.schema_note(logic.files[0]) == ""
+    assert logic.schema_note(logic.files[1]).endswith("없는 회차: 1회 수행")
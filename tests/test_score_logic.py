@@ -0,0 +1,55 @@
+import os
+
+
+def test_load_multiple_files(make_workbook, class_students, load_logic):
+    first = make_workbook("1반.xlsx", class_students)
+    second = make_workbook("2반.xlsx", [("2", "1", "한바다", [1, 2, 3])])
+    logic = load_logic(first, second)
+    assert logic.headers[:5] == ["학년", "반", "번호", "성명", "1회\n수행"]
+    assert [f['row_range'] for f in logic.files] == [(0, 4), (5, 5)]
+    assert logic.row_to_file_idx == [0, 0, 0, 0, 0, 1]
+    assert logic.student_data[5][1:5] == ["2", "1", "한바다", "1"]
+    assert logic.load_excel_data(first) == (False, "이미 추가된 파일입니다.")
+    assert logic.load_excel_data(os.path.join(os.path.dirname(first), "없음.xlsx"))[0] is False
+    assert len(logic.files) == 2
+
+
+def test_reload_after_own_save_reports_nothing(make_workbook, class_students, load_logic):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path)
+    logic.update_score(0, 0, "11")
+    logic.save_to_excel()
+    assert not logic.is_file_changed(path)
+    assert logic.reload_file(path) == {"changed_cells": [], "conflicts": [], "structure_changed": False}
+
+
+def test_reload_applies_external_changes_and_keeps_local_edits(make_workbook, class_students, load_logic,
+                                                               edit_externally):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path)
+    logic.update_score(0, 0, "11")   # 로컬 수정 - 디스크는 그대로
+    logic.update_score(1, 0, "16")   # 로컬 수정 - 디스크에서도 바뀜 (충돌)
+    edit_externally(path, {(6, 5): 6, (5, 5): 99})
+    assert logic.is_file_changed(path)
+    assert [f['path'] for f in logic.check_external_changes()] == [path]
+
+    result = logic.reload_file(path)
+    assert result['conflicts'] == [(1, 4)] and not result['structure_changed']
+    assert (2, 4) in result['changed_cells'] and (1, 4) in result['changed_cells']
+    assert logic.student_data[0][4] == 11       # 로컬 수정 유지
+    assert logic.student_data[1][4] == "99"     # 충돌 - 디스크 값
+    assert logic.student_data[2][4] == "6"
+    assert logic.files[0]['dirty_cells'] == {(0, 4): "10"}
+
+
+def test_reload_with_added_row_moves_local_edits(make_workbook, class_students, load_logic, edit_externally):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path)
+    logic.update_score(4, 1, "3")
+    edit_externally(path, append=[2, "1", "6", "새학생", 1, 1, 1])
+
+    result = logic.reload_file(path)
+    assert result['structure_changed'] and result['conflicts'] == []
+    assert len(logic.student_data) == 6 and logic.student_data[5][3] == "새학생"
+    assert logic.student_data[4][5] == 3 and logic.files[0]['dirty_cells'] == {(4, 5): "9"}
+    assert not logic.can_undo()  # 행 구조가 바뀌면 실행 취소 기록을 버림
@@ -0,0 +1,44 @@
+import pytest
+
+from core.series import SPARK_CHARS, series_deltas, series_trend, sparkline
+
+
+def test_deltas():
+    assert series_deltas([]) == []
+    assert series_deltas([(0, 10.0), (2, 7.0), (3, 9.5)]) == [(0, 10.0, None), (2, 7.0, -3.0), (3, 9.5, 2.5)]
+
+
+def test_trend_is_least_squares_slope_over_sessions():
+    assert series_trend([(0, 1.0)]) is None
+    assert series_trend([(0, 1.0), (1, 3.0), (2, 5.0)]) == pytest.approx(2.0)
+    # 빈 회차를 건너뛴 희소 목록은 회차 간격을 반영
+    assert series_trend([(0, 10.0), (4, 2.0)]) == pytest.approx(-2.0)
+    assert series_trend([(1, 10.0), (1, 20.0)]) is None
+
+
+def test_sparkline():
+    assert sparkline([]) == ""
+    assert sparkline([5, 5]) == SPARK_CHARS[4] * 2
+    assert sparkline([0, 7, 3.5]) == "▁█▅"
+    assert len(sparkline(list(range(20)))) == 20
+
+
+def test_score_series_skips_blank_text_and_unloaded_sessions(make_workbook, load_logic):
+    students = [("1", "1", "김가람", [10, None, "결석", 7, "nan"]),
+                ("1", "2", "이나래", [1, 2, 3, 4, 5])]
+    path = make_workbook("1반.xlsx", students, sessions=("1회", "2회", "3회", "4회", "5회"))
+    logic = load_logic(path)
+    assert logic.score_series(0) == [(0, 10.0), (3, 7.0)]
+    assert logic.score_series(9) == []
+
+    lazy = load_logic(path, lazy_threshold=2)
+    assert lazy.score_series(1) == []  # 읽지 않은 회차는 건너뜀
+    lazy.ensure_columns([5, 7])
+    assert lazy.score_series(1) == [(1, 2.0), (3, 4.0)]
+
+
+def test_score_series_skips_sessions_missing_from_file(make_workbook, load_logic):
+    first = make_workbook("1반.xlsx", [("1", "1", "김가람", [1, 2])], sessions=("1회", "2회"))
+    second = make_workbook("2반.xlsx", [("2", "1", "한바다", [5])], sessions=("2회",))
+    logic = load_logic(first, second)
+    assert logic.score_series(1) == [(1, 5.0)]
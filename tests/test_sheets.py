@@ -0,0 +1,85 @@
+import openpyxl
+import pytest
+
+from core.score_logic import ScoreLogic, list_sheets
+
+
+@pytest.fixture
+def two_sheet_workbook(make_workbook, class_students):
+    """'1반'(활성)과 '2반' 시트가 있는 통합 문서"""
+    path = make_workbook("학년.xlsx", class_students)
+    workbook = openpyxl.load_workbook(path)
+    workbook.active.title = "1반"
+    sheet = workbook.create_sheet("2반")
+    sheet.append(["학년", "반", "번호", "성명", "1회", "2회", "3회"])
+    sheet.append([None] * 4 + ["수행"] * 3)
+    sheet.append([])
+    sheet.append([2, "2", "1", "한바다", 7, 8, 9])
+    sheet.append([2, "2", "2", "윤사랑", 6, None, 4])
+    workbook.save(path)
+    return path
+
+
+def test_list_sheets_reads_names_and_active_sheet(two_sheet_workbook):
+    assert list_sheets(two_sheet_workbook) == (["1반", "2반"], "1반")
+
+
+def test_only_active_sheet_is_read(two_sheet_workbook, load_logic, monkeypatch):
+    read = []
+    original = ScoreLogic._read_sheet
+
+    def spy(file_path, sheet_name=None, *args, **kwargs):
+        read.append(sheet_name)
+        return original(file_path, sheet_name, *args, **kwargs)
+    monkeypatch.setattr(ScoreLogic, "_read_sheet", staticmethod(spy))
+
+    logic = load_logic(two_sheet_workbook)
+    assert read == ["1반"]
+    assert len(logic.files) == 1 and logic.files[0]['sheet'] == "1반"
+    assert logic.sheet_catalog[two_sheet_workbook] == ["1반", "2반"]
+    assert logic.unopened_sheets(two_sheet_workbook) == ["2반"]
+
+
+def test_open_sheet_adds_separate_unit(two_sheet_workbook, load_logic):
+    logic = load_logic(two_sheet_workbook)
+    assert logic.open_sheet(two_sheet_workbook, "2반") == (True, "성공")
+    assert [f['sheet'] for f in logic.files] == ["1반", "2반"]
+    assert logic.files[1]['row_range'] == (5, 6)
+    assert logic.student_data[5][3] == "한바다"
+    assert logic.find_unit(two_sheet_workbook, "2반") is logic.files[1]
+    assert logic.unopened_sheets(two_sheet_workbook) == []
+
+    assert logic.open_sheet(two_sheet_workbook, "2반") == (False, "이미 열린 시트입니다.")
+    assert logic.open_sheet(two_sheet_workbook, "3반") == (False, "시트를 찾을 수 없습니다.")
+    assert logic.display_name(logic.files[1]) == "학년.xlsx [2반]"
+
+
+def test_edits_in_two_sheets_save_file_once(two_sheet_workbook, load_logic, monkeypatch):
+    logic = load_logic(two_sheet_workbook)
+    logic.open_sheet(two_sheet_workbook, "2반")
+    logic.update_score(0, 0, "11")
+    logic.update_score(6, 1, "5")
+
+    saves = []
+    original = ScoreLogic._atomic_save
+
+    def spy(workbook, path):
+        saves.append(path)
+        return original(workbook, path)
+    monkeypatch.setattr(ScoreLogic, "_atomic_save", staticmethod(spy))
+
+    results = logic.save_to_excel()
+    assert [r['status'] for r in results] == ["saved"] and saves == [two_sheet_workbook]
+    workbook = openpyxl.load_workbook(two_sheet_workbook)
+    try:
+        assert workbook["1반"]["E4"].value == 11 and workbook["2반"]["F5"].value == 5
+        assert workbook["2반"]["E4"].value == 7
+    finally:
+        workbook.close()
+    assert not any(f['dirty'] for f in logic.files)
+    # 저장한 파일의 지문이 두 시트 모두 갱신되어 자기 저장을 외부 변경으로 보지 않음
+    logic.update_score(0, 1, "1")
+    logic.update_score(6, 2, "1")
+    assert logic.check_external_changes() == []
+    assert not logic.is_file_changed(two_sheet_workbook)
+    assert logic.files[0]['fingerprint'] == logic.files[1]['fingerprint']
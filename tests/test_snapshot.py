@@ -0,0 +1,77 @@
+import pytest
+
+from core.score_logic import ScoreLogic
+from core.snapshot import read_snapshot, write_snapshot
+
+
+def sample_files():
+    return [{
+        "path": "/tmp/1반.xlsx", "sheet": "Sheet", "headers": ["학년", "반", "번호", "성명", "1회"],
+        "student_data": [["2", "1", "1", "김가람", "10"], ["2", "1", "2", "이나래"], []],
+        "loaded_cols": {0, 1, 2, 3}, "dirty": True, "dirty_cells": {(0, 4): "9"},
+        "fingerprint": [123, 4.5, "abc"],
+        "formula_source": ({(4, 6): "=SUM(E4:E4)"}, {(2, 5): 0.5}),
+    }, {
+        "path": "/tmp/2반.xlsx", "sheet": None, "headers": ["학년", "반", "번호", "성명"],
+        "student_data": [["2", "2", "1", "박다온"]], "loaded_cols": None, "dirty": False, "dirty_cells": {},
+        "fingerprint": None,
+    }]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.isnp"
+    write_snapshot(path, sample_files(), {"tab": 1}, {"/tmp/1반.xlsx": ["Sheet", "Sheet2"]})
+    files, ui_state, sheets = read_snapshot(path)
+
+    assert ui_state == {"tab": 1} and sheets == {"/tmp/1반.xlsx": ["Sheet", "Sheet2"]}
+    for restored, original in zip(files, sample_files()):
+        for key in ("path", "sheet", "headers", "student_data", "loaded_cols", "dirty", "dirty_cells",
+                    "formula_source"):
+            assert restored.get(key) == original.get(key), key
+    # 같은 문자열은 객체 하나를 공유
+    assert files[0]['student_data'][0][0] is files[1]['student_data'][0][0]
+
+
+def test_values_are_restored_as_strings(tmp_path):
+    path = tmp_path / "session.isnp"
+    files = sample_files()[1:]
+    files[0]['student_data'] = [[2, None, 3.5, "이름"]]
+    write_snapshot(path, files, {})
+    assert read_snapshot(path)[0][0]['student_data'] == [["2", "", "3.5", "이름"]]
+
+
+@pytest.mark.parametrize("cut", [4, 20, -1, -5])
+def test_truncated_snapshot_raises(tmp_path, cut):
+    path = tmp_path / "session.isnp"
+    write_snapshot(path, sample_files(), {})
+    data = path.read_bytes()
+    path.write_bytes(data[:cut])
+    with pytest.raises(ValueError):
+        read_snapshot(path)
+
+
+def test_other_file_is_rejected(tmp_path):
+    path = tmp_path / "session.isnp"
+    path.write_bytes(b"PK\x03\x04" + b"\x00" * 32)
+    with pytest.raises(ValueError, match="지원하지 않는 스냅샷 형식입니다."):
+        read_snapshot(path)
+
+
+def test_score_logic_restores_session(make_workbook, class_students, tmp_path):
+    logic = ScoreLogic()
+    source = make_workbook("class.xlsx", class_students)
+    assert logic.load_excel_data(source)[0]
+    logic.update_score(3, 0, "42")
+    snapshot = tmp_path / "session.isnp"
+    logic.save_snapshot(snapshot, {"selected": 3})
+
+    restored = ScoreLogic()
+    assert restored.restore_snapshot(snapshot) == (True, {"selected": 3})
+    assert restored.headers == logic.headers
+    assert restored.student_data[3][4] == "42"
+    assert restored.files[0]['dirty'] and restored.files[0]['dirty_cells'] == {(3, 4): ""}
+    assert [row[:4] for row in restored.student_data] == [row[:4] for row in logic.student_data]
+    assert restored.find_students(name="최라온") == [3]
+
+    assert restored.restore_snapshot(tmp_path / "missing.isnp")[0] is False
+    assert restored.student_data[3][4] == "42"
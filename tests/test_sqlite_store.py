@@ -0,0 +1,102 @@
+import pytest
+
+from core.exporter import iter_columnar
+from core.score_logic import ScoreLogic
+from core.sqlite_store import SqliteStore
+
+PADDED = [
+    ("1 ", " 1", "김가람 ", [10, 20, None]),
+    ("1", "2", " 이나래", [15, "결석", 25]),
+    ("2", "1", "박다온", [None, None, 3.5]),
+]
+
+
+@pytest.fixture
+def engines(make_workbook, tmp_path):
+    """같은 파일을 메모리 엔진과 SQLite 엔진으로 불러온 (memory, sqlite)"""
+    path = make_workbook("class.xlsx", PADDED)
+    memory = ScoreLogic()
+    sqlite = ScoreLogic(storage="sqlite", db_path=str(tmp_path / "scores.db"))
+    for logic in (memory, sqlite):
+        assert logic.load_excel_data(path)[0]
+    yield memory, sqlite
+    memory.close()
+    sqlite.close()
+
+
+def test_store_rows_and_updates():
+    store = SqliteStore()
+    try:
+        file_id = store.add_file("a.xlsx", ["학년", "반", "번호", "성명", "1회"],
+                                 [["2", " 1", "1 ", "김가람", "10"], ["2", "1", "2", "이나래"]])
+        assert list(store.iter_rows(file_id, [0, 1, 2, 3, 4])) == [["2", "1", "1", "김가람", "10"],
+                                                                   ["2", "1", "2", "이나래", ""]]
+        store.queue_update(file_id, 1, 4, 7)
+        store.queue_update(file_id, 0, 4, "")
+        store.queue_update(file_id, 1, 3, " 이나라 ")
+        assert list(store.iter_rows(file_id, [3, 4])) == [["김가람", ""], ["이나라", "7"]]
+        assert store.find_students(name="이나라") == [(file_id, 1)]
+        assert store.column_statistics(4) == {"count": 1, "mean": 7.0, "min": 7.0, "max": 7.0}
+
+        new_id = store.replace_file(file_id, ["학년", "반", "번호", "성명"], [["2", "3", "1", "박다온"]])
+        assert store.find_students(name="이나라") == []
+        assert list(store.iter_rows(new_id, [1, 3])) == [["3", "박다온"]]
+    finally:
+        store.close()
+
+
+def test_iter_rows_streams_in_batches(monkeypatch):
+    monkeypatch.setattr("core.sqlite_store.ITER_BATCH_SIZE", 2)
+    store = SqliteStore()
+    try:
+        rows = [["2", "1", str(n), f"학생{n}", str(n * 10) if n % 2 else ""] for n in range(1, 6)]
+        file_id = store.add_file("a.xlsx", ["학년", "반", "번호", "성명", "1회"], rows)
+        expected = [[r[2], r[4]] for r in rows]
+        assert list(store.iter_rows(file_id, [2, 4])) == expected
+
+        # 첫 묶음을 읽은 뒤의 수정은 뒤쪽 묶음에 반영됨 (전체를 미리 읽지 않음)
+        it = store.iter_rows(file_id, [2, 4])
+        assert next(it) == ["1", "10"]
+        store.queue_update(file_id, 4, 4, 99)
+        assert list(it)[-1] == ["5", "99"]
+    finally:
+        store.close()
+
+
+def test_find_students_matches_memory_engine(engines):
+    memory, sqlite = engines
+    for query in ({"name": "김가람"}, {"class_name": "1", "number": 1}, {"number": " 1 "},
+                  {"class_name": "2"}, {"name": "없음"}):
+        assert memory.find_students(**query) == sqlite.find_students(**query), query
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "columnar"])
+def test_export_matches_memory_engine(engines, tmp_path, fmt):
+    memory, sqlite = engines
+    for logic in (memory, sqlite):
+        logic.update_score(2, 0, "8")
+        logic.update_score(0, 1, "")
+    memory_path = tmp_path / f"memory.{fmt}"
+    sqlite_path = tmp_path / f"sqlite.{fmt}"
+    assert memory.export_data(memory_path, fmt)[0] and sqlite.export_data(sqlite_path, fmt)[0]
+    if fmt == "columnar":
+        assert list(iter_columnar(memory_path)) == list(iter_columnar(sqlite_path))
+        assert list(iter_columnar(memory_path, ["반", "번호", "성명"]))[0] == ["1", "1", "김가람"]
+    else:
+        assert memory_path.read_bytes() == sqlite_path.read_bytes()
+
+
+def test_statistics_match_memory_engine(engines):
+    memory, sqlite = engines
+    for session_idx in range(3):
+        assert memory.session_statistics(session_idx) == sqlite.session_statistics(session_idx)
+    assert memory.session_statistics(2) == {"count": 2, "mean": 14.25, "min": 3.5, "max": 25.0}
+
+
+def test_sqlite_engine_load_save(make_workbook, class_students, tmp_path, load_logic, read_row):
+    path = make_workbook("1반.xlsx", class_students)
+    logic = load_logic(path, storage="sqlite", db_path=str(tmp_path / "scores.db"))
+    logic.update_score(2, 2, "4")
+    assert logic.save_to_excel()[0]['status'] == "saved"
+    assert read_row(path, 6)[6] == 4
+    assert logic.reload_file(path)['changed_cells'] == []
@@ -0,0 +1,163 @@
+import time
+
+import pytest
+
+from services.tts_backends import RecordingBackend
+from services.tts_manager import TTSManager
+
+
+def wait_until(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def wait_idle(manager):
+    """대기 요청이 없고 재생 중인 발화도 없을 때까지 기다립니다."""
+    assert wait_until(lambda: not manager._pending and manager._current_kind is None)
+
+
+@pytest.fixture
+def make_tts():
+    """make_tts(synth_delay, play_delay) -> (TTSManager, RecordingBackend) - 싱글톤을 매번 새로 만듦"""
+    managers = []
+
+    def make(**kwargs):
+        TTSManager._instance = None
+        backend = RecordingBackend(**kwargs)
+        manager = TTSManager(backend)
+        managers.append(manager)
+        return manager, backend
+    yield make
+    for manager in managers:
+        manager.stop()
+    TTSManager._instance = None
+
+
+def test_metrics_per_stage(make_tts):
+    manager, backend = make_tts(synth_delay=0.02)
+    manager.speak_name("김가람")
+    assert wait_until(lambda: backend.played() == ["람"])
+    wait_idle(manager)
+
+    metrics = manager.get_metrics()
+    assert metrics['backend'] == "recording"
+    for stage in ("queue_wait", "synthesis", "playback"):
+        assert metrics[stage]['count'] == 1, stage
+    assert metrics['synthesis']['total'] >= 0.02
+    assert metrics['synthesis']['max'] == metrics['synthesis']['last']
+
+
+def test_new_request_cancels_playing_speech(make_tts):
+    manager, backend = make_tts(play_delay=2.0)
+    manager.speak_name("김가람")
+    assert wait_until(lambda: backend.played() == ["람"])
+    manager.speak_name("이나래")
+    assert wait_until(lambda: backend.played() == ["람", "래"])
+
+    actions = [(action, text) for _, action, text in backend.events]
+    assert actions.index(("cancel", None)) < actions.index(("interrupted", "람"))
+    assert actions.index(("interrupted", "람")) < actions.index(("play", "래"))
+
+
+def test_only_latest_score_is_played(make_tts):
+    manager, backend = make_tts(synth_delay=0.1)
+    for score in ("15", "16", "17"):
+        manager.speak_score(score)
+    assert wait_until(lambda: backend.played())
+    wait_idle(manager)
+    assert backend.played() == ["17"]
+
+
+def test_pending_name_is_dropped_when_score_arrives(make_tts):
+    manager, backend = make_tts(synth_delay=0.1)
+    manager.speak_score("15")
+    assert wait_until(lambda: manager._current_kind == "score")
+    manager.speak_name("김가람")  # 점수를 합성하는 동안 대기
+    manager.speak_score("16")
+    assert "name" not in manager._pending
+    assert wait_until(lambda: backend.played())
+    wait_idle(manager)
+    assert backend.played() == ["16"]
+
+
+def test_score_is_spoken_before_pending_name(make_tts):
+    manager, backend = make_tts(synth_delay=0.1)
+    manager.speak_name("김가람")
+    assert wait_until(lambda: manager._current_kind == "name")
+    manager.speak_score("15")
+    manager.speak_name("이나래")  # 점수 뒤에 온 이름은 점수 다음에 읽음
+    assert wait_until(lambda: len(backend.played()) == 2)
+    wait_idle(manager)
+    assert backend.played() == ["15", "래"]
+
+
+def test_same_text_is_not_repeated_within_dedupe_interval(make_tts):
+    manager, backend = make_tts()
+    manager.speak_score("15")
+    assert wait_until(lambda: backend.played() == ["15"])
+    wait_idle(manager)
+    manager.speak_score("15")
+    manager.speak_name("15")  # 다른 종류는 따로 중복 제거
+    assert wait_until(lambda: backend.played() == ["15", "15"])
+    wait_idle(manager)
+    assert backend.played() == ["15", "15"]
+
+
+def test_warm_up_and_prefetch_synthesize_a_clip_once(make_tts):
+    manager, backend = make_tts(synth_delay=0.1)
+    manager.warm_up([("김가람", None), ("이나래", None)])
+    manager.prefetch([("김가람", None), ("이나래", None)])
+    assert wait_until(lambda: manager.get_cache_stats()['clips']['size'] == 2)
+    assert wait_until(lambda: not manager._inflight)
+    synthesized = [text for _, action, text in backend.events if action == "synthesize"]
+    assert sorted(synthesized) == ["람", "래"]
+
+
+def test_prefetch_fills_clip_cache(make_tts):
+    manager, backend = make_tts()
+    manager.prefetch([("김가람", None), ("이나래", None), ("박다온", None), ("최라온", None)])
+    assert wait_until(lambda: manager.get_cache_stats()['clips']['size'] == 3)  # PREFETCH_LIMIT개까지
+    manager.speak_name("김가람")
+    assert wait_until(lambda: backend.played() == ["람"])
+    synthesized = [text for _, action, text in backend.events if action == "synthesize"]
+    assert synthesized == ["람", "래", "온"]  # 재생할 때 다시 합성하지 않음
+    assert manager.get_cache_stats()['clips']['hits'] >= 1
+
+
+def test_new_prefetch_replaces_old_hints(make_tts):
+    manager, backend = make_tts(synth_delay=0.1)
+    manager.prefetch([("김가람", None), ("이나래", None), ("박다온", None)])
+    assert wait_until(lambda: manager._inflight)  # 첫 힌트를 합성하는 중
+    manager.prefetch([("정마루", None)])
+    assert wait_until(lambda: manager.get_cache_stats()['clips']['size'] == 2)
+    assert wait_until(lambda: not manager._inflight)
+    synthesized = [text for _, action, text in backend.events if action == "synthesize"]
+    assert synthesized == ["람", "루"]
+
+
+def test_prefetch_skips_hints_without_backend(make_tts):
+    manager, backend = make_tts(synth_delay=0.1)
+    manager.prefetch([("김가람", None), ("이나래", None), ("박다온", None)])
+    assert wait_until(lambda: manager._inflight)
+    manager.set_backend(None)
+    assert wait_until(lambda: not manager._prefetch_items)
+    assert manager._prefetch_thread.is_alive()
+
+    other = RecordingBackend()
+    manager.set_backend(other)
+    manager.prefetch([("정마루", None)])
+    assert wait_until(lambda: [text for _, action, text in other.events if action == "synthesize"] == ["루"])
+
+
+def test_preloaded_names_are_cache_hits(make_tts):
+    manager, backend = make_tts()
+    manager.preload_names(["김가람", "이나래", "김가람", ""])
+    assert manager.get_cache_stats()['names']['size'] == 2
+    manager.speak_name("김가람")
+    assert wait_until(lambda: backend.played() == ["람"])
+    stats = manager.get_cache_stats()['names']
+    assert stats['hits'] == 1 and stats['misses'] == 0
@@ -0,0 +1,73 @@
+import pytest
+
+from core.score_logic import ScoreLogic
+from core.validation import NOT_NUMBER_MESSAGE, check_number, check_values, compile_rule, normalize_rule
+
+
+@pytest.mark.parametrize("value", ["", None, "  ", "10", "-2.5", 7, 0.5])
+def test_check_number_accepts_blank_and_numbers(value):
+    assert check_number(value) is None
+
+
+@pytest.mark.parametrize("value", ["abc", "결석", "nan", "inf", "-inf", "1,0"])
+def test_check_number_rejects_text_and_non_finite(value):
+    assert check_number(value) == NOT_NUMBER_MESSAGE
+
+
+def test_normalize_rule():
+    assert normalize_rule(None) is None
+    assert normalize_rule({"min": "", "max": None, "allowed": []}) is None
+    assert normalize_rule({"min": "0", "max": 10, "allowed": [5, 1, 5], "required": 1}) == {
+        "min": 0.0, "max": 10.0, "allowed": [1.0, 5.0], "required": True}
+    with pytest.raises(ValueError):
+        normalize_rule({"min": 10, "max": 0})
+    with pytest.raises(ValueError):
+        normalize_rule({"step": 0})
+
+
+def test_compiled_rule_checks():
+    check = compile_rule({"min": 0, "max": 10, "step": 0.5})
+    assert check("0") is None and check("10") is None and check("2.5") is None and check("") is None
+    assert check("10.5") == "0~10 사이의 점수만 입력할 수 있습니다."
+    assert check("2.3") == "0.5 단위로만 입력할 수 있습니다."
+    assert check("abc") == NOT_NUMBER_MESSAGE
+    assert check("0.1") is not None and compile_rule({"step": 0.1})("0.3") is None
+
+    assert compile_rule({"required": True})("") == "점수를 입력해야 합니다."
+    assert compile_rule({"allowed": [0, 5, 10]})("7") == "입력할 수 있는 점수: 0, 5, 10"
+    assert compile_rule({"min": 3})("2") == "3 이상의 점수만 입력할 수 있습니다."
+    assert compile_rule({"max": 3})("4") == "3 이하의 점수만 입력할 수 있습니다."
+
+
+def test_check_values_reports_indexes():
+    check = compile_rule({"max": 10})
+    assert check_values(check, ["1", "11", "", "11", "x"]) == [
+        (1, "10 이하의 점수만 입력할 수 있습니다."), (3, "10 이하의 점수만 입력할 수 있습니다."),
+        (4, NOT_NUMBER_MESSAGE)]
+
+
+def test_score_logic_paste_rejects_non_numeric_without_rule(make_workbook, class_students):
+    logic = ScoreLogic()
+    assert logic.load_excel_data(make_workbook("class.xlsx", class_students))[0]
+    applied, violations = logic.update_scores([(0, 0, "abc"), (1, 0, "결석"), (2, 0, "nan"), (3, 0, ""),
+                                               (4, 0, "7")])
+    assert applied == 2
+    assert [(row, message) for row, _, _, message in violations] == [
+        (0, NOT_NUMBER_MESSAGE), (1, NOT_NUMBER_MESSAGE), (2, NOT_NUMBER_MESSAGE)]
+    assert logic.student_data[0][4] == "10" and logic.student_data[4][4] == 7
+    assert logic.validate_score(0, "abc") == NOT_NUMBER_MESSAGE
+
+
+def test_score_logic_rule_is_applied_per_session(make_workbook, class_students):
+    logic = ScoreLogic()
+    assert logic.load_excel_data(make_workbook("class.xlsx", class_students))[0]
+    assert logic.set_validation_rule(0, {"min": 0, "max": 20})[0]
+    assert not logic.set_validation_rule(1, {"min": 5, "max": 1})[0]
+    assert logic.validation_rule(0) == {"min": 0.0, "max": 20.0}
+
+    applied, violations = logic.update_scores([(0, 0, "30"), (0, 1, "30")])
+    assert applied == 1 and violations[0][:2] == (0, 0)
+    assert logic.validation_rules() == {"1회 수행": {"min": 0.0, "max": 20.0}}
+
+    assert logic.set_validation_rule(0, None) == (True, "검증 규칙을 해제했습니다.")
+    assert logic.validate_score(0, "30") is None
@@ -0,0 +1,100 @@
+import pytest
+
+from core.score_logic import ScoreLogic
+
+STUDENTS = [
+    ("1", "1", "김가람", [10, "결석", 3]),
+    ("2", "2", "이나래", [None, 20, 3]),
+    ("1", "3", "박다온", [9.5, None, 1]),
+    ("2", "4", "최라온", ["결시", 5, 2]),
+    ("1", "5", "정마루", [100, 5, None]),
+]
+
+
+@pytest.fixture
+def logic(make_workbook):
+    logic = ScoreLogic()
+    assert logic.load_excel_data(make_workbook("class.xlsx", STUDENTS))[0]
+    return logic
+
+
+def names(logic):
+    return [logic.student_data[r][3] for r in logic.view_rows()]
+
+
+def assert_mapping_consistent(logic):
+    for view_row in range(logic.view_row_count()):
+        assert logic.data_to_view_row(logic.view_to_data_row(view_row)) == view_row
+    assert logic.view_to_data_row(logic.view_row_count()) == -1
+    assert logic.view_to_data_row(-1) == -1
+
+
+def test_default_view_is_identity(logic):
+    assert logic.view_row_count() == 5 and list(logic.view_rows()) == [0, 1, 2, 3, 4]
+    assert logic.data_to_view_row(4) == 4 and logic.data_to_view_row(5) == -1
+    assert_mapping_consistent(logic)
+
+
+def test_sort_numbers_then_text_then_blanks(logic):
+    logic.sort_view(4)
+    assert names(logic) == ["박다온", "김가람", "정마루", "최라온", "이나래"]
+    assert_mapping_consistent(logic)
+
+    logic.sort_view(4, descending=True)
+    assert names(logic) == ["정마루", "김가람", "박다온", "최라온", "이나래"]
+    assert_mapping_consistent(logic)
+
+    logic.sort_view(None)
+    assert logic.sort_spec is None and list(logic.view_rows()) == [0, 1, 2, 3, 4]
+
+
+def test_sort_is_stable_for_equal_keys(logic):
+    logic.sort_view(6)
+    assert names(logic) == ["박다온", "최라온", "김가람", "이나래", "정마루"]
+    logic.sort_view(6, descending=True)
+    assert names(logic) == ["김가람", "이나래", "최라온", "박다온", "정마루"]
+
+
+def test_filter_hides_rows(logic):
+    logic.filter_view(1, " 2 ")
+    assert logic.filter_spec == (1, "2")
+    assert names(logic) == ["이나래", "최라온"]
+    assert logic.data_to_view_row(0) == -1 and logic.data_to_view_row(3) == 1
+    assert_mapping_consistent(logic)
+
+    logic.sort_view(5, descending=True)  # 필터와 정렬을 함께
+    assert names(logic) == ["이나래", "최라온"]
+    assert_mapping_consistent(logic)
+
+    logic.filter_view(1, None)
+    assert logic.view_row_count() == 5
+    assert_mapping_consistent(logic)
+
+
+def test_entry_on_sorted_view_updates_sort_keys(logic):
+    logic.sort_view(4)
+    data_row = logic.view_to_data_row(4)  # 빈 칸인 이나래
+    assert logic.update_score(data_row, 0, "1")
+    # 입력 중에는 행이 움직이지 않고, 다시 정렬하면 새 값으로 정렬
+    assert names(logic)[4] == "이나래"
+    assert logic.data_to_view_row(data_row) == 4
+    logic.sort_view(4)
+    assert names(logic)[0] == "이나래"
+    assert_mapping_consistent(logic)
+
+    logic.undo()
+    logic.sort_view(4)
+    assert names(logic)[-1] == "이나래"
+
+
+def test_view_follows_added_files(logic, make_workbook):
+    logic.sort_view(4, descending=True)
+    assert logic.load_excel_data(make_workbook("more.xlsx", [("3", "1", "한바다", [50, 1, 1])]))[0]
+    assert names(logic)[:2] == ["정마루", "한바다"]
+    assert logic.view_row_count() == 6
+    assert_mapping_consistent(logic)
+
+
+def test_distinct_values(logic):
+    assert logic.distinct_values(1) == ["1", "2"]
+    assert logic.distinct_values(4) == ["9.5", "10", "100", "결시"]
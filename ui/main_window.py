@@ -1,20 +1,58 @@
 import sys
 import os
-import win32com.client
+import json
 import time
 import warnings
 from PySide6.QtWidgets import (QApplication, QMainWindow, QButtonGroup, 
                              QMessageBox, QTableWidgetItem, QHeaderView, 
                              QAbstractItemView, QLabel, QWidget, QLineEdit, 
-                             QPushButton, QComboBox, QStackedWidget, QTableWidget)
+                             QPushButton, QComboBox, QStackedWidget, QTableWidget,
+                             QGroupBox, QDialog, QFileDialog, QProgressDialog, QDockWidget)
 from PySide6.QtUiTools import QUiLoader
-from PySide6.QtCore import QFile, Qt, QFileInfo, QTimer, QUrl
-from PySide6.QtGui import QColor, QDoubleValidator, QIcon, QPixmap
+from PySide6.QtCore import QFile, Qt, QFileInfo, QTimer, QUrl, QSettings
+from PySide6.QtGui import (QAction, QBrush, QColor, QDesktopServices, QDoubleValidator, QIcon, QKeySequence,
+                           QPixmap)
 
 from ui.widgets import DropZone
 from ui.widgets import MultiClassPanel
-from core.score_logic import ScoreLogic
-from services.tts_manager import ITTSManager
+from ui.widgets import ExportDialog
+from ui.widgets import ValidationRuleDialog
+from ui.widgets import GradingSchemeDialog
+from ui.widgets import StudentChoiceDialog
+from ui.widgets import ScoreHistoryPanel
+from core.score_logic import ScoreLogic, CELL_CHANGED, FILE_ADDED, FILE_REMOVED, LOAD_CANCELLED_MESSAGE
+from core.cancel import CancelToken
+from core.memory import format_size
+from core.series import series_deltas, series_trend, sparkline
+from core.snapshot import default_snapshot_path
+from core.exporter import FORMAT_EXTENSIONS, FORMAT_LABELS
+from core.grading import GRADE_HEADERS
+from core.report import summarize_report_results
+from services.tts_manager import ITTSManager, COMMON_SCORE_TEXTS, PREFETCH_LIMIT
+from services.file_watcher import WorkbookWatcher
+from ui.workers import BackgroundTask, LogicEvents
+
+# 점수를 읽을 때의 TTS 속도
+SCORE_SPEECH_RATE = 2
+
+# 시작 시 마지막 세션 복원 여부 (QSettings 키)
+RESTORE_ON_STARTUP_KEY = "session/restore_on_startup"
+
+# 회차별 점수 검증 규칙 (QSettings 키, JSON {회차 이름: 규칙})
+VALIDATION_RULES_KEY = "validation/rules"
+
+# 환산 총점 계산 방식 (QSettings 키, JSON)
+GRADING_SCHEME_KEY = "grading/scheme"
+
+# 저장 전 확인 창에 보여 줄 최대 위반 수
+VALIDATION_REPORT_LIMIT = 20
+
+# 불러온 뒤 알려 줄 중복/충돌 학생 최대 수
+IDENTITY_REPORT_LIMIT = 10
+
+# 불러오기/저장 진행 창 - 이보다 빨리 끝나는 작업은 창을 띄우지 않음
+PROGRESS_DIALOG_DELAY_MS = 400
+LOAD_PROGRESS_STEPS = 1000
 
 def resource_path(relative_path):
     # main.py가 있는 폴더 기준으로 절대경로 반환
@@ -30,8 +68,11 @@ class MainWindow(QMainWindow):
         self.logic = logic
         self.stacked_widget = None
         self.tts = tts  # TTS 관리자 인스턴스
-        self.multi_panel = MultiClassPanel()  # 이동반 패널 인스턴스 생성
+        self.multi_panel = MultiClassPanel(logic)  # 이동반 패널 (학생 데이터는 logic과 공유)
         self.is_processing_student_number = False  # 중복 실행 방지 플래그
+        self._multi_target_row = -1  # 이동반에서 고른 학생의 데이터 row (없으면 -1)
+        self._history_row = -1  # 점수 기록 패널에 표시 중인 학생의 데이터 row
+        self._report_directory = ""  # 반별 보고서를 만드는 폴더
         
         # 성능 최적화를 위한 변수들
         self._update_timer = QTimer()
@@ -40,12 +81,26 @@ class MainWindow(QMainWindow):
         self._pending_table_update = False
         self._signal_blocked = False
         self._cached_pink_color = QColor("#e0ffff")
+        self._highlighted_rows = set()  # 점수를 입력한 데이터 row (정렬 후에도 배경색 유지)
+        self._progress_dialog = None  # 진행 중인 불러오기/저장 (한 번에 하나만)
+        self._progress_token = None
+        self.class_filter_combo = None
+
+        # 불러온 파일이 디스크에서 바뀌면 해당 파일만 다시 읽음
+        self.file_watcher = WorkbookWatcher(parent=self)
+        self.file_watcher.fileChanged.connect(self.on_watched_file_changed)
+
+        # 다른 스레드에서 생긴 데이터 변경도 GUI 스레드에서 화면에 반영
+        self.logic_events = LogicEvents(self)
+        self.logic_events.changed.connect(self._on_logic_event)
+        self._unsubscribe_logic = self.logic.subscribe(self.logic_events.changed.emit)
         
         self.setup_ui()
+        self.setup_menu()
         self.setup_connections()
         self.setWindowTitle("수행평가 점수 입력기 (by melderse 짐승농장)")
         self.setWindowIcon(QIcon(resource_path("icon_SC.png")))
-        self.resize(623, 426)
+        self.resize(623, 426 + self.menuBar().sizeHint().height())
 
     def setup_ui(self):
         """Sets up the UI."""
@@ -72,8 +127,22 @@ class MainWindow(QMainWindow):
             
             # 성능 최적화 설정
             table.setAlternatingRowColors(True)
-            table.setSortingEnabled(False)  # 정렬 비활성화로 성능 향상
+            table.setSortingEnabled(False)  # Qt 정렬 대신 ScoreLogic의 정렬 키/순열 인덱스 사용
             table.setUpdatesEnabled(True)
+
+            header = table.horizontalHeader()
+            header.setSectionsClickable(True)
+            header.setSortIndicatorShown(False)
+
+            # 반 필터 콤보박스 (시트전체 그룹 하단, Clear 버튼 왼쪽)
+            group_box = self.ui.findChild(QGroupBox, "groupBox_3")
+            if group_box:
+                filter_label = QLabel("반 필터", group_box)
+                filter_label.setGeometry(10, 232, 45, 20)
+                self.class_filter_combo = QComboBox(group_box)
+                self.class_filter_combo.setObjectName("class_filter_combo")
+                self.class_filter_combo.setGeometry(60, 230, 100, 24)
+                self.class_filter_combo.addItem("전체")
         
         # 배경 이미지 + 밝기 감소(흐림) 오버레이 적용
         bg_path = resource_path("background.png")
@@ -96,6 +165,94 @@ class MainWindow(QMainWindow):
         self.ui.radioButton_1.setAutoExclusive(True)
         self.ui.radioButton_2.setAutoExclusive(True)
 
+    def setup_menu(self):
+        """메뉴바를 구성합니다."""
+        file_menu = self.menuBar().addMenu("파일")
+
+        save_session_action = QAction("세션 저장", self)
+        save_session_action.triggered.connect(self.on_save_session_triggered)
+        file_menu.addAction(save_session_action)
+
+        restore_session_action = QAction("마지막 세션 복원", self)
+        restore_session_action.triggered.connect(lambda: self.restore_session_snapshot())
+        file_menu.addAction(restore_session_action)
+
+        self.restore_on_startup_action = QAction("시작 시 마지막 세션 복원", self)
+        self.restore_on_startup_action.setCheckable(True)
+        self.restore_on_startup_action.setChecked(
+            QSettings().value(RESTORE_ON_STARTUP_KEY, False, type=bool))
+        self.restore_on_startup_action.toggled.connect(
+            lambda checked: QSettings().setValue(RESTORE_ON_STARTUP_KEY, checked))
+        file_menu.addAction(self.restore_on_startup_action)
+
+        file_menu.addSeparator()
+        self.export_action = QAction("내보내기...", self)
+        self.export_action.triggered.connect(self.on_export_triggered)
+        file_menu.addAction(self.export_action)
+        grade_save_action = QAction("환산 총점/등급 저장", self)
+        grade_save_action.triggered.connect(self.on_save_grades_triggered)
+        file_menu.addAction(grade_save_action)
+        report_action = QAction("반별 보고서 만들기...", self)
+        report_action.triggered.connect(self.on_report_triggered)
+        file_menu.addAction(report_action)
+        file_menu.addSeparator()
+        memory_action = QAction("메모리 사용량...", self)
+        memory_action.triggered.connect(self.on_memory_report_triggered)
+        file_menu.addAction(memory_action)
+        self.file_menu = file_menu
+
+        # 점수 입력 실행 취소/다시 실행
+        edit_menu = self.menuBar().addMenu("편집")
+        self.undo_action = QAction("실행 취소", self)
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_action.triggered.connect(self.on_undo_triggered)
+        edit_menu.addAction(self.undo_action)
+        self.redo_action = QAction("다시 실행", self)
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        self.redo_action.triggered.connect(self.on_redo_triggered)
+        edit_menu.addAction(self.redo_action)
+        edit_menu.addSeparator()
+        paste_action = QAction("점수 붙여넣기", self)
+        paste_action.setShortcut(QKeySequence("Ctrl+Shift+V"))
+        paste_action.triggered.connect(self.on_paste_scores_triggered)
+        edit_menu.addAction(paste_action)
+        rule_action = QAction("검증 규칙...", self)
+        rule_action.triggered.connect(self.on_validation_rule_triggered)
+        edit_menu.addAction(rule_action)
+        grading_action = QAction("환산 총점 설정...", self)
+        grading_action.triggered.connect(self.on_grading_scheme_triggered)
+        edit_menu.addAction(grading_action)
+        edit_menu.aboutToShow.connect(self._update_edit_actions)
+
+        try:
+            rules = json.loads(QSettings().value(VALIDATION_RULES_KEY, "{}", type=str) or "{}")
+        except ValueError:
+            rules = {}
+        self.logic.load_validation_rules(rules)
+        try:
+            scheme = json.loads(QSettings().value(GRADING_SCHEME_KEY, "null", type=str) or "null")
+        except ValueError:
+            scheme = None
+        self.logic.set_grading_scheme(scheme)
+
+        # 통합 문서의 다른 시트는 이 메뉴에서 처음 열 때 읽음
+        self.sheet_menu = self.menuBar().addMenu("시트")
+        self.sheet_menu.aboutToShow.connect(self._populate_sheet_menu)
+
+        # 선택한 학생의 회차별 점수 기록 (회차를 바꾸지 않고 확인)
+        self.history_panel = ScoreHistoryPanel()
+        self.history_dock = QDockWidget("학생 점수 기록", self)
+        self.history_dock.setObjectName("history_dock")
+        self.history_dock.setWidget(self.history_panel)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.history_dock)
+        self.history_dock.hide()
+        self.history_dock.visibilityChanged.connect(self._on_history_dock_visibility_changed)
+        view_menu = self.menuBar().addMenu("보기")
+        history_action = self.history_dock.toggleViewAction()
+        history_action.setText("학생 점수 기록")
+        history_action.setShortcut(QKeySequence("Ctrl+H"))
+        view_menu.addAction(history_action)
+
     def setup_connections(self):
         """Connects all signals to slots."""
         # --- Radio Buttons for Mode Change ---
@@ -114,6 +271,9 @@ class MainWindow(QMainWindow):
         if hasattr(self.ui, 'tableWidget'):
             # 셀 클릭만으로 행 선택 이벤트 처리 - 최적화된 연결
             self.ui.tableWidget.cellClicked.connect(self._on_cell_clicked_optimized)
+            self.ui.tableWidget.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+        if self.class_filter_combo is not None:
+            self.class_filter_combo.currentIndexChanged.connect(self.on_class_filter_changed)
             
         if hasattr(self.ui, 'save_button') and self.ui.save_button is not None:
             with warnings.catch_warnings():
@@ -173,7 +333,103 @@ class MainWindow(QMainWindow):
     def _delayed_update_table(self):
         """지연된 테이블 업데이트"""
         self._pending_table_update = False
+        # 점수 컬럼으로 정렬 중이면 새 회차의 점수 컬럼으로 다시 정렬
+        spec = self.logic.sort_spec
+        score_col = self._current_score_col()
+        if spec is not None and spec[0] >= 4 and score_col is not None and spec[0] != score_col:
+            self.logic.sort_view(score_col, spec[1])
+        self.update_table_view()
+        self._prefetch_columns(score_col)
+
+    def _prefetch_columns(self, score_col):
+        """넓은 시트에서 앞/뒤 회차 컬럼을 백그라운드에서 미리 읽습니다."""
+        if score_col is None:
+            return
+        neighbors = [c for c in (score_col + 1, score_col - 1) if 4 <= c < len(self.logic.headers)]
+        if neighbors:
+            BackgroundTask(self.logic.ensure_columns, neighbors).start()
+
+    def _current_score_col(self):
+        """현재 선택된 회차의 데이터 컬럼 인덱스를 반환합니다."""
+        if not hasattr(self.ui, 'session_combo'):
+            return None
+        current_session_text = self.ui.session_combo.currentText()
+        if not current_session_text:
+            return None
+        try:
+            return int(current_session_text.replace("회", "")) + 3
+        except ValueError:
+            return None
+
+    def _current_data_row(self):
+        """테이블의 현재 행을 데이터 row로 변환합니다."""
+        return self.logic.view_to_data_row(self.ui.tableWidget.currentRow())
+
+    def on_header_clicked(self, section):
+        """헤더 클릭 시 정렬합니다 (오름차순 -> 내림차순 -> 원래 순서)."""
+        if not hasattr(self.ui, 'tableWidget') or not self.logic.files:
+            return
+        # 테이블 컬럼 -> 데이터 컬럼 (반, 번호, 성명, 점수)
+        columns = [1, 2, 3, self._current_score_col()]
+        if section >= len(columns) or columns[section] is None:
+            return
+        col = columns[section]
+
+        header = self.ui.tableWidget.horizontalHeader()
+        spec = self.logic.sort_spec
+        if spec is None or spec[0] != col:
+            self.logic.sort_view(col, descending=False)
+            header.setSortIndicator(section, Qt.AscendingOrder)
+            header.setSortIndicatorShown(True)
+        elif not spec[1]:
+            self.logic.sort_view(col, descending=True)
+            header.setSortIndicator(section, Qt.DescendingOrder)
+            header.setSortIndicatorShown(True)
+        else:
+            self.logic.sort_view(None)
+            header.setSortIndicatorShown(False)
+        self._refresh_view_keep_selection()
+
+    def on_class_filter_changed(self, index):
+        """반 필터 변경 처리"""
+        if self._signal_blocked or self.class_filter_combo is None:
+            return
+        value = None if index <= 0 else self.class_filter_combo.itemText(index)
+        self.logic.filter_view(1, value)
+        self._refresh_view_keep_selection()
+
+    def _refresh_view_keep_selection(self):
+        """정렬/필터 변경 후 같은 학생이 계속 선택되도록 테이블을 갱신합니다."""
+        table = self.ui.tableWidget
+        data_row = self._current_data_row()
         self.update_table_view()
+        view_row = self.logic.data_to_view_row(data_row)
+        if view_row < 0 and table.rowCount() > 0:
+            view_row = 0
+        if view_row >= 0:
+            self._signal_blocked = True
+            table.selectRow(view_row)
+            self._signal_blocked = False
+            table.scrollToItem(table.item(view_row, 0), QAbstractItemView.ScrollHint.EnsureVisible)
+            self.update_student_info_labels(view_row)
+        else:
+            self.update_student_info_labels(-1)
+
+    def _refresh_class_filter_combo(self):
+        """로드된 데이터의 반 목록으로 필터 콤보박스를 채웁니다."""
+        combo = self.class_filter_combo
+        if combo is None:
+            return
+        current = combo.currentText()
+        self._signal_blocked = True
+        combo.clear()
+        combo.addItem("전체")
+        combo.addItems(self.logic.distinct_values(1))
+        index = combo.findText(current)
+        combo.setCurrentIndex(index if index >= 0 else 0)
+        self._signal_blocked = False
+        if combo.currentIndex() <= 0 and self.logic.filter_spec is not None:
+            self.logic.filter_view(1, None)
 
     def apply_table_selection_style(self, disable: bool):
         if hasattr(self.ui, 'tableWidget'):
@@ -273,25 +529,105 @@ class MainWindow(QMainWindow):
 
     def on_files_dropped(self, file_paths):
         """Handles multiple file drop event."""
+        if self._progress_dialog is not None:
+            QMessageBox.information(self, "파일 불러오기", "진행 중인 작업이 끝난 뒤에 다시 시도하세요.")
+            return
         # 파일명 기준 정렬
         file_paths = sorted(file_paths, key=lambda x: os.path.basename(x))
+        # 큰 파일도 창이 멈추지 않도록 백그라운드에서 읽고 진행 상황 표시 (취소 가능)
+        token = self._start_progress("파일 불러오기", "파일을 읽는 중...", LOAD_PROGRESS_STEPS)
+        task = BackgroundTask(self.logic.load_excel_files, file_paths, cancel=token)
+        task.kwargs["progress"] = task.signals.progress.emit
+        task.signals.progress.connect(self._on_load_progress)
+        task.signals.finished.connect(self._on_files_loaded)
+        task.signals.failed.connect(self._on_load_failed)
+        task.start()
+
+    def _start_progress(self, title, label, maximum):
+        """진행 창을 만들고 취소 토큰을 반환합니다 (maximum이 0이면 진행 정도를 모르는 표시)."""
+        token = CancelToken()
+        dialog = QProgressDialog(label, "취소", 0, maximum, self)
+        dialog.setWindowTitle(title)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(PROGRESS_DIALOG_DELAY_MS)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.canceled.connect(self._on_progress_canceled)
+        dialog.setValue(0)
+        self._progress_dialog = dialog
+        self._progress_token = token
+        return token
+
+    def _on_progress_canceled(self):
+        if self._progress_token is not None:
+            self._progress_token.cancel()
+
+    def _finish_progress(self):
+        if self._progress_dialog is not None:
+            self._progress_dialog.canceled.disconnect(self._on_progress_canceled)
+            self._progress_dialog.close()
+            self._progress_dialog.deleteLater()
+        self._progress_dialog = None
+        self._progress_token = None
+
+    def _on_load_progress(self, info):
+        dialog = self._progress_dialog
+        if dialog is None or dialog.wasCanceled():
+            return
+        fraction = info["bytes"] / info["total_bytes"] if info["total_bytes"] else 0
+        dialog.setValue(int((info["files_done"] + min(fraction, 1.0)) / info["file_count"] * LOAD_PROGRESS_STEPS))
+        dialog.setLabelText(f"{os.path.basename(info['path'])} 읽는 중 "
+                            f"({info['file_index'] + 1}/{info['file_count']}) - {info['rows']:,}행")
+
+    def _on_load_failed(self, message):
+        self._finish_progress()
+        QMessageBox.warning(self, "파일 로드 오류", message)
+
+    def _on_files_loaded(self, results):
+        """백그라운드 불러오기 결과 처리 - 취소했으면 아무 파일도 추가되지 않았음"""
+        self._finish_progress()
+        if results and all(message == LOAD_CANCELLED_MESSAGE for _, _, message in results):
+            return
+        file_paths = [path for path, _, _ in results]
         loaded_any = False
-        for file_path in file_paths:
-            success, message = self.logic.load_excel_data(file_path)
+        for file_path, success, message in results:
             if not success:
                 QMessageBox.warning(self, "파일 로드 오류", f"{file_path}: {message}")
             else:
                 loaded_any = True
         if loaded_any:
             self.update_ui_after_file_load(file_paths[0])
+            # 헤더 순서가 다른 파일은 회차 이름으로 맞췄음을 알림
+            notes = [f"{self.logic.display_name(f)}: {note}" for f in self.logic.files
+                     if f['path'] in file_paths and (note := self.logic.schema_note(f))]
+            if notes:
+                QMessageBox.information(self, "회차 컬럼 맞춤", "\n".join(notes))
+            self._report_student_identity()
+
+    def _report_student_identity(self):
+        """여러 곳에 있는 학생(이동반 입력 시 고르게 됨)과 같은 반/번호의 다른 이름을 알립니다."""
+        report = self.logic.identity_report()
+        lines = [f"{class_name}반 {number}번: {', '.join(names)}"
+                 for (class_name, number), names in report['conflicts'].items()]
+        if lines:
+            lines.insert(0, "같은 반/번호에 이름이 다른 학생:")
+        duplicates = report['duplicates']
+        if duplicates:
+            if lines:
+                lines.append("")
+            lines.append(f"여러 곳에 있는 학생 {len(duplicates)}명 (이동반 입력 시 입력할 곳을 고릅니다):")
+            lines += [f"{class_name}반 {number}번 {name} ({len(rows)}곳)"
+                      for (class_name, number, name), rows in duplicates.items()]
+        if not lines:
+            return
+        if len(lines) > IDENTITY_REPORT_LIMIT + 2:
+            hidden = len(lines) - IDENTITY_REPORT_LIMIT
+            lines = lines[:IDENTITY_REPORT_LIMIT] + [f"... 외 {hidden}줄"]
+        QMessageBox.information(self, "학생 중복 확인", "\n".join(lines))
 
     def update_ui_after_file_load(self, file_path):
         """Updates the UI after a file is loaded."""
-        # 파일 리스트 업데이트 최적화
-        if hasattr(self.ui, 'fileListbox'):
-            self.ui.fileListbox.clear()
-            file_names = [QFileInfo(f['path']).fileName() for f in self.logic.files]
-            self.ui.fileListbox.addItems(file_names)
+        self._refresh_file_list()
 
         # 테이블 업데이트 최적화
         if hasattr(self.ui, 'tableWidget'):
@@ -306,12 +642,15 @@ class MainWindow(QMainWindow):
             table.setColumnCount(len(bcd_headers))
             table.setHorizontalHeaderLabels(bcd_headers)
             
-            # 데이터 배치 처리
+            # 데이터 배치 처리 (정렬/필터 순서대로)
+            self._refresh_class_filter_combo()
             student_data = self.logic.student_data
-            table.setRowCount(len(student_data))
+            view_rows = self.logic.view_rows()
+            table.setRowCount(len(view_rows))
             
             # 배치로 아이템 생성
-            for row_idx, row_data in enumerate(student_data):
+            for row_idx, data_row in enumerate(view_rows):
+                row_data = student_data[data_row]
                 for col_idx, src_idx in enumerate(bcd_indices):
                     cell_data = str(row_data[src_idx]) if src_idx < len(row_data) else ''
                     item = QTableWidgetItem(cell_data)
@@ -324,6 +663,7 @@ class MainWindow(QMainWindow):
             
         self.setup_session_combobox(len(self.logic.headers))
         self.update_table_view()
+        self._warm_up_tts()
         
         if self.ui.radioButton_2.isChecked():
             page_multi = self.stacked_widget.findChild(QWidget, "page_multi")
@@ -341,6 +681,44 @@ class MainWindow(QMainWindow):
             self.ui.tableWidget.selectRow(0)
             self.on_row_selected()
 
+    def _is_sound_on(self):
+        """단일반 모드이고 사운드 버튼이 켜져 있는지 확인합니다."""
+        if not self.tts or self.ui.radioButton_2.isChecked():
+            return False
+        page_single = self.stacked_widget.findChild(QWidget, "page_single")
+        sound_button = page_single.findChild(QPushButton, "sound_toggle_button") if page_single else None
+        return bool(sound_button and sound_button.isChecked())
+
+    def _prefetch_tts(self, first_view_row):
+        """first_view_row부터 다음 학생들의 이름을 미리 합성하도록 TTS에 알려줍니다."""
+        if not self._is_sound_on():
+            return
+        student_data = self.logic.student_data
+        items = []
+        for view_row in range(first_view_row, first_view_row + PREFETCH_LIMIT):
+            data_row = self.logic.view_to_data_row(view_row)
+            if data_row < 0:
+                break
+            row = student_data[data_row]
+            name = row[3].strip() if len(row) > 3 else ""
+            if name:
+                items.append((name, None))
+        if items:
+            self.tts.prefetch(items)
+        else:
+            self.tts.cancel_prefetch()
+
+    def _warm_up_tts(self):
+        """로드된 이름의 발음용 형태와 자주 쓰는 점수를 미리 준비해 둡니다."""
+        if not self.tts:
+            return
+        names = [row[3].strip() for row in self.logic.student_data
+                 if len(row) > 3 and row[3].strip()]
+        self.tts.preload_names(names)
+        items = [(name, None) for name in names]
+        items.extend((text, SCORE_SPEECH_RATE) for text in COMMON_SCORE_TEXTS)
+        self.tts.warm_up(items)
+
     def setup_session_combobox(self, max_column):
         """Sets up the session combobox."""
         if hasattr(self.ui, 'session_combo'):
@@ -371,6 +749,9 @@ class MainWindow(QMainWindow):
             headers = self.logic.headers
             
             if score_col_index < len(headers):
+                # 지연 로딩한 시트면 선택한 회차 컬럼을 먼저 읽음
+                self.logic.ensure_columns([score_col_index])
+
                 # 업데이트 차단으로 성능 최적화
                 table.setUpdatesEnabled(False)
                 
@@ -382,9 +763,16 @@ class MainWindow(QMainWindow):
                 for i, h in enumerate(header_items):
                     table.setHorizontalHeaderItem(i, QTableWidgetItem(h))
                 
-                # 데이터 배치 업데이트
+                # 데이터 배치 업데이트 (정렬/필터 순서대로)
                 student_data = self.logic.student_data
-                for row_idx, row_data in enumerate(student_data):
+                view_rows = self.logic.view_rows()
+                if table.rowCount() != len(view_rows):
+                    table.setRowCount(len(view_rows))
+                highlighted = self._highlighted_rows
+                default_brush = QBrush()
+                for row_idx, data_row in enumerate(view_rows):
+                    row_data = student_data[data_row]
+                    background = self._cached_pink_color if data_row in highlighted else default_brush
                     # 반, 번호, 성명
                     for col, src in enumerate([1, 2, 3]):
                         val = row_data[src] if src < len(row_data) else ''
@@ -394,6 +782,7 @@ class MainWindow(QMainWindow):
                             table.setItem(row_idx, col, item)
                         item.setText(str(val))
                         item.setTextAlignment(Qt.AlignCenter)
+                        item.setBackground(background)
                     
                     # 점수
                     value = row_data[score_col_index] if score_col_index < len(row_data) else ''
@@ -403,6 +792,7 @@ class MainWindow(QMainWindow):
                         table.setItem(row_idx, 3, item)
                     item.setText(str(value))
                     item.setTextAlignment(Qt.AlignCenter)
+                    item.setBackground(background)
                 
                 table.resizeColumnsToContents()
                 table.horizontalHeader().setStretchLastSection(True)
@@ -422,6 +812,9 @@ class MainWindow(QMainWindow):
         row_index = selected_rows[0].row()
         self.update_student_info_labels(row_index)
 
+        # 다음 학생들 이름 선합성 (다른 행으로 이동하면 이전 힌트는 대체됨)
+        self._prefetch_tts(row_index + 1)
+
         # 이동반 모드일 때 번호와 성명을 자동으로 입력
         if self.ui.radioButton_2.isChecked():
             self._handle_multi_class_selection(row_index)
@@ -474,9 +867,10 @@ class MainWindow(QMainWindow):
                 session_number = int(current_session_text.replace("회", ""))
                 score_col_index = session_number + 3
                 student_data = self.logic.student_data
+                data_row = self.logic.view_to_data_row(row_index)
                 
-                if 0 <= row_index < len(student_data) and 0 <= score_col_index < len(student_data[row_index]):
-                    score_to_edit = student_data[row_index][score_col_index]
+                if 0 <= data_row < len(student_data) and 0 <= score_col_index < len(student_data[data_row]):
+                    score_to_edit = student_data[data_row][score_col_index]
             except (ValueError, TypeError, IndexError):
                 pass 
         
@@ -486,6 +880,8 @@ class MainWindow(QMainWindow):
             QTimer.singleShot(0, lambda: (current_text_edit.setFocus(), current_text_edit.selectAll()))
     
     def update_student_info_labels(self, row_index):
+        # 뷰 row -> 데이터 row (정렬/필터 적용 시에도 올바른 학생을 표시)
+        row_index = self.logic.view_to_data_row(row_index)
         page_single = self.stacked_widget.findChild(QWidget, "page_single")
         if page_single:
             label_num_val = page_single.findChild(QLabel, "label_num_val")
@@ -497,6 +893,44 @@ class MainWindow(QMainWindow):
         if page_multi:
             self._update_multi_student_table(page_multi, row_index)
 
+        self._history_row = row_index
+        self._refresh_score_history()
+
+    def _on_history_dock_visibility_changed(self, visible):
+        if not visible:
+            return
+        self._refresh_score_history()
+        # 넓은 시트는 아직 읽지 않은 회차가 있으므로 백그라운드에서 모두 읽은 뒤 다시 표시
+        if any(f.get('loaded_cols') is not None for f in self.logic.files):
+            task = BackgroundTask(self.logic.ensure_columns, list(range(4, len(self.logic.headers))))
+            task.signals.finished.connect(self._on_history_columns_loaded)
+            task.start()
+
+    def _on_history_columns_loaded(self, loaded_any):
+        if loaded_any:
+            self._refresh_score_history()
+
+    def _refresh_score_history(self):
+        """점수 기록 패널을 현재 학생의 입력한 회차만으로 다시 그립니다 (패널이 보일 때만)."""
+        if not self.history_dock.isVisible():
+            return
+        data_row = self._history_row
+        if data_row < 0 or data_row >= len(self.logic.student_data):
+            self.history_panel.clear()
+            return
+        points = self.logic.score_series(data_row)
+        combo = self.ui.session_combo if hasattr(self.ui, 'session_combo') else None
+
+        def session_label(session_idx):
+            if combo is not None and session_idx < combo.count():
+                return combo.itemText(session_idx)
+            return f"{session_idx + 1}회"
+        rows = [(session_label(i), value, delta) for i, value, delta in series_deltas(points)]
+        # 환산 총점은 회차를 모두 읽은 뒤에만 표시 (읽는 중이면 _on_history_columns_loaded에서 다시 표시)
+        self.history_panel.show_series(self.logic.student_label(data_row), rows,
+                                       series_trend(points), sparkline([value for _, value in points]),
+                                       self.logic.student_grade(data_row, load=False))
+
     def _update_multi_student_table(self, page_multi, row_index):
         """이동반 학생 테이블 업데이트 최적화"""
         student_table = page_multi.findChild(QTableWidget, "studentTable")
@@ -559,12 +993,12 @@ class MainWindow(QMainWindow):
         label_num_val.setText(display_number)
         label_name.setText(name_text)
         
-        # TTS: 단일반 모드, 사운드 ON, 이름이 있을 때 마지막 한글자만 읽기
+        # TTS: 단일반 모드, 사운드 ON, 이름이 있을 때 마지막 한글자만 읽기 (TTS에서 변환)
         if self.tts and not self.ui.radioButton_2.isChecked() and name_text:
             page_single = self.stacked_widget.findChild(QWidget, "page_single")
             sound_button = page_single.findChild(QPushButton, "sound_toggle_button") if page_single else None
             if sound_button and sound_button.isChecked():
-                self.tts.speak_name(str(name_text[-1]))
+                self.tts.speak_name(str(name_text))
 
     def on_score_entered(self):
         """최적화된 점수 입력 처리"""
@@ -579,19 +1013,24 @@ class MainWindow(QMainWindow):
 
         score_text = text_edit.text().strip()
         
-        # 입력 검증
-        try:
-            float(score_text)
-        except ValueError:
-            QMessageBox.warning(self, "입력 오류", "숫자만 입력가능합니다.")
+        # 입력 검증 (숫자 여부와 회차 규칙은 validate_score에서 함께 확인)
+        if not score_text:
             return
+        if hasattr(self.ui, 'session_combo'):
+            error = self.logic.validate_score(self.ui.session_combo.currentIndex(), score_text)
+            if error:
+                QMessageBox.warning(self, "입력 오류", error)
+                return
+
+        # 점수를 읽는 동안 다음 학생 이름을 미리 합성
+        self._prefetch_tts(current_row + 1)
 
         # TTS: 단일반 모드, 사운드 ON, 숫자 있을 때 읽기
         if self.tts and not self.ui.radioButton_2.isChecked() and score_text:
             page_single = self.stacked_widget.findChild(QWidget, "page_single")
             sound_button = page_single.findChild(QPushButton, "sound_toggle_button") if page_single else None
             if sound_button and sound_button.isChecked():
-                self.tts.speak_name(str(score_text), rate=2)
+                self.tts.speak_score(str(score_text), rate=SCORE_SPEECH_RATE)
 
         if not hasattr(self.ui, 'session_combo'): 
             return
@@ -601,7 +1040,11 @@ class MainWindow(QMainWindow):
             return
         
         # 데이터 업데이트
-        self.logic.update_score(current_row, session_index, score_text)
+        data_row = self.logic.view_to_data_row(current_row)
+        if not self.logic.update_score(data_row, session_index, score_text):
+            self._warn_missing_session(data_row)
+            return
+        self._highlighted_rows.add(data_row)
 
         # UI 업데이트 최적화
         table = self.ui.tableWidget
@@ -634,6 +1077,14 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.information(self, "알림", "마지막 학생까지 점수 입력이 완료되었습니다.")
 
+    def _warn_missing_session(self, data_row):
+        """학생의 파일에 현재 회차 컬럼이 없을 때 알립니다."""
+        file_idx = self.logic.row_to_file_idx[data_row] if 0 <= data_row < len(self.logic.row_to_file_idx) else -1
+        name = self.logic.display_name(self.logic.files[file_idx]) if file_idx >= 0 else ""
+        QMessageBox.warning(self, "회차 없음",
+                            f"{name}에는 '{self.ui.session_combo.currentText()}' 컬럼이 없어 "
+                            "점수를 입력할 수 없습니다.")
+
     def on_sound_toggled(self, checked):
         """Handles the sound toggle button state change."""
         button = self.sender()
@@ -645,21 +1096,510 @@ class MainWindow(QMainWindow):
                 button.setText("🔇")
                 button.setStyleSheet("background-color: #f8f8f8; color: #888; border-radius: 8px;")
 
-    def save_to_excel(self):
-        """Saves the data to an Excel file."""
-        success, message = self.logic.save_to_excel()
+    def save_to_excel(self, grades=False):
+        """Saves the data to an Excel file (grades=True면 모든 시트에 환산 총점/등급 컬럼도 기록)."""
+        if self._progress_dialog is not None:
+            QMessageBox.information(self, "저장", "진행 중인 작업이 끝난 뒤에 다시 시도하세요.")
+            return
+        # 검증 규칙에 맞지 않는 점수가 있으면 파일/행별로 보여 주고 확인
+        violations = self.logic.validate_all()
+        if violations:
+            lines = [f"{self.logic.display_name(v['file'])} {v['row']}행 {v['name']} "
+                     f"[{v['session']}] '{v['value']}': {v['message']}"
+                     for v in violations[:VALIDATION_REPORT_LIMIT]]
+            if len(violations) > VALIDATION_REPORT_LIMIT:
+                lines.append(f"... 외 {len(violations) - VALIDATION_REPORT_LIMIT}건")
+            reply = QMessageBox.question(
+                self, "검증 규칙 위반",
+                f"검증 규칙에 맞지 않는 점수가 {len(violations)}건 있습니다:\n"
+                + "\n".join(lines) + "\n\n그래도 저장하시겠습니까?",
+                QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+
+        # 불러온 뒤 다른 곳에서 수정된 파일이 있으면 처리 방법 확인
+        merge_paths = ()
+        changed = self.logic.check_external_changes()
+        if changed:
+            names = "\n".join(dict.fromkeys(os.path.basename(f['path']) for f in changed))
+            reply = QMessageBox.question(
+                self, "외부 변경 감지",
+                f"불러온 뒤 다른 곳에서 수정된 파일이 있습니다:\n{names}\n\n"
+                "예: 내가 수정한 셀만 최신 파일에 병합\n"
+                "아니요: 내 데이터로 덮어쓰기",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
+            if reply == QMessageBox.Cancel:
+                return
+            if reply == QMessageBox.Yes:
+                merge_paths = list(dict.fromkeys(f['path'] for f in changed))
+
+        # 저장은 백그라운드에서 하고 파일별 완료를 진행 창에 표시 (취소하면 남은 파일은 저장하지 않음)
+        token = self._start_progress("저장", "저장하는 중...", 0)
+        task = BackgroundTask(self.logic.save_to_excel, merge_paths, cancel=token, grades=grades)
+        task.kwargs["progress"] = task.signals.progress.emit
+        task.signals.progress.connect(self._on_save_progress)
+        task.signals.finished.connect(self._on_save_finished)
+        task.signals.failed.connect(self._on_save_failed)
+        task.start()
+
+    def _on_save_progress(self, info):
+        dialog = self._progress_dialog
+        if dialog is None or dialog.wasCanceled():
+            return
+        dialog.setMaximum(info["file_count"])
+        dialog.setValue(info["files_done"])
+        dialog.setLabelText(f"{os.path.basename(info['path'])} 저장 완료 "
+                            f"({info['files_done']}/{info['file_count']})")
+
+    def _on_save_failed(self, message):
+        self._finish_progress()
+        QMessageBox.critical(self, "저장 오류", message)
+
+    def _on_save_finished(self, results):
+        self._finish_progress()
+        # 병합 저장한 파일은 다른 곳에서 바뀐 셀도 화면에 반영
+        for result in results:
+            if result['status'] == "merged":
+                self.reload_changed_file(result['path'])
+        success, message = self.logic.summarize_save_results(results)
         if success:
             QMessageBox.information(self, "저장 완료", message)
+        elif all(r['status'] != "failed" for r in results) and results:
+            QMessageBox.information(self, "저장 취소", message)
         else:
             QMessageBox.critical(self, "저장 오류", message)
 
+    def on_watched_file_changed(self, path):
+        """감시 중인 파일 변경 처리 - 직접 저장한 경우처럼 내용이 같으면 무시합니다."""
+        if self.logic.is_file_changed(path):
+            self.reload_changed_file(path)
+
+    def reload_changed_file(self, path):
+        """바뀐 파일 하나만 다시 읽어 선택과 세션을 유지한 채 테이블에 반영합니다."""
+        if not hasattr(self.ui, 'tableWidget'):
+            return
+        table = self.ui.tableWidget
+        student_data = self.logic.student_data
+        data_row = self._current_data_row()
+        selected_identity = tuple(student_data[data_row][1:4]) if data_row >= 0 else None
+
+        try:
+            diff = self.logic.reload_file(path)
+        except Exception as e:
+            QMessageBox.warning(self, "다시 읽기 오류", f"{os.path.basename(path)}: {e}")
+            return
+        if diff is None:
+            return
+
+        if diff['structure_changed']:
+            # 행이 바뀌었으면 전체 갱신 후 같은 학생을 다시 선택
+            self._highlighted_rows.clear()
+            self._refresh_class_filter_combo()
+            self.update_table_view()
+            student_data = self.logic.student_data
+            new_row = next((i for i, row in enumerate(student_data)
+                            if tuple(row[1:4]) == selected_identity), -1)
+            view_row = self.logic.data_to_view_row(new_row)
+            if view_row >= 0:
+                self._signal_blocked = True
+                table.selectRow(view_row)
+                self._signal_blocked = False
+        # 행 구조가 그대로면 바뀐 셀은 CELL_CHANGED 이벤트로 갱신됨
+
+        if diff['conflicts']:
+            QMessageBox.information(
+                self, "외부 변경 반영",
+                f"{os.path.basename(path)}에서 내가 수정한 셀 {len(diff['conflicts'])}개가 "
+                "다른 곳에서도 수정되어 파일의 값으로 바뀌었습니다.")
+
+    def _update_edit_actions(self):
+        self.undo_action.setEnabled(self.logic.can_undo())
+        self.redo_action.setEnabled(self.logic.can_redo())
+
+    def on_undo_triggered(self):
+        self._apply_history_step(self.logic.undo())
+
+    def on_redo_triggered(self):
+        self._apply_history_step(self.logic.redo())
+
+    def _apply_history_step(self, cells):
+        """실행 취소/다시 실행한 학생을 선택합니다 (바뀐 셀은 CELL_CHANGED 이벤트로 갱신됨)."""
+        if not cells or not hasattr(self.ui, 'tableWidget'):
+            return
+        data_row, col = cells[0]
+        score_col = self._current_score_col()
+        if col >= 4 and col != score_col and hasattr(self.ui, 'session_combo') \
+                and col - 4 < self.ui.session_combo.count():
+            # 다른 회차의 입력이면 그 회차로 전환 (테이블 전체가 다시 그려짐)
+            self.ui.session_combo.setCurrentIndex(col - 4)
+            self.update_table_view()
+
+        table = self.ui.tableWidget
+        view_row = self.logic.data_to_view_row(data_row)
+        if view_row >= 0:
+            self._signal_blocked = True
+            table.selectRow(view_row)
+            self._signal_blocked = False
+            table.scrollToItem(table.item(view_row, 0), QAbstractItemView.ScrollHint.EnsureVisible)
+            self.update_student_info_labels(view_row)
+
+    def on_validation_rule_triggered(self):
+        """현재 회차의 검증 규칙을 설정하고 QSettings에 저장합니다."""
+        if not hasattr(self.ui, 'session_combo') or self.ui.session_combo.currentIndex() < 0:
+            QMessageBox.warning(self, "회차 오류", "회차를 선택하세요.")
+            return
+        session_index = self.ui.session_combo.currentIndex()
+        dialog = ValidationRuleDialog(self.ui.session_combo.currentText(),
+                                      self.logic.validation_rule(session_index), self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        success, message = self.logic.set_validation_rule(session_index, dialog.rule())
+        if not success:
+            QMessageBox.warning(self, "검증 규칙", message)
+            return
+        QSettings().setValue(VALIDATION_RULES_KEY,
+                             json.dumps(self.logic.validation_rules(), ensure_ascii=False))
+
+    def on_grading_scheme_triggered(self):
+        """회차별 가중치/만점, 반올림, 등급 구간을 설정하고 QSettings에 저장합니다."""
+        labels = [" ".join(h.split()) for h in self.logic.headers[4:]]
+        labels = [label for label in dict.fromkeys(labels) if label and label not in GRADE_HEADERS]
+        scheme = self.logic.grading_scheme()
+        if not labels and scheme:
+            labels = list(scheme['sessions'])
+        if not labels:
+            QMessageBox.warning(self, "환산 총점", "먼저 엑셀 파일을 불러오세요.")
+            return
+        dialog = GradingSchemeDialog(labels, scheme, self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        success, message = self.logic.set_grading_scheme(dialog.scheme())
+        if not success:
+            QMessageBox.warning(self, "환산 총점", message)
+            return
+        QSettings().setValue(GRADING_SCHEME_KEY,
+                             json.dumps(self.logic.grading_scheme(), ensure_ascii=False))
+        self._refresh_score_history()
+        QMessageBox.information(self, "환산 총점", message)
+
+    def on_save_grades_triggered(self):
+        """수정한 점수와 함께 모든 시트에 환산 총점/등급 컬럼을 저장합니다."""
+        if not self.logic.files:
+            QMessageBox.warning(self, "저장 오류", "저장할 파일이 없습니다.")
+            return
+        if self.logic.grading_scheme() is None:
+            QMessageBox.warning(self, "환산 총점", "편집 > 환산 총점 설정에서 계산 방식을 먼저 설정하세요.")
+            return
+        self.save_to_excel(grades=True)
+
+    def on_paste_scores_triggered(self):
+        """클립보드의 점수(한 줄에 하나)를 선택한 학생부터 화면 순서대로 현재 회차에 입력합니다."""
+        if not hasattr(self.ui, 'tableWidget') or not hasattr(self.ui, 'session_combo'):
+            return
+        session_index = self.ui.session_combo.currentIndex()
+        start = self.ui.tableWidget.currentRow()
+        if session_index < 0 or start < 0:
+            QMessageBox.warning(self, "붙여넣기", "회차와 시작할 학생을 선택하세요.")
+            return
+        lines = QApplication.clipboard().text().splitlines()
+        while lines and not lines[-1].strip():
+            lines.pop()
+        if not lines:
+            return
+
+        entries = []
+        for offset, line in enumerate(lines):
+            data_row = self.logic.view_to_data_row(start + offset)
+            if data_row < 0:
+                break
+            # 엑셀에서 복사한 여러 열 중 첫 열만 사용
+            entries.append((data_row, session_index, line.split("\t")[0].strip()))
+        applied, violations = self.logic.update_scores(entries)
+        rejected = {row for row, _, _, _ in violations}
+        self._highlighted_rows.update(row for row, _, _ in entries if row not in rejected)
+        self.update_table_view()
+
+        skipped = len(lines) - len(entries)
+        if violations or skipped:
+            student_data = self.logic.student_data
+            details = [f"{student_data[row][3]} '{score}': {message}"
+                       for row, _, score, message in violations[:VALIDATION_REPORT_LIMIT]]
+            if skipped:
+                details.append(f"학생 수보다 많은 {skipped}줄은 입력하지 않았습니다.")
+            QMessageBox.warning(self, "붙여넣기",
+                                f"{applied}개 입력, {len(violations)}개 제외:\n" + "\n".join(details))
+
+    def _refresh_file_list(self):
+        """파일 리스트와 감시 대상을 현재 불러온 파일로 맞춥니다."""
+        files = list(self.logic.files)
+        if hasattr(self.ui, 'fileListbox'):
+            self.ui.fileListbox.clear()
+            self.ui.fileListbox.addItems([self.logic.display_name(f) for f in files])
+        self.file_watcher.set_paths([f['path'] for f in files])
+
+    def _on_logic_event(self, event):
+        """ScoreLogic 변경 이벤트 처리 (GUI 스레드)"""
+        if event["type"] == CELL_CHANGED:
+            self._refresh_data_cells(event["cells"])
+            if any(data_row == self._history_row for data_row, _ in event["cells"]):
+                self._refresh_score_history()
+            return
+        if event["type"] in (FILE_ADDED, FILE_REMOVED):
+            self._refresh_file_list()
+        self._refresh_score_history()
+
+    def _refresh_data_cells(self, cells):
+        """바뀐 데이터 셀 [(data_row, col)] 중 화면에 보이는 셀만 다시 표시합니다."""
+        if not cells or not hasattr(self.ui, 'tableWidget'):
+            return
+        table = self.ui.tableWidget
+        student_data = self.logic.student_data
+        visible_cols = {1: 0, 2: 1, 3: 2}
+        score_col = self._current_score_col()
+        if score_col is not None:
+            visible_cols[score_col] = 3
+        for changed_row, col in cells:
+            table_col = visible_cols.get(col)
+            if table_col is None or changed_row >= len(student_data):
+                continue
+            view_row = self.logic.data_to_view_row(changed_row)
+            if view_row < 0:
+                continue
+            item = table.item(view_row, table_col)
+            if item:
+                row = student_data[changed_row]
+                item.setText(str(row[col]) if col < len(row) else "")
+
+    def save_session_snapshot(self, path=None):
+        """현재 세션(파일, 데이터, 수정 셀, 회차, 선택)을 스냅샷으로 저장합니다."""
+        if not self.logic.files:
+            return False
+        ui_state = {
+            "session_index": self.ui.session_combo.currentIndex() if hasattr(self.ui, 'session_combo') else -1,
+            "selected_row": self._current_data_row() if hasattr(self.ui, 'tableWidget') else -1,
+            "multi_mode": self.ui.radioButton_2.isChecked(),
+        }
+        self.logic.save_snapshot(path or default_snapshot_path(), ui_state)
+        return True
+
+    def on_save_session_triggered(self):
+        try:
+            if self.save_session_snapshot():
+                QMessageBox.information(self, "세션 저장", "현재 세션을 저장했습니다.")
+            else:
+                QMessageBox.information(self, "세션 저장", "저장할 데이터가 없습니다.")
+        except Exception as e:
+            QMessageBox.critical(self, "세션 저장 오류", str(e))
+
+    def restore_session_snapshot(self, path=None, quiet=False):
+        """
+        스냅샷으로 세션을 바로 복원하고, 원본 파일은 백그라운드에서 확인합니다.
+        바뀐 원본은 해당 파일만 다시 읽습니다.
+        """
+        path = path or default_snapshot_path()
+        if not os.path.exists(path):
+            if not quiet:
+                QMessageBox.information(self, "세션 복원", "저장된 세션이 없습니다.")
+            return False
+
+        success, ui_state = self.logic.restore_snapshot(path)
+        if not success:
+            if not quiet:
+                QMessageBox.warning(self, "세션 복원 오류", ui_state)
+            return False
+        self._highlighted_rows.clear()
+
+        # 모드 복원 (데이터가 이미 로드되어 있으므로 경고 없이 전환)
+        multi_mode = ui_state.get("multi_mode", False)
+        self.prev_radio_state = 2 if multi_mode else 1
+        self._signal_blocked = True
+        (self.ui.radioButton_2 if multi_mode else self.ui.radioButton_1).setChecked(True)
+        self._signal_blocked = False
+        self.apply_table_selection_style(multi_mode)
+        self.stacked_widget.setCurrentIndex(0 if multi_mode else 1)
+
+        self.update_ui_after_file_load(None)
+        session_index = ui_state.get("session_index", -1)
+        if hasattr(self.ui, 'session_combo') and 0 <= session_index < self.ui.session_combo.count():
+            self.ui.session_combo.setCurrentIndex(session_index)
+            self.update_table_view()
+        view_row = self.logic.data_to_view_row(ui_state.get("selected_row", -1))
+        if view_row >= 0:
+            self.ui.tableWidget.selectRow(view_row)
+            self.on_row_selected()
+
+        # 원본 파일 확인은 백그라운드에서
+        task = BackgroundTask(self.logic.check_source_files)
+        task.signals.finished.connect(self._on_source_files_checked)
+        task.start()
+        return True
+
+    def _on_source_files_checked(self, result):
+        """복원한 세션의 원본 파일 확인 결과 처리"""
+        for path in result["changed"]:
+            self.reload_changed_file(path)
+        if result["missing"]:
+            names = "\n".join(os.path.basename(p) for p in result["missing"])
+            QMessageBox.warning(self, "원본 파일 없음",
+                                f"다음 원본 파일을 찾을 수 없습니다. 저장하면 오류가 발생합니다:\n{names}")
+
+    def _populate_sheet_menu(self):
+        """아직 열지 않은 시트 목록으로 시트 메뉴를 채웁니다."""
+        menu = self.sheet_menu
+        menu.clear()
+        for path in dict.fromkeys(f['path'] for f in self.logic.files):
+            file_name = os.path.basename(path)
+            for sheet_name in self.logic.unopened_sheets(path):
+                action = menu.addAction(f"{file_name} - {sheet_name}")
+                action.triggered.connect(
+                    lambda checked=False, p=path, n=sheet_name: self.open_sheet(p, n))
+        if menu.isEmpty():
+            action = menu.addAction("열 수 있는 다른 시트가 없습니다")
+            action.setEnabled(False)
+
+    def open_sheet(self, path, sheet_name):
+        """시트를 읽어 테이블에 추가합니다 (회차 선택은 유지)."""
+        success, message = self.logic.open_sheet(path, sheet_name)
+        if not success:
+            QMessageBox.warning(self, "시트 열기 오류", f"{os.path.basename(path)} - {sheet_name}: {message}")
+            return
+        session_index = self.ui.session_combo.currentIndex() if hasattr(self.ui, 'session_combo') else -1
+        self.update_ui_after_file_load(path)
+        if 0 <= session_index < self.ui.session_combo.count():
+            self.ui.session_combo.setCurrentIndex(session_index)
+            self.update_table_view()
+
+    def on_export_triggered(self):
+        """불러온 모든 파일을 하나의 파일로 내보냅니다 (백그라운드에서 실행)."""
+        if not self.logic.files:
+            QMessageBox.information(self, "내보내기", "내보낼 데이터가 없습니다.")
+            return
+        dialog = ExportDialog(self.logic.session_count(), self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        fmt, roster_cols, sessions = dialog.selection()
+        if not roster_cols and not sessions:
+            QMessageBox.warning(self, "내보내기", "내보낼 컬럼을 선택하세요.")
+            return
+
+        default_dir = os.path.dirname(self.logic.files[0]['path'])
+        path, _ = QFileDialog.getSaveFileName(
+            self, "내보내기", os.path.join(default_dir, "성적" + FORMAT_EXTENSIONS[fmt]), FORMAT_LABELS[fmt])
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += FORMAT_EXTENSIONS[fmt]
+
+        self.export_action.setEnabled(False)
+        task = BackgroundTask(self.logic.export_data, path, fmt, roster_cols, sessions)
+        task.kwargs["progress"] = task.signals.progress.emit
+        task.signals.progress.connect(self._on_export_progress)
+        task.signals.finished.connect(self._on_export_finished)
+        task.signals.failed.connect(self._on_export_failed)
+        task.start()
+
+    def _on_export_progress(self, count):
+        self.export_action.setText(f"내보내는 중... ({count}명)")
+
+    def _on_export_finished(self, result):
+        self.export_action.setText("내보내기...")
+        self.export_action.setEnabled(True)
+        success, message = result
+        if success:
+            QMessageBox.information(self, "내보내기 완료", message)
+        else:
+            QMessageBox.warning(self, "내보내기 오류", message)
+
+    def _on_export_failed(self, message):
+        self._on_export_finished((False, message))
+
+    def on_report_triggered(self):
+        """불러온 모든 시트의 반별 보고서(HTML)를 고른 폴더에 만듭니다 (워커 프로세스에서 병렬로)."""
+        if not self.logic.files:
+            QMessageBox.information(self, "보고서", "보고서를 만들 데이터가 없습니다.")
+            return
+        if self._progress_dialog is not None:
+            QMessageBox.information(self, "보고서", "진행 중인 작업이 끝난 뒤에 다시 시도하세요.")
+            return
+        directory = QFileDialog.getExistingDirectory(
+            self, "보고서를 저장할 폴더", os.path.dirname(self.logic.files[0]['path']))
+        if not directory:
+            return
+
+        self._report_directory = directory
+        token = self._start_progress("보고서", "보고서를 만드는 중...", len(self.logic.files))
+        task = BackgroundTask(self.logic.generate_reports, directory, cancel=token)
+        task.kwargs["progress"] = task.signals.progress.emit
+        task.signals.progress.connect(self._on_report_progress)
+        task.signals.finished.connect(self._on_report_finished)
+        task.signals.failed.connect(self._on_report_failed)
+        task.start()
+
+    def _on_report_progress(self, info):
+        dialog = self._progress_dialog
+        if dialog is None or dialog.wasCanceled():
+            return
+        dialog.setMaximum(info["file_count"])
+        dialog.setValue(info["files_done"])
+        dialog.setLabelText(f"{os.path.basename(info['path'])} 완료 ({info['files_done']}/{info['file_count']})")
+
+    def _on_report_failed(self, message):
+        self._finish_progress()
+        QMessageBox.critical(self, "보고서 오류", message)
+
+    def _on_report_finished(self, results):
+        self._finish_progress()
+        success, message = summarize_report_results(results, self._report_directory)
+        if success:
+            QMessageBox.information(self, "보고서 완료", message)
+            QDesktopServices.openUrl(QUrl.fromLocalFile(self._report_directory))
+        elif all(r['status'] != "failed" for r in results) and results:
+            QMessageBox.information(self, "보고서 취소", message)
+        else:
+            QMessageBox.critical(self, "보고서 오류", message)
+
+    def on_memory_report_triggered(self):
+        """시트별/자료 구조별 메모리 사용량을 보여 줍니다."""
+        report = self.logic.memory_report()
+        lines = [f"{f['name']}: {format_size(f['total'])} ({f['rows']}행, 데이터 {format_size(f['data'])})"
+                 for f in report['files']] or ["불러온 파일 없음"]
+        lines.append("")
+        lines += [f"{name}: {format_size(size)}" for name, size in report['structures'].items()]
+        lines.append(f"합계: {format_size(report['total'])}")
+        traced = report['traced']
+        if traced is not None:
+            lines.append("")
+            lines.append(f"tracemalloc 현재 {format_size(traced['current'])}, 최대 {format_size(traced['peak'])}")
+            lines += [f"  {where}: {format_size(size)}" for where, size, _ in traced['top'][:5]]
+        QMessageBox.information(self, "메모리 사용량", "\n".join(lines))
+
+    def closeEvent(self, event):
+        """종료 시 다음 실행에서 복원할 수 있도록 세션을 저장합니다."""
+        try:
+            self.save_session_snapshot()
+        except Exception:
+            pass
+        self._unsubscribe_logic()
+        super().closeEvent(event)
+
     def clear_table_and_data(self):
         """Clears the table and loaded data."""
         self.logic.clear_data()
+        self.file_watcher.clear()
+        self._highlighted_rows.clear()
+        self._multi_target_row = -1
+        if self.tts:
+            self.tts.cancel_prefetch()
         if hasattr(self.ui, 'fileListbox'):
             self.ui.fileListbox.clear()
+        if self.class_filter_combo is not None:
+            self._signal_blocked = True
+            self.class_filter_combo.clear()
+            self.class_filter_combo.addItem("전체")
+            self._signal_blocked = False
         if hasattr(self.ui, 'tableWidget'):
             table = self.ui.tableWidget
+            table.horizontalHeader().setSortIndicatorShown(False)
             table.setUpdatesEnabled(False)
             table.setRowCount(0)
             table.setColumnCount(0)
@@ -687,29 +1627,34 @@ class MainWindow(QMainWindow):
                 return
                 
             number = student_number_input.text().strip()
+            self._multi_target_row = -1
             if not number:
                 student_table.clearContents()
                 student_table.setRowCount(0)
                 return
 
-            # 검색 최적화 - 한 번의 순회로 처리
-            results = []
-            table = self.ui.tableWidget
-            for row in range(table.rowCount()):
-                num_item = table.item(row, 1)
-                name_item = table.item(row, 2)
-                if num_item and name_item and num_item.text() == number:
-                    results.append([num_item.text(), name_item.text()])
+            # 저장 엔진에서 번호로 검색 (필터로 숨겨진 학생은 제외, 화면 순서대로)
+            student_data = self.logic.student_data
+            data_rows = [r for r in self.logic.find_students(number=number)
+                         if self.logic.data_to_view_row(r) >= 0]
+            data_rows.sort(key=self.logic.data_to_view_row)
+            # 같은 학생이 여러 파일에 있을 수 있으므로 파일도 표시하고, 행마다 데이터 row를 기억
+            results = [[student_data[r][2].strip(), student_data[r][3].strip(),
+                        self.logic.display_name(self.logic.files[self.logic.row_to_file_idx[r]])]
+                       for r in data_rows]
+            if len(data_rows) == 1:
+                self._multi_target_row = data_rows[0]
 
             # 테이블 업데이트 최적화
             student_table.setUpdatesEnabled(False)
             student_table.setRowCount(len(results))
-            student_table.setColumnCount(2)
-            student_table.setHorizontalHeaderLabels(["번호", "이름"])
+            student_table.setColumnCount(3)
+            student_table.setHorizontalHeaderLabels(["번호", "이름", "파일"])
             
             for i, row in enumerate(results):
                 for j, text in enumerate(row):
                     item = QTableWidgetItem(text)
+                    item.setData(Qt.UserRole, data_rows[i])
                     student_table.setItem(i, j, item)
             
             student_table.resizeColumnsToContents()
@@ -752,6 +1697,24 @@ class MainWindow(QMainWindow):
             else:
                 student_name_label.setText("")
 
+    def _resolve_multi_student(self, number, name):
+        """
+        화면에 보이는 학생 중 번호/이름이 맞는 데이터 row를 찾습니다.
+        여러 곳에 있으면 고르게 하고, 취소하면 None, 없으면 -1을 반환합니다.
+        """
+        candidates = [r for r in self.logic.lookup_student(name, number=number or None)
+                      if self.logic.data_to_view_row(r) >= 0]
+        if not candidates:
+            return -1
+        if len(candidates) == 1:
+            return candidates[0]
+        candidates.sort(key=self.logic.data_to_view_row)
+        dialog = StudentChoiceDialog(name, [(r, self.logic.student_label(r)) for r in candidates], self)
+        if dialog.exec() != QDialog.Accepted:
+            return None
+        self._multi_target_row = dialog.selected_row()
+        return self._multi_target_row
+
     def on_multi_student_table_cell_clicked(self, row, col):
         """이동반 학생 테이블 셀 클릭 처리"""
         page_multi = self.stacked_widget.findChild(QWidget, "page_multi")
@@ -769,6 +1732,8 @@ class MainWindow(QMainWindow):
         name_item = student_table.item(row, 1)
         if name_item:
             student_name_label.setText(name_item.text())
+            data_row = name_item.data(Qt.UserRole)
+            self._multi_target_row = data_row if data_row is not None else -1
             
             def clear_and_focus():
                 student_number_input = page_multi.findChild(QLineEdit, "studentNumberInput")
@@ -799,6 +1764,11 @@ class MainWindow(QMainWindow):
         score_text = score_input.text().strip()
         if not score_text:
             return
+        if hasattr(self.ui, 'session_combo'):
+            error = self.logic.validate_score(self.ui.session_combo.currentIndex(), score_text)
+            if error:
+                QMessageBox.warning(self, "입력 오류", error)
+                return
 
         student_name_label = page_multi.findChild(QLabel, "studentName")
         if not student_name_label:
@@ -814,19 +1784,28 @@ class MainWindow(QMainWindow):
         
         student_number_input = page_multi.findChild(QLineEdit, "studentNumberInput")
         current_number = student_number_input.text().strip() if student_number_input else ""
+
+        # 검색 결과에서 고른 행이 있으면 그 행에, 없으면 식별 색인으로 찾아서 입력
+        target_row = self._multi_target_row
+        if target_row >= 0 and (target_row >= len(self.logic.student_data)
+                                or self.logic.identity_key(self.logic.student_data[target_row])[2] != current_name):
+            target_row = -1
         
         # 학생 찾기 및 점수 업데이트 최적화
-        success = self._update_multi_student_score(current_number, current_name, score_text)
+        success = self._update_multi_student_score(current_number, current_name, score_text, target_row)
         
         if success:
             score_input.clear()
             if student_number_input:
                 student_number_input.setFocus()
-        else:
+        elif success is False:
             QMessageBox.warning(self, "찾기 실패", f"학생 '{current_name}'을 tableWidget에서 찾을 수 없습니다.")
 
-    def _update_multi_student_score(self, number, name, score):
-        """이동반 학생 점수 업데이트"""
+    def _update_multi_student_score(self, number, name, score, data_row=-1):
+        """
+        이동반 학생 점수 업데이트
+        반환값: 입력했으면 True, 학생을 찾지 못했으면 False, 그 밖에 입력하지 않았으면 None
+        """
         if not hasattr(self.ui, 'tableWidget') or not hasattr(self.ui, 'session_combo'):
             return False
             
@@ -837,38 +1816,36 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "회차 오류", "회차를 선택하세요.")
             return False
         
-        # 학생 찾기
-        for r in range(table.rowCount()):
-            num_item = table.item(r, 1)
-            name_item = table.item(r, 2)
-            
-            if num_item and name_item:
-                num_text = num_item.text().strip()
-                name_text = name_item.text().strip()
-                
-                # 번호와 이름 매칭
-                if ((number and num_text == number and name_text == name) or 
-                    (not number and name_text == name)):
-                    # 데이터 업데이트
-                    self.logic.update_score(r, session_index, score)
-                    
-                    # UI 업데이트
-                    score_col = 3
-                    item = table.item(r, score_col)
-                    if not item:
-                        item = QTableWidgetItem()
-                        table.setItem(r, score_col, item)
-                    item.setText(score)
-                    item.setTextAlignment(Qt.AlignCenter)
-                    
-                    # 배경색 및 포커스 적용 (단일반과 동일하게)
-                    for col in range(table.columnCount()):
-                        cell = table.item(r, col)
-                        if not cell:
-                            cell = QTableWidgetItem()
-                            table.setItem(r, col, cell)
-                        cell.setBackground(self._cached_pink_color)
-                    table.selectRow(r)
-                    return True
-        
-        return False
\ No newline at end of file
+        # 학생 찾기 - 고른 행이 없으면 번호와 이름으로 색인 검색 (번호가 없으면 이름만)
+        if data_row < 0 or self.logic.data_to_view_row(data_row) < 0:
+            data_row = self._resolve_multi_student(number, name)
+            if data_row is None:
+                return None  # 고르기를 취소함
+            if data_row < 0:
+                return False
+        r = self.logic.data_to_view_row(data_row)
+
+        # 데이터 업데이트
+        if not self.logic.update_score(data_row, session_index, score):
+            self._warn_missing_session(data_row)
+            return None  # 학생은 찾았으므로 '찾기 실패'는 표시하지 않음
+        self._highlighted_rows.add(data_row)
+
+        # UI 업데이트
+        score_col = 3
+        item = table.item(r, score_col)
+        if not item:
+            item = QTableWidgetItem()
+            table.setItem(r, score_col, item)
+        item.setText(score)
+        item.setTextAlignment(Qt.AlignCenter)
+
+        # 배경색 및 포커스 적용 (단일반과 동일하게)
+        for col in range(table.columnCount()):
+            cell = table.item(r, col)
+            if not cell:
+                cell = QTableWidgetItem()
+                table.setItem(r, col, cell)
+            cell.setBackground(self._cached_pink_color)
+        table.selectRow(r)
+        return True
\ No newline at end of file
@@ -4,8 +4,13 @@ from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QDragEnterEvent, QDropEvent
 from PySide6.QtWidgets import (QLabel, QMessageBox, QWidget, QVBoxLayout, 
                              QTableWidget, QLineEdit, QPushButton, QComboBox, 
-                             QHBoxLayout, QGroupBox, QHeaderView, QTableWidgetItem)
-import openpyxl
+                             QHBoxLayout, QGroupBox, QHeaderView, QTableWidgetItem,
+                             QDialog, QDialogButtonBox, QListWidget, QListWidgetItem,
+                             QCheckBox, QFormLayout, QSpinBox)
+
+from core.exporter import EXPORT_FORMATS, FORMAT_LABELS
+from core.grading import DEFAULT_BANDS, format_bands, format_number
+from core.score_logic import CELL_CHANGED
 
 class DropZone(QLabel):
     fileDropped = Signal(list)
@@ -93,14 +98,18 @@ class DropZone(QLabel):
 
 
 class MultiClassPanel(QWidget):
-    """이동반 전용 패널 클래스 - 성능 최적화"""
+    """이동반 전용 패널 클래스 - 성능 최적화
+
+    학생 데이터를 따로 복사해 두지 않고 MainWindow와 같은 ScoreLogic에서 검색합니다.
+    """
     
-    def __init__(self, parent=None):
+    def __init__(self, logic, parent=None):
         super().__init__(parent)
-        self.files = []  # 업로드된 파일 정보 [{path, headers, data} ...]
+        self.logic = logic
         
         # 성능 최적화를 위한 변수들
-        self._search_cache = {}  # 검색 결과 캐싱
+        self._search_cache = {}  # 검색 결과 캐싱 (파일 구성이 바뀌면 비움)
+        self._unsubscribe_logic = logic.subscribe(self._on_logic_event)
         self._update_timer = QTimer()
         self._update_timer.setSingleShot(True)
         self._update_timer.timeout.connect(self._delayed_search)
@@ -152,46 +161,28 @@ class MultiClassPanel(QWidget):
             self.on_student_number_entered(self._pending_search)
             self._pending_search = None
 
-    def on_file_dropped(self, file_path):
-        """엑셀 파일 드롭 처리 최적화"""
-        try:
-            # 읽기 전용으로 최적화
-            workbook = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
-            sheet = workbook.active
-            
-            # 헤더 읽기
-            headers = []
-            if sheet.max_row > 0:
-                first_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True))
-                headers = [str(cell) if cell is not None else "" for cell in first_row]
-            
-            # 데이터 읽기 최적화
-            data = []
-            if sheet.max_row > 1:
-                for row in sheet.iter_rows(min_row=2, values_only=True):
-                    row_data = [str(val) if val is not None else "" for val in row]
-                    data.append(row_data)
-            
-            # 파일 정보 저장
-            self.files.append({
-                "path": file_path, 
-                "headers": headers, 
-                "data": data
-            })
-            
-            # 캐시 무효화
+    def _on_logic_event(self, event):
+        # 점수 입력은 검색 결과(번호, 이름)에 영향이 없으므로 파일 구성이 바뀔 때만 캐시를 비움
+        if event["type"] != CELL_CHANGED:
             self._search_cache.clear()
-            
-            self.update_file_list_label()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "엑셀 로드 오류", 
-                               f"엑셀 파일을 불러오는 중 오류가 발생했습니다:\n{e}")
+
+    @property
+    def files(self):
+        """불러온 시트 목록 (ScoreLogic과 공유)"""
+        return self.logic.files
+
+    def on_file_dropped(self, file_path):
+        """엑셀 파일 드롭 처리 - ScoreLogic에 불러옵니다."""
+        success, message = self.logic.load_excel_data(file_path)
+        if not success:
+            QMessageBox.critical(self, "엑셀 로드 오류", message)
+            return
+        self.update_file_list_label()
 
     def update_file_list_label(self):
         """파일 리스트 라벨 업데이트"""
         if self.files:
-            names = [os.path.basename(f["path"]) for f in self.files]
+            names = list(dict.fromkeys(os.path.basename(f["path"]) for f in self.files))
             display_text = "업로드된 파일: " + ", ".join(names)
             # 텍스트 길이 제한
             if len(display_text) > 50:
@@ -228,17 +219,9 @@ class MultiClassPanel(QWidget):
         self._update_table(results, number)
 
     def _search_student(self, number):
-        """학생 검색 최적화"""
-        results = []
-        for f in self.files:
-            # B열(번호: index 1) 검색 최적화
-            for row in f["data"]:
-                if len(row) > 1 and row[1] == number:
-                    # B열(번호: index 1), D열(이름: index 3) 추출
-                    b_val = row[1] if len(row) > 1 else ""
-                    d_val = row[3] if len(row) > 3 else ""
-                    results.append([b_val, d_val])
-        return results
+        """학생 검색 - ScoreLogic의 번호 검색 결과에서 (번호, 이름) 추출"""
+        student_data = self.logic.student_data
+        return [[student_data[r][2], student_data[r][3]] for r in self.logic.find_students(number=number)]
 
     def _update_table(self, results, number):
         """테이블 업데이트 최적화"""
@@ -274,8 +257,7 @@ class MultiClassPanel(QWidget):
         table.setUpdatesEnabled(True)
 
     def clear_data(self):
-        """데이터 초기화"""
-        self.files.clear()
+        """검색 결과 초기화 (데이터는 ScoreLogic.clear_data로 지움)"""
         self._search_cache.clear()
         self._clear_table()
         self.update_file_list_label()
@@ -286,4 +268,289 @@ class MultiClassPanel(QWidget):
 
     def get_loaded_files_count(self):
         """로드된 파일 수 반환"""
-        return len(self.files)
\ No newline at end of file
+        return len(self.files)
+
+
+class ExportDialog(QDialog):
+    """내보내기 형식과 컬럼(반/번호/성명, 회차)을 고르는 대화상자"""
+
+    ROSTER_LABELS = ((1, "반"), (2, "번호"), (3, "성명"))
+
+    def __init__(self, session_count, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("내보내기")
+        layout = QVBoxLayout(self)
+
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("형식:"))
+        self.format_combo = QComboBox()
+        for fmt in EXPORT_FORMATS:
+            self.format_combo.addItem(FORMAT_LABELS[fmt], fmt)
+        format_layout.addWidget(self.format_combo)
+        layout.addLayout(format_layout)
+
+        roster_layout = QHBoxLayout()
+        self.roster_checks = []
+        for col, label in self.ROSTER_LABELS:
+            check = QCheckBox(label)
+            check.setChecked(True)
+            roster_layout.addWidget(check)
+            self.roster_checks.append((col, check))
+        layout.addLayout(roster_layout)
+
+        # 회차 목록 (기본값: 전체 선택)
+        self.session_list = QListWidget()
+        for i in range(session_count):
+            item = QListWidgetItem(f"{i + 1}회")
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.session_list.addItem(item)
+        layout.addWidget(self.session_list)
+
+        select_layout = QHBoxLayout()
+        select_all = QPushButton("전체 선택")
+        select_all.clicked.connect(lambda: self._set_all_sessions(Qt.Checked))
+        select_none = QPushButton("전체 해제")
+        select_none.clicked.connect(lambda: self._set_all_sessions(Qt.Unchecked))
+        select_layout.addWidget(select_all)
+        select_layout.addWidget(select_none)
+        layout.addLayout(select_layout)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def _set_all_sessions(self, state):
+        for i in range(self.session_list.count()):
+            self.session_list.item(i).setCheckState(state)
+
+    def selection(self):
+        """(형식, 명단 컬럼 목록, 회차 인덱스 목록)을 반환합니다."""
+        roster_cols = [col for col, check in self.roster_checks if check.isChecked()]
+        sessions = [i for i in range(self.session_list.count())
+                    if self.session_list.item(i).checkState() == Qt.Checked]
+        return self.format_combo.currentData(), roster_cols, sessions
+
+
+class ValidationRuleDialog(QDialog):
+    """회차 하나의 점수 검증 규칙(범위, 단위, 허용 점수, 필수)을 설정하는 대화상자"""
+
+    def __init__(self, session_label, rule=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"검증 규칙 - {session_label}")
+        rule = rule or {}
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        def number_text(key):
+            value = rule.get(key)
+            if value is None:
+                return ""
+            return str(int(value)) if float(value).is_integer() else str(value)
+
+        self.min_edit = QLineEdit(number_text("min"))
+        self.max_edit = QLineEdit(number_text("max"))
+        self.step_edit = QLineEdit(number_text("step"))
+        self.step_edit.setPlaceholderText("예: 0.5")
+        allowed = rule.get("allowed") or ()
+        self.allowed_edit = QLineEdit(", ".join(str(int(v)) if float(v).is_integer() else str(v)
+                                                for v in allowed))
+        self.allowed_edit.setPlaceholderText("예: 0, 5, 10 (비우면 제한 없음)")
+        self.required_check = QCheckBox("빈 칸 허용 안 함 (저장 전 확인)")
+        self.required_check.setChecked(bool(rule.get("required")))
+        form.addRow("최솟값:", self.min_edit)
+        form.addRow("최댓값:", self.max_edit)
+        form.addRow("단위:", self.step_edit)
+        form.addRow("허용 점수:", self.allowed_edit)
+        form.addRow("", self.required_check)
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel | QDialogButtonBox.Reset)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        buttons.button(QDialogButtonBox.Reset).setText("규칙 해제")
+        buttons.button(QDialogButtonBox.Reset).clicked.connect(self._clear)
+        layout.addWidget(buttons)
+
+    def _clear(self):
+        for edit in (self.min_edit, self.max_edit, self.step_edit, self.allowed_edit):
+            edit.clear()
+        self.required_check.setChecked(False)
+
+    def rule(self):
+        """입력한 규칙 dict를 반환합니다 (값 검사는 ScoreLogic.set_validation_rule에서)."""
+        allowed = [v.strip() for v in self.allowed_edit.text().replace(" ", ",").split(",") if v.strip()]
+        return {
+            "min": self.min_edit.text().strip() or None,
+            "max": self.max_edit.text().strip() or None,
+            "step": self.step_edit.text().strip() or None,
+            "allowed": allowed,
+            "required": self.required_check.isChecked(),
+        }
+
+
+class GradingSchemeDialog(QDialog):
+    """회차별 가중치/만점과 반올림, 등급 구간으로 환산 총점 계산 방식을 설정하는 대화상자"""
+
+    ROUNDING_LABELS = [("half_up", "반올림"), ("down", "버림"), ("up", "올림")]
+
+    def __init__(self, session_labels, scheme=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("환산 총점 설정")
+        self.resize(420, 480)
+        scheme = scheme or {}
+        sessions = scheme.get("sessions") or {}
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("가중치를 비운 회차는 계산하지 않습니다. 만점을 넘는 점수는 만점으로 계산합니다."))
+
+        self.table = QTableWidget(len(session_labels), 3)
+        self.table.setHorizontalHeaderLabels(["회차", "가중치", "만점"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        for i, label in enumerate(session_labels):
+            item = sessions.get(label) or {}
+            label_item = QTableWidgetItem(label)
+            label_item.setFlags(label_item.flags() & ~Qt.ItemIsEditable)
+            self.table.setItem(i, 0, label_item)
+            for j, key in ((1, "weight"), (2, "cap")):
+                value = item.get(key)
+                self.table.setItem(i, j, QTableWidgetItem("" if value is None else format_number(value)))
+        layout.addWidget(self.table)
+
+        form = QFormLayout()
+        self.digits_spin = QSpinBox()
+        self.digits_spin.setRange(0, 4)
+        self.digits_spin.setValue(scheme.get("digits", 1))
+        self.rounding_combo = QComboBox()
+        for key, text in self.ROUNDING_LABELS:
+            self.rounding_combo.addItem(text, key)
+        self.rounding_combo.setCurrentIndex(max(0, self.rounding_combo.findData(scheme.get("rounding", "half_up"))))
+        self.bands_edit = QLineEdit(format_bands(scheme.get("bands") or DEFAULT_BANDS))
+        self.bands_edit.setPlaceholderText("예: 90:A, 80:B, 70:C, 0:D")
+        form.addRow("소수 자릿수:", self.digits_spin)
+        form.addRow("자릿수 처리:", self.rounding_combo)
+        form.addRow("등급 (하한:등급):", self.bands_edit)
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel | QDialogButtonBox.Reset)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        buttons.button(QDialogButtonBox.Reset).setText("계산 해제")
+        buttons.button(QDialogButtonBox.Reset).clicked.connect(self._clear)
+        layout.addWidget(buttons)
+
+    def _clear(self):
+        for i in range(self.table.rowCount()):
+            for j in (1, 2):
+                self.table.item(i, j).setText("")
+
+    def scheme(self):
+        """입력한 계산 방식 dict를 반환합니다 (값 검사는 ScoreLogic.set_grading_scheme에서)."""
+        sessions = {}
+        for i in range(self.table.rowCount()):
+            weight = self.table.item(i, 1).text().strip()
+            if weight:
+                sessions[self.table.item(i, 0).text()] = {"weight": weight,
+                                                          "cap": self.table.item(i, 2).text().strip() or None}
+        return {
+            "sessions": sessions,
+            "digits": self.digits_spin.value(),
+            "rounding": self.rounding_combo.currentData(),
+            "bands": self.bands_edit.text(),
+        }
+
+
+class StudentChoiceDialog(QDialog):
+    """이동반 입력에서 같은 학생이 여러 파일에 있을 때 점수를 넣을 행을 고르는 대화상자"""
+
+    def __init__(self, name, choices, parent=None):
+        """choices: [(data_row, 표시 문자열)]"""
+        super().__init__(parent)
+        self.setWindowTitle("학생 선택")
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"'{name}' 학생이 여러 곳에 있습니다. 점수를 입력할 곳을 고르세요."))
+
+        self.choice_list = QListWidget()
+        for data_row, label in choices:
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, data_row)
+            self.choice_list.addItem(item)
+        self.choice_list.setCurrentRow(0)
+        self.choice_list.itemDoubleClicked.connect(lambda _: self.accept())
+        layout.addWidget(self.choice_list)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def selected_row(self):
+        """고른 데이터 row (없으면 -1)"""
+        item = self.choice_list.currentItem()
+        return item.data(Qt.UserRole) if item is not None else -1
+
+
+class ScoreHistoryPanel(QWidget):
+    """선택한 학생의 회차별 점수, 직전 대비 변화, 추이를 보여 주는 패널"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        self.title_label = QLabel("학생을 선택하세요")
+        layout.addWidget(self.title_label)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["회차", "점수", "변화"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionMode(QTableWidget.NoSelection)
+        layout.addWidget(self.table)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+    @staticmethod
+    def _number_text(value):
+        return str(int(value)) if float(value).is_integer() else f"{value:.2f}".rstrip("0").rstrip(".")
+
+    def show_series(self, title, rows, trend, spark, grade=None):
+        """
+        rows: [(회차 이름, 점수, 변화 또는 None)] - 입력한 회차만
+        trend: 회차당 변화(기울기) 또는 None, spark: 점수 막대 문자열
+        grade: (환산 총점, 등급) 또는 None
+        """
+        self.title_label.setText(title)
+        table = self.table
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for i, (label, value, delta) in enumerate(rows):
+            if delta is None or delta == 0:
+                delta_text = "-"
+            else:
+                delta_text = ("▲" if delta > 0 else "▼") + self._number_text(abs(delta))
+            for j, text in enumerate((label, self._number_text(value), delta_text)):
+                item = table.item(i, j)
+                if item is None:
+                    item = QTableWidgetItem()
+                    item.setTextAlignment(Qt.AlignCenter)
+                    table.setItem(i, j, item)
+                item.setText(text)
+        table.setUpdatesEnabled(True)
+
+        grade_text = f"\n환산 총점 {self._number_text(grade[0])} ({grade[1]})" if grade else ""
+        if not rows:
+            self.summary_label.setText("입력한 점수가 없습니다." + grade_text)
+            return
+        average = sum(value for _, value, _ in rows) / len(rows)
+        summary = f"추이 {spark}   평균 {self._number_text(round(average, 2))}"
+        if trend is not None:
+            summary += f"   회차당 {'+' if trend >= 0 else '-'}{self._number_text(round(abs(trend), 2))}"
+        self.summary_label.setText(summary + grade_text)
+
+    def clear(self):
+        self.title_label.setText("학생을 선택하세요")
+        self.table.setRowCount(0)
+        self.summary_label.setText("")
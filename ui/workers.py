@@ -0,0 +1,53 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class WorkerSignals(QObject):
+    """백그라운드 작업의 결과를 GUI 스레드로 전달하는 시그널"""
+    finished = Signal(object)
+    failed = Signal(str)
+    progress = Signal(object)
+
+
+class LogicEvents(QObject):
+    """ScoreLogic 변경 이벤트를 GUI 스레드로 전달하는 다리
+
+    logic.subscribe(events.changed.emit)로 등록하면 다른 스레드에서 생긴 변경도
+    큐 연결로 GUI 스레드에서 받습니다.
+    """
+    changed = Signal(object)
+
+
+class BackgroundTask(QRunnable):
+    """함수를 QThreadPool에서 실행하고 결과를 시그널로 알립니다.
+
+    시그널은 GUI 스레드의 QObject 메서드(예: MainWindow의 메서드)에 연결해야
+    큐 연결로 GUI 스레드에서 실행됩니다.
+    """
+
+    _active = set()  # 작업 참조 유지 (시그널이 전달되기 전에 객체가 사라지지 않도록)
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._done = False
+        self.setAutoDelete(False)  # 파이썬 쪽에서 수명 관리
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+        finally:
+            self._done = True
+
+    def start(self):
+        # 끝난 작업은 다음 작업을 시작할 때 GUI 스레드에서 정리
+        BackgroundTask._active = {task for task in BackgroundTask._active if not task._done}
+        BackgroundTask._active.add(self)
+        QThreadPool.globalInstance().start(self)
+        return self